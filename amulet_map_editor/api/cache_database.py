@@ -0,0 +1,131 @@
+"""A small helper for the SQLite databases Amulet stores in the cache directory."""
+
+import os
+import glob
+import sqlite3
+import logging
+from threading import RLock
+from typing import Callable, Optional
+
+log = logging.getLogger(__name__)
+
+# The number of writes between two commits to disk.
+CommitInterval = 64
+
+
+class CacheDatabase:
+    """A lazily opened SQLite database in a sub-directory of the cache directory.
+
+    Writes are committed in batches. When a database is opened the least recently used
+    databases in the same directory are deleted so that at most max_databases remain.
+
+    The lock must be held while using the connection.
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        name: str,
+        create_tables: Callable[[sqlite3.Connection], None],
+        max_databases: int,
+        in_memory_fallback: bool = False,
+    ):
+        """
+        Create a new CacheDatabase instance. The database is opened when it is first used.
+
+        :param directory: The directory in the cache directory to store the database in.
+        :param name: The name of the database file without the extension.
+        :param create_tables: A function to create the tables in a newly opened connection.
+        :param max_databases: The maximum number of databases to keep in the directory.
+        :param in_memory_fallback: If the database cannot be opened use an in-memory database rather than none.
+        """
+        self.lock = RLock()
+        self._directory = os.path.join(os.environ["CACHE_DIR"], directory)
+        self._path = os.path.join(self._directory, f"{name}.sqlite")
+        self._create_tables = create_tables
+        self._max_databases = max_databases
+        self._in_memory_fallback = in_memory_fallback
+        self._db: Optional[sqlite3.Connection] = None
+        self._closed = False
+        self._write_count = 0
+
+    @property
+    def path(self) -> str:
+        """The path of the database file."""
+        return self._path
+
+    def get_db(self) -> Optional[sqlite3.Connection]:
+        """Get the connection, opening it if required. None if the database could not be opened or is closed."""
+        with self.lock:
+            if self._db is None and not self._closed:
+                try:
+                    os.makedirs(self._directory, exist_ok=True)
+                    self._prune()
+                    if os.path.isfile(self._path):
+                        # mark the database as recently used
+                        os.utime(self._path)
+                    self._db = self._open(self._path)
+                except (sqlite3.Error, OSError):
+                    log.warning(
+                        f"Failed opening the cache database {self._path}",
+                        exc_info=True,
+                    )
+                    if self._in_memory_fallback:
+                        self._db = self._open(":memory:")
+                    else:
+                        self._closed = True
+            return self._db
+
+    def _open(self, path: str) -> sqlite3.Connection:
+        db = sqlite3.connect(path, check_same_thread=False)
+        try:
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("PRAGMA synchronous=OFF")
+            self._create_tables(db)
+            db.commit()
+        except BaseException:
+            db.close()
+            raise
+        return db
+
+    def _prune(self):
+        """Delete the least recently used databases in the directory."""
+        paths = [
+            path
+            for path in glob.glob(
+                os.path.join(glob.escape(self._directory), "*.sqlite")
+            )
+            if os.path.normcase(path) != os.path.normcase(self._path)
+        ]
+        paths.sort(key=os.path.getmtime, reverse=True)
+        for path in paths[self._max_databases - 1 :]:
+            for file_path in (path, f"{path}-wal", f"{path}-shm"):
+                try:
+                    os.remove(file_path)
+                except FileNotFoundError:
+                    pass
+                except OSError:
+                    log.debug(f"Failed deleting {file_path}", exc_info=True)
+
+    def count_write(self):
+        """Record that a change was made. The changes are committed every CommitInterval writes."""
+        with self.lock:
+            self._write_count += 1
+            if self._write_count >= CommitInterval:
+                self.commit()
+
+    def commit(self):
+        """Commit all pending changes to disk."""
+        with self.lock:
+            self._write_count = 0
+            if self._db is not None:
+                self._db.commit()
+
+    def close(self):
+        """Commit all pending changes and close the database. It will not be opened again."""
+        with self.lock:
+            self._closed = True
+            if self._db is not None:
+                self._db.commit()
+                self._db.close()
+                self._db = None
@@ -1,6 +1,10 @@
 from .context_manager import ContextManager
 from .drawable import Drawable
-from .thread_generator import ThreadedObject, ThreadedObjectContainer
+from .thread_generator import (
+    ThreadedObject,
+    ThreadedObjectContainer,
+    ThreadedObjectStats,
+)
 
 
 def check_opengl(checked=False):
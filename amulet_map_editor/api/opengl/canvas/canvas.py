@@ -1,6 +1,8 @@
 from typing import Optional
 import logging
 import sys
+import itertools
+import weakref
 
 import wx
 from wx import glcanvas
@@ -26,11 +28,24 @@ The initialisation function should be as minimal as possible. No OpenGL function
 You can implement functions that take a while in threads to not block the GUI but they must still not contain OpenGL functions.
 Upon the window being shown the OpenGL context is activated and the state can be set in _init_opengl
 Objects that need to bind textures or data should do so in the draw function so they can be sure the context is set.
+
+Contexts are created sharing OpenGL objects with the other open canvases where possible.
+The context_identifier is the same for all contexts that share objects so textures and shaders
+keyed by it are only created once. Vertex array objects are not shared so must not be keyed by it.
 """
 
+# Used to generate unique identifiers for each group of contexts that share OpenGL objects.
+_share_group_ids = itertools.count()
+
 
 class BaseCanvas(glcanvas.GLCanvas):
     _context: Optional[glcanvas.GLContext]
+    _share_group: str
+
+    # Should the context share OpenGL objects with the other canvases.
+    share_contexts = True
+    # All canvases that have been created. Used to find a context to share with.
+    _canvases: "weakref.WeakSet[BaseCanvas]" = weakref.WeakSet()
 
     def __init__(self, parent: wx.Window):
         """
@@ -52,31 +67,56 @@ class BaseCanvas(glcanvas.GLCanvas):
             # This is required for MacOS. Amulet-Team/Amulet-Map-Editor#597
             context_attributes = wx.glcanvas.GLContextAttrs()
             context_attributes.CoreProfile().Robust().ResetIsolation().EndList()
-            self._context = glcanvas.GLContext(
-                self, ctxAttrs=context_attributes
+            self._context = self._create_context(
+                ctxAttrs=context_attributes
             )  # setup the OpenGL context
         else:
             # This is required for linux and windows.
             # Amulet-Team/Amulet-Map-Editor#84
             # Amulet-Team/Amulet-Map-Editor#856
-            self._context = glcanvas.GLContext(self)
+            self._context = self._create_context()
 
         if not self._context.IsOK():
             raise Exception(f"Failed setting up context")
+        BaseCanvas._canvases.add(self)
 
         self._init = False
 
         self.Bind(wx.EVT_SHOW, self._on_show)
 
+    def _create_context(self, **kwargs) -> glcanvas.GLContext:
+        """Create the OpenGL context, sharing objects with another canvas if possible."""
+        if self.share_contexts:
+            share_canvas = next(
+                (
+                    canvas
+                    for canvas in tuple(BaseCanvas._canvases)
+                    # a destroyed window evaluates to False
+                    if canvas and canvas._context is not None and canvas._context.IsOK()
+                ),
+                None,
+            )
+            if share_canvas is not None:
+                context = glcanvas.GLContext(self, other=share_canvas.context, **kwargs)
+                if context.IsOK():
+                    self._share_group = share_canvas._share_group
+                    return context
+                log.info(
+                    "Failed creating a shared OpenGL context. Creating an unshared context."
+                )
+        self._share_group = str(next(_share_group_ids))
+        return glcanvas.GLContext(self, **kwargs)
+
     @property
     def context(self) -> glcanvas.GLContext:
         return self._context
 
     @property
     def context_identifier(self) -> str:
+        """An identifier for the group of contexts this context shares OpenGL objects with."""
         # if not self._init:
         #     raise Exception("Cannot access the context until the window has been shown.")
-        return str(id(self._context))
+        return self._share_group
 
     def _on_show(self, evt: wx.ShowEvent):
         if not self._init and evt.IsShown():
@@ -0,0 +1,214 @@
+"""Biome dependent block tints.
+
+Grass and foliage faces are not tinted when the chunk is meshed.
+Instead the tint vertex attribute of these faces stores the tint class and the shading.
+The tint colour is looked up in the shader from a texture holding the tint of each block column in the region.
+This means that changing the biomes only requires the small tint texture to be updated rather than re-meshing the chunk.
+
+Tint vertex attribute format:
+    Untinted and fixed tint faces: (red, green, blue)
+    Biome tinted faces: (-tint_class, shading, 0)
+"""
+
+import logging
+from functools import lru_cache
+from typing import Dict, Tuple
+
+import numpy
+import PyMCTranslate
+
+from amulet.api.block import Block
+from amulet.api.chunk import Chunk, BiomesShape
+
+log = logging.getLogger(__name__)
+
+ColourType = Tuple[int, int, int]
+
+TintClassNone = 0
+TintClassGrass = 1
+TintClassFoliage = 2
+TintClassCount = 2
+
+# The blocks whose tinted faces use the biome grass or foliage colour.
+# The model reader gives the faces with a tint index a fixed colour for the block and leaves the other faces white.
+# Blocks with a fixed tint (eg. spruce and birch leaves) are not listed.
+BiomeTintedBlocks: Dict[str, int] = {
+    "minecraft:grass_block": TintClassGrass,
+    "minecraft:grass": TintClassGrass,
+    "minecraft:short_grass": TintClassGrass,
+    "minecraft:tall_grass": TintClassGrass,
+    "minecraft:fern": TintClassGrass,
+    "minecraft:large_fern": TintClassGrass,
+    "minecraft:potted_fern": TintClassGrass,
+    "minecraft:bush": TintClassGrass,
+    "minecraft:pink_petals": TintClassGrass,
+    "minecraft:wildflowers": TintClassGrass,
+    "minecraft:oak_leaves": TintClassFoliage,
+    "minecraft:jungle_leaves": TintClassFoliage,
+    "minecraft:acacia_leaves": TintClassFoliage,
+    "minecraft:dark_oak_leaves": TintClassFoliage,
+    "minecraft:mangrove_leaves": TintClassFoliage,
+    "minecraft:vine": TintClassFoliage,
+}
+
+# The y coordinate the biome is sampled at in chunks with 3D biomes.
+BiomeSampleY = 64
+
+
+def _hex(colour: int) -> ColourType:
+    return (colour >> 16) & 0xFF, (colour >> 8) & 0xFF, colour & 0xFF
+
+
+# The grass and foliage colour of each vanilla biome.
+_BiomeTints: Dict[str, Tuple[int, int]] = {
+    "plains": (0x91BD59, 0x77AB2F),
+    "sunflower_plains": (0x91BD59, 0x77AB2F),
+    "beach": (0x91BD59, 0x77AB2F),
+    "dripstone_caves": (0x91BD59, 0x77AB2F),
+    "deep_dark": (0x91BD59, 0x77AB2F),
+    "forest": (0x79C05A, 0x59AE30),
+    "flower_forest": (0x79C05A, 0x59AE30),
+    "dark_forest": (0x507A32, 0x59AE30),
+    "birch_forest": (0x88BB67, 0x6BA941),
+    "old_growth_birch_forest": (0x88BB67, 0x6BA941),
+    "taiga": (0x86B783, 0x68A464),
+    "old_growth_spruce_taiga": (0x86B783, 0x68A464),
+    "old_growth_pine_taiga": (0x86B87F, 0x68A55F),
+    "snowy_taiga": (0x80B497, 0x60A17B),
+    "snowy_plains": (0x80B497, 0x60A17B),
+    "ice_spikes": (0x80B497, 0x60A17B),
+    "frozen_river": (0x80B497, 0x60A17B),
+    "frozen_ocean": (0x80B497, 0x60A17B),
+    "grove": (0x80B497, 0x60A17B),
+    "snowy_slopes": (0x80B497, 0x60A17B),
+    "frozen_peaks": (0x80B497, 0x60A17B),
+    "jagged_peaks": (0x80B497, 0x60A17B),
+    "snowy_beach": (0x83B593, 0x64A278),
+    "stony_peaks": (0x9ABE4B, 0x82AC1E),
+    "meadow": (0x83BB6D, 0x63A948),
+    "cherry_grove": (0xB6DB61, 0xB6DB61),
+    "pale_garden": (0x778272, 0x878D76),
+    "windswept_hills": (0x8AB689, 0x6DA36B),
+    "windswept_gravelly_hills": (0x8AB689, 0x6DA36B),
+    "windswept_forest": (0x8AB689, 0x6DA36B),
+    "stony_shore": (0x8AB689, 0x6DA36B),
+    "jungle": (0x59C93C, 0x30BB0B),
+    "bamboo_jungle": (0x59C93C, 0x30BB0B),
+    "sparse_jungle": (0x64C73F, 0x3EB80F),
+    "swamp": (0x6A7039, 0x6A7039),
+    "mangrove_swamp": (0x6A7039, 0x8DB127),
+    "mushroom_fields": (0x55C93F, 0x2BBB0F),
+    "desert": (0xBFB755, 0xAEA42A),
+    "savanna": (0xBFB755, 0xAEA42A),
+    "savanna_plateau": (0xBFB755, 0xAEA42A),
+    "windswept_savanna": (0xBFB755, 0xAEA42A),
+    "nether_wastes": (0xBFB755, 0xAEA42A),
+    "soul_sand_valley": (0xBFB755, 0xAEA42A),
+    "crimson_forest": (0xBFB755, 0xAEA42A),
+    "warped_forest": (0xBFB755, 0xAEA42A),
+    "basalt_deltas": (0xBFB755, 0xAEA42A),
+    "badlands": (0x90814D, 0x9E814D),
+    "wooded_badlands": (0x90814D, 0x9E814D),
+    "eroded_badlands": (0x90814D, 0x9E814D),
+}
+# Oceans, rivers, the end and unknown biomes.
+_DefaultBiomeTint = (0x8EB971, 0x71A74D)
+
+
+@lru_cache(maxsize=None)
+def get_biome_tint(biome: str) -> Tuple[ColourType, ColourType]:
+    """
+    Get the grass and foliage colour of a biome.
+
+    :param biome: The namespaced biome name. The namespace is ignored.
+    :return: The grass colour and the foliage colour as RGB tuples in the range 0-255.
+    """
+    grass, foliage = _BiomeTints.get(biome.split(":")[-1], _DefaultBiomeTint)
+    return _hex(grass), _hex(foliage)
+
+
+def default_biome_tints(width: int, height: int) -> numpy.ndarray:
+    """
+    Create a tint array filled with the plains tint.
+
+    :param width: The number of columns in the x axis.
+    :param height: The number of columns in the z axis.
+    :return: A uint8 array of shape (TintClassCount, height, width, 4)
+    """
+    tints = numpy.empty((TintClassCount, height, width, 4), numpy.uint8)
+    for tint_class, colour in enumerate(get_biome_tint("plains")):
+        tints[tint_class] = (*colour, 255)
+    return tints
+
+
+def get_block_tint_class(
+    translator: PyMCTranslate.Version, universal_block: Block
+) -> int:
+    """
+    Get the biome tint class of a block.
+
+    :param translator: The translator for the version the resource pack models are created in.
+    :param universal_block: The block in the universal format.
+    :return: The tint class to apply to the tinted faces of the block. TintClassNone if the tint does not depend on the biome.
+    """
+    try:
+        version_block = translator.block.from_universal(universal_block.base_block)[0]
+    except Exception:
+        log.debug(
+            f"Failed translating {universal_block} to find its tint", exc_info=True
+        )
+        return TintClassNone
+    if not isinstance(version_block, Block):
+        return TintClassNone
+    return BiomeTintedBlocks.get(version_block.namespaced_name, TintClassNone)
+
+
+def get_tint_class(block_tint_class: int, tint: numpy.ndarray) -> numpy.ndarray:
+    """
+    Find the faces that should be tinted by the biome.
+
+    :param block_tint_class: The tint class of the block. See get_block_tint_class.
+    :param tint: A float array of shape (N, 3) containing the tint the model reader assigned to each vertex.
+    :return: An array of shape (N,) containing the tint class of each vertex.
+    """
+    tint_class = numpy.full(tint.shape[0], TintClassNone, numpy.uint8)
+    if block_tint_class != TintClassNone:
+        # the faces without a tint index are white
+        tint_class[numpy.any(tint != 1, axis=1)] = block_tint_class
+    return tint_class
+
+
+def create_chunk_biome_tints(chunk: Chunk) -> numpy.ndarray:
+    """
+    Create the tint colour of each column in a chunk.
+
+    :param chunk: The chunk to read the biomes from.
+    :return: A uint8 array of shape (TintClassCount, 16, 16, 4) indexed by tint class, z and x.
+    """
+    biomes = chunk.biomes
+    if biomes.dimension == BiomesShape.Shape2D:
+        biome_ids = numpy.asarray(biomes[:, :])
+    elif biomes.dimension == BiomesShape.Shape3D:
+        sections = sorted(biomes.sections)
+        if not sections:
+            return default_biome_tints(16, 16)
+        sample_cy = BiomeSampleY // 16
+        if sample_cy not in biomes.sections:
+            sample_cy = sections[-1]
+        # each biome value covers a 4x4x4 area
+        biome_ids = numpy.kron(
+            biomes.get_section(sample_cy)[:, (BiomeSampleY % 16) // 4, :],
+            numpy.ones((4, 4), numpy.uint32),
+        )
+    else:
+        return default_biome_tints(16, 16)
+
+    unique_ids, inverse = numpy.unique(biome_ids, return_inverse=True)
+    palette_tints = numpy.empty((TintClassCount, unique_ids.size, 4), numpy.uint8)
+    for index, biome_id in enumerate(unique_ids):
+        for tint_class, colour in enumerate(
+            get_biome_tint(chunk.biome_palette[int(biome_id)])
+        ):
+            palette_tints[tint_class, index] = (*colour, 255)
+    # the biome array is indexed by x then z. The texture is indexed by z then x
+    return palette_tints[:, inverse.reshape(biome_ids.shape).T]
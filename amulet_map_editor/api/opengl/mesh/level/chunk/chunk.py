@@ -1,7 +1,8 @@
 import numpy
-from typing import TYPE_CHECKING, Tuple, List, Union
+from typing import TYPE_CHECKING, Tuple, List, Union, Optional
 import weakref
 import itertools
+import hashlib
 import logging
 
 from amulet.api.errors import ChunkLoadError, ChunkDoesNotExist
@@ -11,10 +12,12 @@ from amulet.api.level import BaseLevel
 from amulet.api.selection import SelectionBox
 
 from .chunk_builder import RenderChunkBuilder
+from .biome_tint import create_chunk_biome_tints
 from amulet_map_editor.api.opengl.resource_pack import OpenGLResourcePack
 
 if TYPE_CHECKING:
     from amulet.api.chunk import Chunk
+    from ..mesh_cache import ChunkMeshCache
 
 log = logging.getLogger(__name__)
 
@@ -31,6 +34,7 @@ class RenderChunk(RenderChunkBuilder):
         draw_floor: bool = False,
         draw_ceil: bool = False,
         limit_bounds: bool = False,
+        mesh_cache: Optional["ChunkMeshCache"] = None,
     ):
         # the chunk geometry is stored in chunk space (floating point)
         # at shader time it is transformed by the players transform
@@ -42,12 +46,21 @@ class RenderChunk(RenderChunkBuilder):
         self._draw_floor = draw_floor
         self._draw_ceil = draw_ceil
         self._limit_bounds = limit_bounds
+        self._mesh_cache = mesh_cache
         self._chunk_state = 0  # 0 = chunk does not exist, 1 = chunk exists but failed to load, 2 = chunk exists
         self._changed_time = 0
         self._needs_rebuild = True
         self.verts_translucent = (
             0  # the offset into the above from which the faces can be translucent
         )
+        # The biome tint of each column. See create_chunk_biome_tints.
+        self.biome_tints: Optional[numpy.ndarray] = None
+        # Set when biome_tints changes. Cleared by the region once it has copied the tints.
+        self.biome_tints_changed = False
+        # A hash of the block arrays the geometry was created from. Block ids are only valid for this session.
+        self._block_hash: Optional[bytes] = None
+        # The content hash of geometry loaded from the mesh cache that has not been compared with the chunk yet.
+        self._cached_content_hash: Optional[bytes] = None
         # self.chunk_lod1: numpy.ndarray = self.new_empty_verts()
 
     def __repr__(self):
@@ -60,6 +73,11 @@ class RenderChunk(RenderChunkBuilder):
             self.change_verts()
             self._needs_rebuild = False
 
+    @property
+    def biome_tint_size(self) -> int:
+        # the chunk is drawn with the biome tint texture of its region
+        return self._region_size * 16
+
     @property
     def _level(self) -> BaseLevel:
         return self._level_()
@@ -94,8 +112,17 @@ class RenderChunk(RenderChunkBuilder):
     def chunk_state(self) -> int:
         return self._chunk_state
 
+    @property
+    def validated(self) -> bool:
+        """False if the geometry was loaded from the mesh cache and has not been compared with the chunk yet."""
+        return self._cached_content_hash is None
+
     def needs_rebuild(self):
         """has the chunk data changed since the last rebuild"""
+        if not self.validated:
+            # Geometry from the mesh cache is validated separately by refresh_biomes.
+            # Loading the chunk here would defeat the point of the cache.
+            return False
         try:
             chunk = self.chunk
         except ChunkDoesNotExist:
@@ -182,19 +209,146 @@ class RenderChunk(RenderChunkBuilder):
         else:
             self._changed_time = chunk.changed_time
             self._chunk_state = 2
-            chunk_verts, chunk_verts_translucent = self._create_lod0_multi(
-                self._sub_chunks(chunk.blocks)
+            sub_chunks = self._sub_chunks(chunk.blocks)
+            self._block_hash = self._block_data_hash(sub_chunks)
+            self._set_biome_tints(chunk)
+            if self._mesh_cache is None:
+                self._create_chunk_geometry(sub_chunks)
+            else:
+                content_hash = self._content_hash(sub_chunks)
+                cached = self._mesh_cache.get(self.dimension, self.cx, self.cz)
+                if cached is None or cached.content_hash != content_hash:
+                    self._create_chunk_geometry(sub_chunks)
+                    self._mesh_cache.put(
+                        self.dimension,
+                        self.cx,
+                        self.cz,
+                        content_hash,
+                        self.verts,
+                        self.verts_translucent,
+                        self.biome_tints,
+                    )
+                else:
+                    self.verts = cached.verts
+                    self.verts_translucent = cached.verts_translucent
+                    self.draw_count = int(self.verts.size // self._vert_len)
+        self._needs_rebuild = True
+
+    def load_cached_geometry(self) -> bool:
+        """
+        Load the geometry from the mesh cache without loading the chunk.
+        The geometry must later be validated by calling :meth:`refresh_biomes`.
+
+        :return: True if the geometry was loaded. False if there is no cache entry.
+        """
+        if self._mesh_cache is None:
+            return False
+        cached = self._mesh_cache.get(self.dimension, self.cx, self.cz)
+        if cached is None:
+            return False
+        self._chunk_state = 2
+        self._cached_content_hash = cached.content_hash
+        self.verts = cached.verts
+        self.verts_translucent = cached.verts_translucent
+        self.draw_count = int(self.verts.size // self._vert_len)
+        self.biome_tints = cached.biome_tints
+        self.biome_tints_changed = True
+        self._needs_rebuild = True
+        return True
+
+    def refresh_biomes(self) -> bool:
+        """
+        Update the biome tints if the blocks have not changed since the geometry was created.
+        This is much faster than creating the geometry again.
+        This also validates geometry loaded by :meth:`load_cached_geometry`.
+
+        :return: True if the geometry is still valid. False if the geometry needs to be recreated.
+        """
+        if self._chunk_state != 2 or (
+            self._block_hash is None and self._cached_content_hash is None
+        ):
+            return False
+        try:
+            chunk = self.chunk
+        except (ChunkDoesNotExist, ChunkLoadError):
+            return False
+        sub_chunks = self._sub_chunks(chunk.blocks)
+        block_hash = self._block_data_hash(sub_chunks)
+        if self._block_hash is None:
+            if self._content_hash(sub_chunks) != self._cached_content_hash:
+                return False
+            self._block_hash = block_hash
+            self._cached_content_hash = None
+        elif block_hash != self._block_hash:
+            return False
+        self._changed_time = chunk.changed_time
+        self._set_biome_tints(chunk)
+        return True
+
+    def _set_biome_tints(self, chunk: "Chunk"):
+        try:
+            self.biome_tints = create_chunk_biome_tints(chunk)
+        except Exception:
+            log.debug(
+                f"Failed reading the biomes of chunk {self.coords}", exc_info=True
+            )
+            self.biome_tints = None
+        self.biome_tints_changed = True
+
+    @staticmethod
+    def _block_data_hash(sub_chunks: List[Tuple[numpy.ndarray, int]]) -> bytes:
+        """A fast hash of the block arrays. Unlike _content_hash this is only valid within a session."""
+        block_hash = hashlib.sha1()
+        for larger_blocks, y in sub_chunks:
+            block_hash.update(numpy.array([y], numpy.int64))
+            block_hash.update(numpy.ascontiguousarray(larger_blocks))
+        return block_hash.digest()
+
+    def _create_chunk_geometry(self, sub_chunks: List[Tuple[numpy.ndarray, int]]):
+        """Mesh the sub-chunks and add the floor and ceiling if required."""
+        chunk_verts, chunk_verts_translucent = self._create_lod0_multi(sub_chunks)
+        self._set_verts(chunk_verts, chunk_verts_translucent)
+        if self._draw_floor or self._draw_ceil:
+            plane = self._create_grid(
+                "amulet",
+                "amulet_ui/translucent_white",
+                (0.55, 0.5, 0.9) if (self.cx + self.cz) % 2 else (0.4, 0.4, 0.85),
             )
-            self._set_verts(chunk_verts, chunk_verts_translucent)
-            if self._draw_floor or self._draw_ceil:
-                plane = self._create_grid(
-                    "amulet",
-                    "amulet_ui/translucent_white",
-                    (0.55, 0.5, 0.9) if (self.cx + self.cz) % 2 else (0.4, 0.4, 0.85),
+            self.verts = numpy.concatenate([self.verts, plane.ravel()], 0)
+            self.draw_count += len(plane)
+
+    def _content_hash(self, sub_chunks: List[Tuple[numpy.ndarray, int]]) -> bytes:
+        """Create a hash of everything the chunk geometry depends on.
+        Block ids are session specific so the hash is computed from the block states.
+
+        :param sub_chunks: The output of _sub_chunks.
+        :return: The hash digest.
+        """
+        content_hash = hashlib.sha1()
+        palette = self.chunk.block_palette
+        content_hash.update(
+            repr(
+                (
+                    self._region_size,
+                    self._draw_floor,
+                    self._draw_ceil,
+                    self._limit_bounds,
+                    [
+                        (box.min, box.max)
+                        for box in self._level.bounds(self.dimension).selection_boxes
+                    ]
+                    if self._draw_floor or self._draw_ceil or self._limit_bounds
+                    else None,
                 )
-                self.verts = numpy.concatenate([self.verts, plane.ravel()], 0)
-                self.draw_count += len(plane)
-        self._needs_rebuild = True
+            ).encode("utf-8")
+        )
+        for larger_blocks, y in sub_chunks:
+            unique_blocks, inverse = numpy.unique(larger_blocks, return_inverse=True)
+            content_hash.update(numpy.array([y, unique_blocks.size], numpy.int64))
+            for block_id in unique_blocks:
+                content_hash.update(palette[block_id].full_blockstate.encode("utf-8"))
+            content_hash.update(inverse.astype(numpy.uint32))
+        return content_hash.digest()
 
     def _create_empty_geometry(self):
         if self._draw_floor:
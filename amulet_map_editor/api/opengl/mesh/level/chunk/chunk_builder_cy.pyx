@@ -13,6 +13,8 @@ cdef extern from "stdlib.h":
 
 from cpython cimport array
 import array
+
+from .biome_tint import TintClassNone, get_block_tint_class, get_tint_class
 from cython.parallel import prange
 
 cdef extern from *:
@@ -441,6 +443,11 @@ def _extend_blocks(resource_pack, block_palette):
         model = resource_pack.get_block_model(
             block_palette[block_id]
         )
+        # the translation is only needed for models with tinted faces
+        if any(numpy.any(tint != 1) for tint in model.tint_verts.values()):
+            block_tint_class = get_block_tint_class(resource_pack.translator, block_palette[block_id])
+        else:
+            block_tint_class = TintClassNone
         vert_map = {}
         for py_cull_dir in model.faces.keys():
             if py_cull_dir in CULL_STR_INDEX:
@@ -460,10 +467,14 @@ def _extend_blocks(resource_pack, block_palette):
                     py_vert_table[vert_index : vert_index + 3, 5:9] = resource_pack.texture_bounds(model.textures[texture_index])
                     vert_index += 3
 
-                py_vert_table[:, 9:12] = (
-                    model.tint_verts[py_cull_dir].reshape((-1, 3))[faces]
-                    * _brightness_multiplier[py_cull_dir]
-                )
+                tint = model.tint_verts[py_cull_dir].reshape((-1, 3))[faces]
+                py_vert_table[:, 9:12] = tint * _brightness_multiplier[py_cull_dir]
+                # biome tinted faces store the tint class and shading. The colour is looked up in the shader.
+                tint_class = get_tint_class(block_tint_class, tint)
+                biome_tinted = tint_class != 0
+                py_vert_table[biome_tinted, 9] = -tint_class[biome_tinted].astype(numpy.float32)
+                py_vert_table[biome_tinted, 10] = _brightness_multiplier[py_cull_dir][0]
+                py_vert_table[biome_tinted, 11] = 0
                 vert_map[py_cull_dir] = py_vert_table
         block_model_manager.add_block(vert_map, model.is_transparent)
 
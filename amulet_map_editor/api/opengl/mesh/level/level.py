@@ -1,4 +1,5 @@
-from typing import TYPE_CHECKING, Generator, Optional, Any
+from typing import TYPE_CHECKING, Generator, Optional, Any, Sequence, Dict, Set
+from collections import OrderedDict
 import numpy
 import time
 import logging
@@ -7,6 +8,7 @@ from amulet.api.data_types import Dimension, ChunkCoordinates
 
 from .chunk import RenderChunk
 from .region import ChunkManager
+from .mesh_cache import ChunkMeshCache
 from .selection import GreenRenderSelectionGroup
 from amulet_map_editor.api.opengl.data_types import (
     CameraLocationType,
@@ -28,6 +30,9 @@ log = logging.getLogger(__name__)
 class RenderLevel(OpenGLResourcePackManager, Drawable, ThreadedObject, ContextManager):
     """A RenderLevel holds a reference to a level and manages all the geometry and drawing for that level."""
 
+    # The maximum number of bytes of vertex data to keep for dimensions that are not being displayed.
+    dimension_cache_budget = 256 * 2**20
+
     def __init__(
         self,
         context_identifier: Any,
@@ -64,6 +69,12 @@ class RenderLevel(OpenGLResourcePackManager, Drawable, ThreadedObject, ContextMa
         self._limit_bounds = limit_bounds
         self._selection = None
         self._chunk_manager = ChunkManager(self.context_identifier, self.resource_pack)
+        # The chunk managers for dimensions that are not currently displayed.
+        # These are kept so that switching back to a dimension does not need to rebuild all the geometry.
+        # Ordered from least to most recently used.
+        self._dimension_chunk_managers: "OrderedDict[Dimension, ChunkManager]" = (
+            OrderedDict()
+        )
 
         self._last_rebuild_camera_location: Optional[
             numpy.ndarray
@@ -73,6 +84,12 @@ class RenderLevel(OpenGLResourcePackManager, Drawable, ThreadedObject, ContextMa
         )
         self._chunk_rebuilds = self._rebuild_generator()
         self._rebuild_time = 0
+        # the number of chunks within the render distance still waiting to be loaded
+        self._chunk_backlog = 0
+        self._mesh_cache_enabled = False
+        self._mesh_cache: Optional[ChunkMeshCache] = None
+        # The chunks in each dimension whose geometry was loaded from the mesh cache and still needs validating.
+        self._unvalidated_chunks: Dict[Dimension, Set[ChunkCoordinates]] = {}
 
     @property
     def level(self) -> "BaseLevel":
@@ -82,6 +99,47 @@ class RenderLevel(OpenGLResourcePackManager, Drawable, ThreadedObject, ContextMa
     def chunk_manager(self) -> ChunkManager:
         return self._chunk_manager
 
+    @property
+    def chunk_backlog(self) -> int:
+        """The number of chunks waiting to be meshed or merged into the chunk manager.
+        This is an approximation of how far behind the chunk pipeline is."""
+        return self._chunk_backlog + self.chunk_manager.pending_chunk_count
+
+    @property
+    def mesh_cache_enabled(self) -> bool:
+        """Should chunk geometry be cached on disk so that it can be reused when the level is next opened."""
+        return self._mesh_cache_enabled
+
+    @mesh_cache_enabled.setter
+    def mesh_cache_enabled(self, mesh_cache_enabled: bool):
+        self._mesh_cache_enabled = bool(mesh_cache_enabled)
+        if not self._mesh_cache_enabled:
+            self._close_mesh_cache()
+
+    def _get_mesh_cache(self) -> Optional[ChunkMeshCache]:
+        """Get the mesh cache, opening it if required. None if the cache is disabled or unavailable."""
+        if (
+            self._mesh_cache_enabled
+            and self._mesh_cache is None
+            and self.resource_pack.cache_key is not None
+        ):
+            try:
+                self._mesh_cache = ChunkMeshCache(
+                    self.level.level_path,
+                    f"{self.resource_pack.cache_key}-{RenderChunk._vert_len}",
+                )
+            except Exception:
+                log.warning(
+                    "Failed opening the chunk mesh cache. Disabling it.", exc_info=True
+                )
+                self._mesh_cache_enabled = False
+        return self._mesh_cache
+
+    def _close_mesh_cache(self):
+        if self._mesh_cache is not None:
+            self._mesh_cache.close()
+            self._mesh_cache = None
+
     def is_closeable(self):
         return True
 
@@ -131,15 +189,60 @@ class RenderLevel(OpenGLResourcePackManager, Drawable, ThreadedObject, ContextMa
                 # if the rebuild flag has been set go to the beginning
                 if self._needs_rebuild:
                     continue
+                self._chunk_backlog = len(chunk_not_loaded)
                 for chunk_coords in chunk_not_loaded:
                     # if the rebuild flag has been set go to the beginning
                     if self._needs_rebuild:
                         break
+                    self._chunk_backlog -= 1
                     yield chunk_coords
             else:
-                yield None
+                self._chunk_backlog = 0
+                # Once everything else is done validate the geometry loaded from the mesh cache.
+                yield self._pop_unvalidated_chunk()
+
+    def _pop_unvalidated_chunk(self) -> Optional[ChunkCoordinates]:
+        """
+        Get the closest chunk loaded from the mesh cache that is ready to be validated.
 
-    def thread_action(self):
+        :return: The chunk coordinates or None if there are no chunks to validate.
+        """
+        unvalidated_chunks = self._unvalidated_chunks.get(self.dimension)
+        if not unvalidated_chunks:
+            return None
+        cx, cz = int(self.camera_location[0]) >> 4, int(self.camera_location[2]) >> 4
+        closest = None
+        closest_distance = None
+        for chunk_coords in list(unvalidated_chunks):
+            if chunk_coords not in self.chunk_manager:
+                # the chunk has been unloaded
+                unvalidated_chunks.discard(chunk_coords)
+            elif self.chunk_manager.render_chunk_in_main_database(chunk_coords):
+                distance = abs(chunk_coords[0] - cx) + abs(chunk_coords[1] - cz)
+                if closest_distance is None or distance < closest_distance:
+                    closest = chunk_coords
+                    closest_distance = distance
+        if closest is not None:
+            unvalidated_chunks.discard(closest)
+        return closest
+
+    def _refresh_biomes(self, chunk_coords: ChunkCoordinates) -> bool:
+        """
+        Try updating the biome tints of an existing chunk without recreating its geometry.
+        This also validates geometry that was loaded from the mesh cache.
+
+        :param chunk_coords: The chunk to update.
+        :return: True if the existing geometry is still valid.
+        """
+        if not self.chunk_manager.render_chunk_in_main_database(chunk_coords):
+            return False
+        try:
+            return self.chunk_manager.get_render_chunk(chunk_coords).refresh_biomes()
+        except Exception:
+            log.debug(f"Failed refreshing chunk {chunk_coords}", exc_info=True)
+            return False
+
+    def thread_action(self) -> bool:
         # first check if there is a chunk that exists and needs rebuilding
         camera = numpy.asarray(self.camera_location)[[0, 2]]
         if self._last_rebuild_camera_location is None or numpy.sum(
@@ -150,7 +253,10 @@ class RenderLevel(OpenGLResourcePackManager, Drawable, ThreadedObject, ContextMa
             self._last_rebuild_camera_location = camera
 
         chunk_coords = next(self._chunk_rebuilds)
-        if chunk_coords is not None:
+        if chunk_coords is not None and self._refresh_biomes(chunk_coords):
+            # only the biomes changed so the existing geometry is still valid
+            pass
+        elif chunk_coords is not None:
             # generate the chunk
             chunk = RenderChunk(
                 self.context_identifier,
@@ -162,15 +268,24 @@ class RenderLevel(OpenGLResourcePackManager, Drawable, ThreadedObject, ContextMa
                 draw_floor=self.draw_floor,
                 draw_ceil=self.draw_ceil,
                 limit_bounds=self._limit_bounds,
+                mesh_cache=self._get_mesh_cache(),
             )
 
-            try:
-                chunk.create_geometry()
-            except:
-                log.error(
-                    f"Failed generating chunk geometry for chunk {chunk_coords}",
-                    exc_info=True,
+            if chunk_coords not in self.chunk_manager and self._load_cached_geometry(
+                chunk
+            ):
+                # Display the cached geometry now and validate it once everything else is loaded.
+                self._unvalidated_chunks.setdefault(self.dimension, set()).add(
+                    chunk_coords
                 )
+            else:
+                try:
+                    chunk.create_geometry()
+                except:
+                    log.error(
+                        f"Failed generating chunk geometry for chunk {chunk_coords}",
+                        exc_info=True,
+                    )
 
             self.chunk_manager.add_render_chunk(chunk)
 
@@ -179,6 +294,19 @@ class RenderLevel(OpenGLResourcePackManager, Drawable, ThreadedObject, ContextMa
             self._rebuild_time = t
             self.chunk_manager.rebuild()
 
+        return chunk_coords is not None
+
+    @staticmethod
+    def _load_cached_geometry(chunk: RenderChunk) -> bool:
+        try:
+            return chunk.load_cached_geometry()
+        except Exception:
+            log.debug(
+                f"Failed loading cached geometry for chunk {chunk.coords}",
+                exc_info=True,
+            )
+            return False
+
     def enable(self):
         """Enable chunk generation in a new thread."""
         self._needs_rebuild = True
@@ -189,6 +317,7 @@ class RenderLevel(OpenGLResourcePackManager, Drawable, ThreadedObject, ContextMa
 
     def close(self):
         self.unload()
+        self._close_mesh_cache()
 
     @property
     def camera_location(self) -> CameraLocationType:
@@ -220,10 +349,47 @@ class RenderLevel(OpenGLResourcePackManager, Drawable, ThreadedObject, ContextMa
 
     @dimension.setter
     def dimension(self, dimension: Dimension):
-        self._dimension = dimension
-        self.run_garbage_collector(True)
+        if dimension != self._dimension:
+            self._cache_chunk_manager()
+            chunk_manager = self._dimension_chunk_managers.pop(dimension, None)
+            if chunk_manager is None:
+                chunk_manager = ChunkManager(
+                    self.context_identifier, self.resource_pack
+                )
+            self._chunk_manager = chunk_manager
+            self._dimension = dimension
+            self._level.unload()
+        else:
+            self.run_garbage_collector(True)
         self._needs_rebuild = True
 
+    def _cache_chunk_manager(self):
+        """Store the chunk manager for the current dimension so that it can be restored later.
+        The least recently used dimensions are unloaded if the cache exceeds dimension_cache_budget."""
+        self._dimension_chunk_managers[self._dimension] = self._chunk_manager
+        self._dimension_chunk_managers.move_to_end(self._dimension)
+        memory_usage = sum(
+            chunk_manager.memory_usage
+            for chunk_manager in self._dimension_chunk_managers.values()
+        )
+        while (
+            self._dimension_chunk_managers
+            and memory_usage > self.dimension_cache_budget
+        ):
+            dimension, chunk_manager = self._dimension_chunk_managers.popitem(
+                last=False
+            )
+            self._unvalidated_chunks.pop(dimension, None)
+            memory_usage -= chunk_manager.memory_usage
+            chunk_manager.unload()
+
+    def _clear_dimension_cache(self):
+        """Unload the geometry for all dimensions that are not currently displayed."""
+        for dimension, chunk_manager in self._dimension_chunk_managers.items():
+            self._unvalidated_chunks.pop(dimension, None)
+            chunk_manager.unload()
+        self._dimension_chunk_managers.clear()
+
     @property
     def render_distance(self) -> int:
         """The radius around the camera within which to load chunks."""
@@ -270,7 +436,15 @@ class RenderLevel(OpenGLResourcePackManager, Drawable, ThreadedObject, ContextMa
             length += 1
 
     def draw(self, camera_matrix: TransformationMatrix):
-        self._chunk_manager.draw(camera_matrix, self.camera_location)
+        self.draw_instances((camera_matrix,))
+
+    def draw_instances(self, camera_matrices: Sequence[TransformationMatrix]):
+        """Draw the level once for each camera matrix.
+        The geometry is shared between all the instances.
+
+        :param camera_matrices: The transformation matrix of each instance.
+        """
+        self._chunk_manager.draw_instances(camera_matrices, self.camera_location)
         if self._draw_box:
             if self._selection is None:
                 self._selection = GreenRenderSelectionGroup(
@@ -278,13 +452,16 @@ class RenderLevel(OpenGLResourcePackManager, Drawable, ThreadedObject, ContextMa
                     self.resource_pack,
                     self.level.bounds(self.dimension),
                 )
-            self._selection.draw(
-                camera_matrix,
-                self.camera_location,
-            )
+            for camera_matrix in camera_matrices:
+                self._selection.draw(
+                    camera_matrix,
+                    self.camera_location,
+                )
 
     def run_garbage_collector(self, remove_all=False):
         if remove_all:
+            self._clear_dimension_cache()
+            self._unvalidated_chunks.pop(self._dimension, None)
             self._chunk_manager.unload()
             self._level.unload()
         else:
@@ -300,7 +477,16 @@ class RenderLevel(OpenGLResourcePackManager, Drawable, ThreadedObject, ContextMa
 
     def _rebuild(self):
         """Unload all the chunks so they can be rebuilt."""
+        # the resource pack may have changed so the cache key needs to be recomputed
+        self._close_mesh_cache()
+        self._clear_dimension_cache()
+        self._unvalidated_chunks.clear()
         self._chunk_manager.unload()
+        # the chunk manager and selection hold the resource pack so must be recreated
+        self._chunk_manager = ChunkManager(self.context_identifier, self.resource_pack)
+        if self._selection is not None:
+            self._selection.unload()
+            self._selection = None
         self._needs_rebuild = True
 
     def rebuild_changed(self):
@@ -0,0 +1,205 @@
+import os
+import time
+import hashlib
+import sqlite3
+import zlib
+import logging
+from typing import Optional, NamedTuple
+
+import numpy
+
+from amulet.api.data_types import Dimension
+
+from amulet_map_editor.api.cache_database import CacheDatabase
+
+log = logging.getLogger(__name__)
+
+# Increment this if the vertex format or the way the vertices are created changes.
+_MeshCacheVersion = 4
+# The maximum number of bytes of compressed vertex data to store for one level.
+# The least recently used entries are removed when this is exceeded.
+MaxCacheSize = 512 * 2**20
+# The maximum number of level databases to keep. The least recently used are deleted.
+MaxCacheDatabases = 16
+
+
+class CachedChunkMesh(NamedTuple):
+    """The data stored in the mesh cache for a chunk."""
+
+    content_hash: bytes
+    verts: numpy.ndarray
+    verts_translucent: int
+    biome_tints: Optional[numpy.ndarray]
+
+
+class ChunkMeshCache:
+    """A persistent on-disk cache of chunk vertex data.
+
+    There is one database per level.
+    Each entry is keyed by dimension and chunk coordinates and stores a hash of the chunk content.
+    Entries can be read without the chunk so that the geometry can be displayed before the chunk is loaded.
+    The caller is then responsible for validating the entry against the content hash once the chunk is loaded.
+    The database also stores a key describing everything else the geometry depends on
+    (resource packs, texture atlas, mesh settings). If this differs the database is cleared.
+    The least recently used entries are removed once the database exceeds :attr:`MaxCacheSize`
+    and the least recently used databases are deleted once there are more than :attr:`MaxCacheDatabases`.
+
+    This class is thread safe.
+    """
+
+    def __init__(self, level_path: str, cache_key: str):
+        """
+        Open the mesh cache for a level.
+
+        :param level_path: The path of the level. Used to find the database.
+        :param cache_key: A key describing the resource packs and settings the geometry was created with.
+        """
+        self._cache_key = f"{_MeshCacheVersion}-{cache_key}"
+        self._size = 0
+        self._database = CacheDatabase(
+            "chunk_mesh",
+            hashlib.sha1(os.path.abspath(level_path).encode("utf-8")).hexdigest(),
+            self._create_tables,
+            MaxCacheDatabases,
+        )
+        self._database.get_db()
+
+    def _create_tables(self, db: sqlite3.Connection):
+        db.execute("CREATE TABLE IF NOT EXISTS meta (cache_key TEXT NOT NULL)")
+        row = db.execute("SELECT cache_key FROM meta").fetchone()
+        if row is None or row[0] != self._cache_key:
+            # The resource packs, settings or table layout have changed so all the geometry is invalid.
+            db.execute("DROP TABLE IF EXISTS meshes")
+            db.execute("DELETE FROM meta")
+            db.execute("INSERT INTO meta (cache_key) VALUES (?)", (self._cache_key,))
+        db.execute(
+            "CREATE TABLE IF NOT EXISTS meshes ("
+            "dimension TEXT NOT NULL, "
+            "cx INTEGER NOT NULL, "
+            "cz INTEGER NOT NULL, "
+            "content_hash BLOB NOT NULL, "
+            "verts_translucent INTEGER NOT NULL, "
+            "verts BLOB NOT NULL, "
+            "biome_tints BLOB, "
+            "last_used INTEGER NOT NULL, "
+            "PRIMARY KEY (dimension, cx, cz))"
+        )
+        self._evict(db)
+
+    def get(
+        self,
+        dimension: Dimension,
+        cx: int,
+        cz: int,
+    ) -> Optional[CachedChunkMesh]:
+        """
+        Get the cached data for a chunk.
+        The entry may be out of date. The caller must compare the content hash once the chunk is loaded.
+
+        :param dimension: The dimension the chunk is in.
+        :param cx: The chunk x coordinate.
+        :param cz: The chunk z coordinate.
+        :return: The cached data or None if there is no entry.
+        """
+        with self._database.lock:
+            db = self._database.get_db()
+            if db is None:
+                return None
+            row = db.execute(
+                "SELECT content_hash, verts_translucent, verts, biome_tints FROM meshes "
+                "WHERE dimension=? AND cx=? AND cz=?",
+                (dimension, cx, cz),
+            ).fetchone()
+            if row is None:
+                return None
+            db.execute(
+                "UPDATE meshes SET last_used=? WHERE dimension=? AND cx=? AND cz=?",
+                (int(time.time()), dimension, cx, cz),
+            )
+            self._database.count_write()
+        content_hash, verts_translucent, verts, biome_tints = row
+        try:
+            verts = numpy.frombuffer(zlib.decompress(verts), numpy.float32).copy()
+        except zlib.error:
+            log.debug(f"Corrupt mesh cache entry for chunk {cx}, {cz}")
+            return None
+        if biome_tints is not None:
+            biome_tints = (
+                numpy.frombuffer(biome_tints, numpy.uint8)
+                .reshape((-1, 16, 16, 4))
+                .copy()
+            )
+        return CachedChunkMesh(content_hash, verts, verts_translucent, biome_tints)
+
+    def put(
+        self,
+        dimension: Dimension,
+        cx: int,
+        cz: int,
+        content_hash: bytes,
+        verts: numpy.ndarray,
+        verts_translucent: int,
+        biome_tints: Optional[numpy.ndarray],
+    ):
+        """
+        Store the vertex data for a chunk.
+
+        :param dimension: The dimension the chunk is in.
+        :param cx: The chunk x coordinate.
+        :param cz: The chunk z coordinate.
+        :param content_hash: The hash of the chunk content the vertices were created from.
+        :param verts: The vertex array.
+        :param verts_translucent: The offset into the vertex array from which the faces can be translucent.
+        :param biome_tints: The biome tints of the chunk. See create_chunk_biome_tints.
+        """
+        data = zlib.compress(numpy.ascontiguousarray(verts, numpy.float32).data, 1)
+        if biome_tints is not None:
+            biome_tints = numpy.ascontiguousarray(biome_tints, numpy.uint8).tobytes()
+        with self._database.lock:
+            db = self._database.get_db()
+            if db is None:
+                return
+            db.execute(
+                "INSERT OR REPLACE INTO meshes "
+                "(dimension, cx, cz, content_hash, verts_translucent, verts, biome_tints, last_used) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    dimension,
+                    cx,
+                    cz,
+                    content_hash,
+                    verts_translucent,
+                    data,
+                    biome_tints,
+                    int(time.time()),
+                ),
+            )
+            self._size += len(data)
+            if self._size > MaxCacheSize:
+                self._evict(db)
+            self._database.count_write()
+
+    def _evict(self, db: sqlite3.Connection):
+        """Remove the least recently used entries until the database is below 3/4 of MaxCacheSize.
+        The lock must be held."""
+        self._size = db.execute(
+            "SELECT COALESCE(SUM(LENGTH(verts)), 0) FROM meshes"
+        ).fetchone()[0]
+        if self._size > MaxCacheSize:
+            target = MaxCacheSize * 3 // 4
+            removed = 0
+            rows = db.execute(
+                "SELECT rowid, LENGTH(verts) FROM meshes ORDER BY last_used, rowid"
+            ).fetchall()
+            remove = []
+            for rowid, size in rows:
+                if self._size - removed <= target:
+                    break
+                remove.append((rowid,))
+                removed += size
+            db.executemany("DELETE FROM meshes WHERE rowid=?", remove)
+            self._size -= removed
+
+    def close(self):
+        """Write all pending changes and close the database."""
+        self._database.close()
@@ -4,11 +4,30 @@ from OpenGL.GL import (
     glBindBuffer,
     GL_ARRAY_BUFFER,
     glBufferSubData,
+    glGenTextures,
+    glDeleteTextures,
+    glBindTexture,
+    glActiveTexture,
+    glTexParameteri,
+    glTexImage2D,
+    glTexSubImage2D,
+    GL_TEXTURE_2D,
+    GL_TEXTURE0,
+    GL_TEXTURE1,
+    GL_TEXTURE_MIN_FILTER,
+    GL_TEXTURE_MAG_FILTER,
+    GL_TEXTURE_WRAP_S,
+    GL_TEXTURE_WRAP_T,
+    GL_LINEAR,
+    GL_CLAMP_TO_EDGE,
+    GL_RGBA,
+    GL_UNSIGNED_BYTE,
 )
-from typing import Dict, Tuple, Optional
+from typing import Dict, Tuple, Optional, Sequence
 import numpy
 import queue
 from .chunk import RenderChunk
+from .chunk.biome_tint import default_biome_tints, TintClassCount
 from amulet_map_editor.api.opengl.mesh.tri_mesh import TriMesh
 from amulet_map_editor.api.opengl.resource_pack import OpenGLResourcePack
 from amulet_map_editor.api.opengl.matrix import displacement_matrix
@@ -45,6 +64,16 @@ class ChunkManager:
             and self.get_render_chunk(chunk_coords).needs_rebuild()
         )
 
+    @property
+    def pending_chunk_count(self) -> int:
+        """The number of chunks that have been added but not yet merged into the main database."""
+        return self._chunk_temp.qsize()
+
+    @property
+    def memory_usage(self) -> int:
+        """An estimate of the number of bytes of vertex data held by this manager."""
+        return sum(region.memory_usage for region in self._regions.values())
+
     def get_render_chunk(self, chunk_coords: Tuple[int, int]) -> RenderChunk:
         """Get a RenderChunk from the database.
         Might throw a key error if it has not been added to the real database yet."""
@@ -84,6 +113,14 @@ class ChunkManager:
         return cx // self.region_size, cz // self.region_size
 
     def draw(self, camera_matrix: TransformationMatrix, camera):
+        self.draw_instances((camera_matrix,), camera)
+
+    def draw_instances(self, camera_matrices: Sequence[TransformationMatrix], camera):
+        """Draw the chunks once for each camera matrix.
+
+        :param camera_matrices: The transformation matrix of each instance.
+        :param camera: The location of the camera in the level. Used to sort the regions.
+        """
         cam_rx, cam_rz = numpy.floor(
             numpy.array(camera)[[0, 2]] / (16 * self.region_size)
         )
@@ -93,7 +130,7 @@ class ChunkManager:
             key=lambda x: abs(x.rx - cam_rx) + abs(x.rz - cam_rz),
             reverse=True,
         ):
-            region.draw(camera_matrix, cam_cx, cam_cz)
+            region.draw_instances(camera_matrices, cam_cx, cam_cz)
         self._merge_chunk_temp()
 
     def unload(self, safe_area: Tuple[int, int, int, int] = None):
@@ -160,6 +197,14 @@ class RenderRegion(TriMesh):
         self.region_transform = displacement_matrix(
             rx * region_size * 16, 0, rz * region_size * 16
         )
+        self._region_size = region_size
+        # A texture containing the biome tint of each block column in the region.
+        # The rows for each tint class are stacked vertically.
+        self._biome_tint_texture = None
+
+    @property
+    def biome_tint_size(self) -> int:
+        return self._region_size * 16
 
     @property
     def vertex_usage(self):
@@ -171,6 +216,11 @@ class RenderRegion(TriMesh):
     def __contains__(self, item):
         return item in self._chunks
 
+    @property
+    def memory_usage(self) -> int:
+        """The number of bytes of vertex data held by the chunks in this region."""
+        return sum(chunk.verts.nbytes for chunk in self._chunks.values())
+
     def add_render_chunk(self, render_chunk: RenderChunk):
         """Add a chunk to the region"""
         chunk_coords = (render_chunk.cx, render_chunk.cz)
@@ -261,20 +311,85 @@ class RenderRegion(TriMesh):
                 if chunk is not None:
                     chunk.unload()
 
+    def _update_biome_tint_texture(self):
+        """Create the biome tint texture if required and copy in the tints of chunks that have changed."""
+        size = self._region_size * 16
+        upload_all = self._biome_tint_texture is None
+        if upload_all:
+            self._biome_tint_texture = glGenTextures(1)
+            glBindTexture(GL_TEXTURE_2D, self._biome_tint_texture)
+            # linear filtering blends the tint between neighbouring columns
+            glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MIN_FILTER, GL_LINEAR)
+            glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MAG_FILTER, GL_LINEAR)
+            glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_WRAP_S, GL_CLAMP_TO_EDGE)
+            glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_WRAP_T, GL_CLAMP_TO_EDGE)
+            glTexImage2D(
+                GL_TEXTURE_2D,
+                0,
+                GL_RGBA,
+                size,
+                size * TintClassCount,
+                0,
+                GL_RGBA,
+                GL_UNSIGNED_BYTE,
+                default_biome_tints(size, size),
+            )
+        else:
+            glBindTexture(GL_TEXTURE_2D, self._biome_tint_texture)
+
+        for chunk in list(self._chunks.values()):
+            if chunk.biome_tints_changed or upload_all:
+                chunk.biome_tints_changed = False
+                biome_tints = chunk.biome_tints
+                if biome_tints is None:
+                    continue
+                x, _, z = chunk.offset
+                for tint_class in range(TintClassCount):
+                    glTexSubImage2D(
+                        GL_TEXTURE_2D,
+                        0,
+                        int(x),
+                        int(z) + tint_class * size,
+                        16,
+                        16,
+                        GL_RGBA,
+                        GL_UNSIGNED_BYTE,
+                        numpy.ascontiguousarray(biome_tints[tint_class]),
+                    )
+        glBindTexture(GL_TEXTURE_2D, 0)
+
     def unload(self):
         """Unload all opengl data"""
         super().unload()
+        if self._biome_tint_texture is not None:
+            glDeleteTextures([self._biome_tint_texture])
+            self._biome_tint_texture = None
         for chunk in self._chunks.values():
             chunk.unload()
         self._chunks.clear()
 
     def draw(self, camera_matrix: TransformationMatrix, cam_cx, cam_cz):
+        self.draw_instances((camera_matrix,), cam_cx, cam_cz)
+
+    def draw_instances(
+        self, camera_matrices: Sequence[TransformationMatrix], cam_cx, cam_cz
+    ):
         self._create_geometry()
-        transformation_matrix = numpy.matmul(camera_matrix, self.region_transform)
-        super().draw(transformation_matrix)
+        self._update_biome_tint_texture()
+        glActiveTexture(GL_TEXTURE1)
+        glBindTexture(GL_TEXTURE_2D, self._biome_tint_texture)
+        glActiveTexture(GL_TEXTURE0)
+        transformation_matrices = [
+            numpy.matmul(camera_matrix, self.region_transform)
+            for camera_matrix in camera_matrices
+        ]
+        super().draw_instances(transformation_matrices)
         for chunk in sorted(
             self._manual_chunks.values(),
             key=lambda x: abs(x.cx - cam_cx) + abs(x.cz - cam_cz),
             reverse=True,
         ):
-            chunk.draw(transformation_matrix)
+            chunk.draw_instances(transformation_matrices)
+        glActiveTexture(GL_TEXTURE1)
+        glBindTexture(GL_TEXTURE_2D, 0)
+        glActiveTexture(GL_TEXTURE0)
@@ -12,5 +12,6 @@ class GreenRenderSelection(RenderSelection):
 
 
 class GreenRenderSelectionGroup(RenderSelectionGroup):
-    def _new_render_selection(self):
-        return GreenRenderSelection(self._context_identifier, self.resource_pack)
+    @property
+    def box_tint(self) -> Tuple[float, float, float]:
+        return 0.7, 1.0, 0.7
@@ -1,4 +1,4 @@
-from typing import List, Optional, Tuple, Any
+from typing import List, Optional, Tuple, Any, Dict
 import numpy
 from OpenGL.GL import (
     glCullFace,
@@ -35,7 +35,11 @@ TransformType = Tuple[LocationType, ScaleType, RotationType]
 class LevelGroup(
     OpenGLResourcePackManager, Drawable, ThreadedObjectContainer, ContextManager
 ):
-    """A group of RenderLevel classes with transforms"""
+    """A group of RenderLevel classes with transforms.
+
+    Each level can be placed any number of times.
+    All placements of a level share the same geometry and are drawn with their own transform.
+    """
 
     def __init__(
         self,
@@ -45,80 +49,127 @@ class LevelGroup(
         OpenGLResourcePackManager.__init__(self, resource_pack)
         ThreadedObjectContainer.__init__(self)
         ContextManager.__init__(self, context_identifier)
+        # the level objects to be drawn. There is one for each unique level and dimension.
         self._objects: List[RenderLevel] = []
-        self._transforms: List[TransformType] = []
+        # the translation moving the centre of each level to the origin
         self._world_translation: List[LocationType] = []
+        # the index into _objects of each placement
+        self._placement_levels: List[int] = []
+        # the transforms (tuple) applied by the user to each placement
+        self._transforms: List[TransformType] = []
+        # the matrix of the transform applied by the user to each placement
         self._transformation_matrices: List[numpy.ndarray] = []
         self._is_mirrored: List[bool] = []
-        self._active_level_index: Optional[int] = None
+        # the transformation matrices of the placements of each level split by whether they are mirrored.
+        # Each value has shape (placement_count, 4, 4). Created when drawing and cleared when the placements change.
+        self._grouped_matrices: Optional[Dict[Tuple[int, bool], numpy.ndarray]] = None
+        self._active_placement_index: Optional[int] = None
         self._camera_location: LocationType = (0.0, 100.0, 0.0)
 
     @property
     def active_level_index(self) -> Optional[int]:
-        """The index of the active level. None if no level is active."""
-        return self._active_level_index
+        """The index into render_levels of the level of the active placement. None if no placement is active."""
+        if self._active_placement_index is None:
+            return None
+        return self._placement_levels[self._active_placement_index]
+
+    @property
+    def active_placement_index(self) -> Optional[int]:
+        """The index of the active placement. None if no placement is active."""
+        return self._active_placement_index
+
+    @active_placement_index.setter
+    def active_placement_index(self, placement_index: Optional[int]):
+        if placement_index is not None and not (
+            0 <= placement_index < len(self._placement_levels)
+        ):
+            raise IndexError(f"Placement index {placement_index} is out of range.")
+        self._active_placement_index = placement_index
 
     @property
     def render_levels(self) -> Tuple[RenderLevel, ...]:
         return tuple(self._objects)
 
+    @property
+    def placements(self) -> Tuple[Tuple[int, TransformType], ...]:
+        """The index into render_levels and the transform of each placement."""
+        return tuple(zip(self._placement_levels, self._transforms))
+
     @property
     def active_transform(self) -> TransformType:
-        """Get the transform of the active level.
-        If no level is selected will return zeros."""
-        if self._active_level_index is None:
+        """Get the transform of the active placement.
+        If no placement is selected will return zeros."""
+        if self._active_placement_index is None:
             return (0, 0, 0), (0, 0, 0), (0, 0, 0)
-        return self._transforms[self._active_level_index]
+        return self._transforms[self._active_placement_index]
 
     @active_transform.setter
     def active_transform(self, location_scale_rotation: TransformType):
-        """Set the transform for the active object.
-        Has no effect if there is no active object.
+        """Set the transform for the active placement.
+        Has no effect if there is no active placement.
         :param location_scale_rotation: The location, scale and rotation
         :return:
         """
-        if self._active_level_index is not None:
-            location, scale, rotation = location_scale_rotation
-            self._transforms[self._active_level_index] = (location, scale, rotation)
-            self._is_mirrored[self._active_level_index] = bool(
-                sum(1 for s in scale if s < 0) % 2
-            )
-            self._transformation_matrices[self._active_level_index] = numpy.matmul(
-                transform_matrix(scale, rotation, location),
-                displacement_matrix(*self._world_translation[self._active_level_index]),
-            )
+        if self._active_placement_index is not None:
+            self._set_transform(self._active_placement_index, *location_scale_rotation)
             self._set_camera_location()
 
+    def _set_transform(
+        self,
+        placement_index: int,
+        location: LocationType,
+        scale: ScaleType,
+        rotation: RotationType,
+    ):
+        self._transforms[placement_index] = (location, scale, rotation)
+        self._is_mirrored[placement_index] = bool(sum(1 for s in scale if s < 0) % 2)
+        self._transformation_matrices[placement_index] = numpy.matmul(
+            transform_matrix(scale, rotation, location),
+            displacement_matrix(
+                *self._world_translation[self._placement_levels[placement_index]]
+            ),
+        )
+        self._grouped_matrices = None
+
     def set_camera_location(self, x: float, y: float, z: float):
         """Set the location of the camera for each of the levels."""
         self._camera_location = (x, y, z)
         self._set_camera_location()
 
     def _set_camera_location(self):
-        for level, transform in zip(self._objects, self._transformation_matrices):
+        # Chunks are loaded around the camera location in each level.
+        # If a level is placed more than once use the placement closest to the camera.
+        camera_locations: List[Optional[numpy.ndarray]] = [None] * len(self._objects)
+        camera_distances = [float("inf")] * len(self._objects)
+        for level_index, transform in zip(
+            self._placement_levels, self._transformation_matrices
+        ):
             try:
-                level.camera_location = numpy.matmul(
+                camera_location = numpy.matmul(
                     numpy.linalg.inv(transform), (*self._camera_location, 1)
-                ).tolist()[:-1]
+                )[:-1]
             except numpy.linalg.LinAlgError:
-                pass
+                continue
+            distance = numpy.linalg.norm(
+                camera_location + self._world_translation[level_index]
+            )
+            if distance < camera_distances[level_index]:
+                camera_distances[level_index] = distance
+                camera_locations[level_index] = camera_location
+        for level, camera_location in zip(self._objects, camera_locations):
+            if camera_location is not None:
+                level.camera_location = camera_location.tolist()
 
     def set_camera_rotation(self, yaw: float, pitch: float):
         """Set the rotation of the camera for each of the levels."""
         for level in self._objects:
             level.camera_rotation = yaw, pitch
 
-    def append(
-        self,
-        level: BaseLevel,
-        dimension: Dimension,
-        location: LocationType,
-        scale: ScaleType,
-        rotation: RotationType,
-    ):
-        """Append a level to the list and activate it."""
-        # TODO: update this to support multiple levels
-        self.clear()
+    def _get_level_index(self, level: BaseLevel, dimension: Dimension) -> int:
+        """Get the index of the RenderLevel for a level and dimension, creating it if it does not exist."""
+        for level_index, render_level in enumerate(self._objects):
+            if render_level.level is level and render_level.dimension == dimension:
+                return level_index
         render_level = RenderLevel(
             self.context_identifier,
             self._resource_pack,
@@ -127,11 +178,7 @@ class LevelGroup(
             limit_bounds=True,
         )
         render_level.dimension = dimension
-        # the level objects to be drawn
         self.register(render_level)
-        # the transforms (tuple) applied by the user
-        self._transforms.append((location, scale, rotation))
-        self._is_mirrored.append(bool(sum(1 for s in scale if s < 0) % 2))
         self._world_translation.append(
             (
                 -(
@@ -143,17 +190,76 @@ class LevelGroup(
                 ).astype(int)
             ).tolist()
         )
-        # the matrix of the transform applied by the user
-        self._transformation_matrices.append(
-            numpy.matmul(
-                transform_matrix(scale, rotation, location),
-                displacement_matrix(*self._world_translation[-1]),
-            )
+        return len(self._objects) - 1
+
+    def append(
+        self,
+        level: BaseLevel,
+        dimension: Dimension,
+        location: LocationType,
+        scale: ScaleType,
+        rotation: RotationType,
+    ) -> int:
+        """Place a level and activate the placement.
+        If the level and dimension have already been placed the geometry is shared with the existing placements.
+
+        :param level: The level to place.
+        :param dimension: The dimension in the level to place.
+        :param location: The location of the placement.
+        :param scale: The scale of the placement.
+        :param rotation: The rotation of the placement in radians.
+        :return: The index of the new placement.
+        """
+        placement_index = self.add_placement(
+            self._get_level_index(level, dimension), location, scale, rotation
         )
-        if self._active_level_index is None:
-            self._active_level_index = 0
-        else:
-            self._active_level_index += 1
+        self._active_placement_index = placement_index
+        return placement_index
+
+    def add_placement(
+        self,
+        level_index: int,
+        location: LocationType,
+        scale: ScaleType,
+        rotation: RotationType,
+    ) -> int:
+        """Place an existing level again. The new placement is not activated.
+
+        :param level_index: The index into render_levels of the level to place.
+        :param location: The location of the placement.
+        :param scale: The scale of the placement.
+        :param rotation: The rotation of the placement in radians.
+        :return: The index of the new placement.
+        """
+        if not 0 <= level_index < len(self._objects):
+            raise IndexError(f"Level index {level_index} is out of range.")
+        self._placement_levels.append(level_index)
+        self._transforms.append((location, scale, rotation))
+        self._is_mirrored.append(False)
+        self._transformation_matrices.append(numpy.eye(4))
+        placement_index = len(self._placement_levels) - 1
+        self._set_transform(placement_index, location, scale, rotation)
+        self._set_camera_location()
+        return placement_index
+
+    def remove_placement(self, placement_index: int):
+        """Remove a placement.
+        The level is kept so that it can be placed again without recreating the geometry.
+        Use clear to destroy the levels.
+
+        :param placement_index: The index of the placement to remove.
+        """
+        del self._placement_levels[placement_index]
+        del self._transforms[placement_index]
+        del self._is_mirrored[placement_index]
+        del self._transformation_matrices[placement_index]
+        self._grouped_matrices = None
+        if self._active_placement_index is not None:
+            if self._active_placement_index == placement_index:
+                self._active_placement_index = None
+            elif self._active_placement_index > placement_index:
+                self._active_placement_index -= 1
+        self._set_camera_location()
 
     def enable(self):
         """Enable chunk generation in a new thread."""
@@ -166,32 +272,53 @@ class LevelGroup(
             level.unload()
 
     def clear(self):
-        """Destroy and unload all level objects."""
+        """Destroy and unload all level objects and placements."""
         self.unload()
         for level in self._objects.copy():
             self.unregister(level)
+        self._world_translation.clear()
+        self._placement_levels.clear()
         self._transforms.clear()
         self._is_mirrored.clear()
-        self._world_translation.clear()
         self._transformation_matrices.clear()
-        self._active_level_index = None
+        self._grouped_matrices = None
+        self._active_placement_index = None
 
     def run_garbage_collector(self):
         for level in self._objects:
             level.run_garbage_collector()
 
     def _rebuild(self):
-        self.unload()
+        for level in self._objects:
+            level.resource_pack = self.resource_pack
+
+    def _group_matrices(self) -> Dict[Tuple[int, bool], numpy.ndarray]:
+        """Group the placement matrices by level and mirroring. This is only redone when the placements change."""
+        if self._grouped_matrices is None:
+            grouped: Dict[Tuple[int, bool], List[numpy.ndarray]] = {}
+            for level_index, transform, is_mirrored in zip(
+                self._placement_levels,
+                self._transformation_matrices,
+                self._is_mirrored,
+            ):
+                grouped.setdefault((level_index, is_mirrored), []).append(transform)
+            self._grouped_matrices = {
+                key: numpy.stack(matrices) for key, matrices in grouped.items()
+            }
+        return self._grouped_matrices
 
     def draw(self, camera_matrix: numpy.ndarray):
-        """Draw all of the levels."""
-        for level, transform, is_mirrored in zip(
-            self._objects, self._transformation_matrices, self._is_mirrored
-        ):
-            cull_state = glGetIntegerv(GL_CULL_FACE_MODE)
-            if is_mirrored:
-                glCullFace(GL_FRONT)
-            else:
-                glCullFace(GL_BACK)
-            level.draw(numpy.matmul(camera_matrix, transform))
-            glCullFace(cull_state)
+        """Draw all of the placements.
+        The placements of each level are drawn together so the OpenGL state is only bound once per mesh."""
+        grouped_matrices = self._group_matrices()
+        for level_index, level in enumerate(self._objects):
+            for mirrored in (False, True):
+                transforms = grouped_matrices.get((level_index, mirrored))
+                if transforms is not None:
+                    cull_state = glGetIntegerv(GL_CULL_FACE_MODE)
+                    if mirrored:
+                        glCullFace(GL_FRONT)
+                    else:
+                        glCullFace(GL_BACK)
+                    level.draw_instances(numpy.matmul(camera_matrix, transforms))
+                    glCullFace(cull_state)
@@ -20,7 +20,7 @@ from amulet.api.selection import SelectionBox, SelectionGroup
 from amulet_map_editor.api.opengl.mesh.tri_mesh import TriMesh
 from amulet_map_editor.api.opengl.resource_pack import (
     OpenGLResourcePack,
-    OpenGLResourcePackManagerStatic,
+    OpenGLResourcePackManager,
 )
 from amulet.api.data_types import BlockCoordinatesAny, PointCoordinatesAny
 from amulet_map_editor.api.opengl.matrix import displacement_matrix
@@ -28,7 +28,7 @@ from amulet_map_editor.api.opengl.data_types import RGBColour
 from .colours import colours
 
 
-class RenderSelection(TriMesh, OpenGLResourcePackManagerStatic):
+class RenderSelection(TriMesh, OpenGLResourcePackManager):
     """A drawable selection box"""
 
     def __init__(self, context_identifier: str, resource_pack: OpenGLResourcePack):
@@ -58,6 +58,12 @@ class RenderSelection(TriMesh, OpenGLResourcePackManagerStatic):
         )
         self.verts[:, 9:12] = self.box_tint
 
+    def _rebuild(self):
+        # the texture coordinates and OpenGL state are from the previous resource pack
+        self.unload()
+        self._init_verts()
+        self._mark_recreate()
+
     def __contains__(
         self, position: Union[BlockCoordinatesAny, PointCoordinatesAny]
     ) -> bool:
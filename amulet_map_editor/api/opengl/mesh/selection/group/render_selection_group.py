@@ -1,18 +1,60 @@
+from typing import Optional, Set, Iterable
 import numpy
-from typing import List
+from OpenGL.GL import (
+    GL_TRIANGLES,
+    GL_LINES,
+    GL_DYNAMIC_DRAW,
+    GL_ARRAY_BUFFER,
+    GL_ALWAYS,
+    GL_LEQUAL,
+    GL_FALSE,
+    GL_TRUE,
+    glBindVertexArray,
+    glBindBuffer,
+    glBufferSubData,
+    glDepthFunc,
+    glDepthMask,
+)
 
-from amulet_map_editor.api.opengl import Drawable, ContextManager
+from amulet.api.selection import SelectionGroup
+from amulet.api.data_types import PointCoordinatesAny
+from amulet_map_editor.api.opengl.mesh.tri_mesh import TriMesh
 from amulet_map_editor.api.opengl.resource_pack import (
     OpenGLResourcePack,
-    OpenGLResourcePackManagerStatic,
+    OpenGLResourcePackManager,
 )
-from amulet.api.selection import SelectionGroup, SelectionBox
-from amulet.api.data_types import PointCoordinatesAny
+from amulet_map_editor.api.opengl.matrix import displacement_matrix
+from amulet_map_editor.api.opengl.data_types import RGBColour
 from amulet_map_editor.api.opengl.mesh.selection import RenderSelection
+from ..box.colours import colours
+
+
+def _create_box_templates():
+    # Create a box with the coordinates (min_x, min_y, min_z, max_x, max_y, max_z) = (0, 1, 2, 3, 4, 5)
+    # so that each value in the geometry is the index of the coordinate it was taken from.
+    positions, uvs = RenderSelection._create_box_faces(
+        (0, 1, 2), (3, 4, 5), True, True, True, True, True, True
+    )
+    return positions.astype(numpy.int64), uvs.astype(numpy.int64)
+
 
+# The index into the flattened box bounds of the position and texture coordinates of each vertex of a box.
+BoxPositionIndex, BoxUVIndex = _create_box_templates()
+# The box was drawn as a line strip through the triangle vertices.
+# Each box is now drawn with separate line segments so that the boxes are not joined together.
+BoxLineIndex = numpy.stack([numpy.arange(35), numpy.arange(1, 36)], 1).ravel()
+# The triangle vertices in the reverse winding order. Used to draw the inside of a box.
+BoxReversedIndex = numpy.arange(36).reshape(12, 3)[:, [0, 2, 1]].ravel()
 
-class RenderSelectionGroup(Drawable, ContextManager, OpenGLResourcePackManagerStatic):
-    """A group of selection boxes to be drawn"""
+
+class RenderSelectionGroup(TriMesh, OpenGLResourcePackManager):
+    """A group of selection boxes to be drawn.
+    All boxes are stored in one mesh so that the whole group is drawn with a few draw calls.
+
+    The vertex buffer contains the triangles of every box, then the lines of every box,
+    then the reversed triangles of the boxes the camera is inside.
+    Changes to single boxes and to the boxes the camera is inside only update their part of the buffer.
+    """
 
     def __init__(
         self,
@@ -20,47 +62,254 @@ class RenderSelectionGroup(Drawable, ContextManager, OpenGLResourcePackManagerSt
         resource_pack: OpenGLResourcePack,
         selection: SelectionGroup = None,
     ):
-        ContextManager.__init__(self, context_identifier)
-        OpenGLResourcePackManagerStatic.__init__(self, resource_pack)
-
-        self._boxes: List[RenderSelection] = []
+        TriMesh.__init__(self, context_identifier, resource_pack)
+        self._selection_group: Optional[SelectionGroup] = None
+        # The points of each box. Shape (box_count, 2, 3)
+        self._points = numpy.zeros((0, 2, 3), dtype=numpy.int64)
+        # The min and max point of each box. Shape (box_count, 2, 3)
+        self._bounds = numpy.zeros((0, 2, 3), dtype=numpy.int64)
+        # Is the camera inside each box. The inside of these boxes is drawn.
+        self._camera_inside = numpy.zeros(0, dtype=bool)
+        # The number of boxes the inside range of the vertex buffer has space for.
+        self._inside_capacity = 0
+        # The offset of the geometry from the world origin.
+        self._origin = numpy.zeros(3, dtype=numpy.int64)
+        self.transformation_matrix = numpy.eye(4, dtype=numpy.float64)
+        self._needs_rebuild = True
+        # The indexes of the boxes whose geometry needs updating.
+        self._changed_boxes: Set[int] = set()
+        self._draw_mode = GL_TRIANGLES
 
-        if selection:
-            self.selection_group = selection
+        self.selection_group = selection or SelectionGroup()
 
     def __len__(self):
-        return len(self._boxes)
+        return len(self._points)
 
     def __bool__(self):
-        return bool(self._boxes)
+        return bool(len(self._points))
 
-    def _new_render_selection(self):
-        return RenderSelection(self.context_identifier, self.resource_pack)
+    @property
+    def vertex_usage(self):
+        return GL_DYNAMIC_DRAW
+
+    @property
+    def draw_mode(self):
+        return self._draw_mode
+
+    @property
+    def box_tint(self) -> RGBColour:
+        """The tint colour to apply to the white texture."""
+        return colours.get("box_normal", (1, 1, 1))
+
+    def _mark_recreate(self):
+        self._needs_rebuild = True
+
+    def _mark_boxes_changed(self, box_indexes: Iterable[int]):
+        """Update the geometry of some boxes when next drawn without rebuilding the whole mesh."""
+        self._changed_boxes.update(box_indexes)
+
+    def _rebuild(self):
+        # the OpenGL state holds the texture of the previous resource pack
+        self.unload()
 
     @property
     def selection_group(self) -> SelectionGroup:
-        return SelectionGroup(
-            [SelectionBox(box.point1, box.point2) for box in self._boxes]
-        )
+        return self._selection_group
 
     @selection_group.setter
     def selection_group(self, selection_group: SelectionGroup):
         if not isinstance(selection_group, SelectionGroup):
             raise TypeError("selection_group must be a SelectionGroup.")
-        self.unload()
-        for box in selection_group.selection_boxes:
-            render_box = self._new_render_selection()
-            render_box.point1 = numpy.array(box.point_1)
-            render_box.point2 = numpy.array(box.point_2)
-            self._boxes.append(render_box)
+        self._selection_group = selection_group
+        self._points = numpy.array(
+            [(box.point_1, box.point_2) for box in selection_group.selection_boxes],
+            dtype=numpy.int64,
+        ).reshape((-1, 2, 3))
+        self._bounds = numpy.sort(self._points, 1)
+        self._camera_inside = numpy.zeros(len(self._points), dtype=bool)
+        self._mark_recreate()
+
+    def _get_box_tints(self, box_indexes: numpy.ndarray) -> numpy.ndarray:
+        """Get the tint of each vertex of some boxes.
+
+        :param box_indexes: The indexes of the boxes to get the tints of.
+        :return: An array that can be broadcast to shape (len(box_indexes), 36, 3)
+        """
+        return numpy.array(self.box_tint, dtype=numpy.float32)
+
+    def _create_box_verts(self, box_indexes: numpy.ndarray) -> numpy.ndarray:
+        """Create the triangle vertices of some boxes.
+
+        :param box_indexes: The indexes of the boxes to create.
+        :return: The vertices of each box. Shape (len(box_indexes), 36, vert_len)
+        """
+        box_count = len(box_indexes)
+        bounds = (self._bounds[box_indexes] - self._origin).astype(numpy.float64)
+        bounds[:, 0] -= 0.005
+        bounds[:, 1] += 0.005
+        bounds = bounds.reshape((box_count, 6))
+
+        box_verts = numpy.zeros((box_count, 36, self._vert_len), dtype=numpy.float32)
+        box_verts[:, :, :3] = bounds[:, BoxPositionIndex]
+        box_verts[:, :, 3:5] = bounds[:, BoxUVIndex] / 16
+        box_verts[:, :, 5:9] = self.resource_pack.texture_bounds(
+            self.resource_pack.get_texture_path("amulet", "amulet_ui/selection")
+        )
+        box_verts[:, :, 9:12] = self._get_box_tints(box_indexes)
+        return box_verts
+
+    @property
+    def _line_start(self) -> int:
+        """The index of the first line vertex."""
+        return len(self._points) * 36
+
+    @property
+    def _inside_start(self) -> int:
+        """The index of the first vertex of the boxes the camera is inside."""
+        return len(self._points) * (36 + BoxLineIndex.size)
+
+    def _create_geometry(self):
+        self._setup()
+        box_count = len(self._points)
+        # Offset the geometry to a chunk near the boxes to keep the float precision.
+        self._origin = numpy.min(self._bounds[:, 0], 0) // 16 * 16
+        box_verts = self._create_box_verts(numpy.arange(box_count))
+        line_verts = box_verts[:, BoxLineIndex]
+        inside_indexes = numpy.flatnonzero(self._camera_inside)
+        # The camera is usually inside at most one box.
+        self._inside_capacity = max(1, inside_indexes.size)
+        inside_verts = numpy.zeros(
+            (self._inside_capacity, 36, self._vert_len), dtype=numpy.float32
+        )
+        inside_verts[: inside_indexes.size] = box_verts[inside_indexes][
+            :, BoxReversedIndex
+        ]
+        self.verts = numpy.concatenate(
+            [
+                box_verts.reshape((-1, self._vert_len)),
+                line_verts.reshape((-1, self._vert_len)),
+                inside_verts.reshape((-1, self._vert_len)),
+            ]
+        )
+        self.transformation_matrix = displacement_matrix(*self._origin)
+        self.change_verts()
+        self._needs_rebuild = False
+        self._changed_boxes.clear()
+
+    def _upload_range(self, start: int, count: int):
+        """Copy a range of vertices to the vertex buffer. The vertex array must be bound."""
+        glBufferSubData(
+            GL_ARRAY_BUFFER,
+            start * self._vert_len * 4,
+            count * self._vert_len * 4,
+            self.verts[start : start + count],
+        )
+
+    def _update_boxes(self):
+        """Recreate the geometry of the changed boxes and copy only their vertices to the vertex buffer."""
+        box_indexes = numpy.array(sorted(self._changed_boxes), dtype=numpy.int64)
+        self._changed_boxes.clear()
+        box_verts = self._create_box_verts(box_indexes)
+        line_start = self._line_start
+        line_size = BoxLineIndex.size
+        glBindVertexArray(self._vao)
+        glBindBuffer(GL_ARRAY_BUFFER, self._vbo)
+        for box_index, verts in zip(box_indexes.tolist(), box_verts):
+            self.verts[box_index * 36 : (box_index + 1) * 36] = verts
+            self._upload_range(box_index * 36, 36)
+            line_index = line_start + box_index * line_size
+            self.verts[line_index : line_index + line_size] = verts[BoxLineIndex]
+            self._upload_range(line_index, line_size)
+        if numpy.any(self._camera_inside[box_indexes]):
+            self._update_inside()
+        glBindVertexArray(0)
+        glBindBuffer(GL_ARRAY_BUFFER, 0)
+
+    def _update_inside(self):
+        """Copy the reversed triangles of the boxes the camera is inside to the vertex buffer.
+        The vertex array must be bound."""
+        inside_indexes = numpy.flatnonzero(self._camera_inside)
+        inside_start = self._inside_start
+        inside_verts = (
+            self.verts[: self._line_start]
+            .reshape((-1, 36, self._vert_len))[inside_indexes][:, BoxReversedIndex]
+            .reshape((-1, self._vert_len))
+        )
+        self.verts[inside_start : inside_start + len(inside_verts)] = inside_verts
+        self._upload_range(inside_start, len(inside_verts))
+
+    def _set_camera_inside(self, camera_inside: numpy.ndarray):
+        """Set which boxes the camera is inside and update the inside range of the vertex buffer."""
+        self._camera_inside = camera_inside
+        if self._needs_rebuild:
+            return
+        if numpy.count_nonzero(camera_inside) > self._inside_capacity:
+            self._mark_recreate()
+        elif numpy.any(camera_inside):
+            glBindVertexArray(self._vao)
+            glBindBuffer(GL_ARRAY_BUFFER, self._vbo)
+            self._update_inside()
+            glBindVertexArray(0)
+            glBindBuffer(GL_ARRAY_BUFFER, 0)
 
     def draw(
         self, camera_matrix: numpy.ndarray, camera_position: PointCoordinatesAny = None
     ):
-        for box in self._boxes:
-            box.draw(camera_matrix, camera_position)
+        """
+        Draw the selection boxes
+        :param camera_matrix: 4x4 transformation matrix for the camera
+        :param camera_position: The position of the camera. Used to draw the inside of the box the camera is in.
+        :return:
+        """
+        box_count = len(self._points)
+        if not box_count:
+            return
+        self._setup()
+        if camera_position is None:
+            camera_inside = numpy.zeros(box_count, dtype=bool)
+        else:
+            camera_position = numpy.asarray(camera_position)
+            camera_inside = numpy.all(
+                (self._bounds[:, 0] <= camera_position)
+                & (camera_position < self._bounds[:, 1]),
+                axis=1,
+            )
+        if self._needs_rebuild:
+            self._camera_inside = camera_inside
+            self._create_geometry()
+        else:
+            if self._changed_boxes:
+                self._update_boxes()
+            if not numpy.array_equal(camera_inside, self._camera_inside):
+                self._set_camera_inside(camera_inside)
+                if self._needs_rebuild:
+                    self._create_geometry()
+
+        transformation_matrix = numpy.matmul(camera_matrix, self.transformation_matrix)
+
+        self._draw_mode = GL_TRIANGLES
+        self.draw_start = 0
+        self.draw_count = box_count * 36
+        self._draw(transformation_matrix)
+        inside_count = numpy.count_nonzero(self._camera_inside)
+        if inside_count:
+            # The outside faces of these boxes are culled so the reversed faces are drawn on top.
+            self.draw_start = self._inside_start
+            self.draw_count = inside_count * 36
+            self._draw(transformation_matrix)
+
+        # Draw the lines around the boxes on top of everything.
+        # This works whether or not depth testing is enabled so the state does not need querying.
+        # The canvas uses GL_LEQUAL depth testing.
+        glDepthFunc(GL_ALWAYS)
+        glDepthMask(GL_FALSE)
+        self._draw_mode = GL_LINES
+        self.draw_start = self._line_start
+        self.draw_count = box_count * BoxLineIndex.size
+        self._draw(transformation_matrix)
+        glDepthMask(GL_TRUE)
+        glDepthFunc(GL_LEQUAL)
 
     def unload(self):
-        while self._boxes:
-            box = self._boxes.pop()
-            box.unload()
+        super().unload()
+        self._mark_recreate()
@@ -1,26 +1,57 @@
-from typing import List, Union
+from typing import Union
 import numpy
 from .render_selection_group import (
     RenderSelectionGroup,
 )
-from amulet_map_editor.api.opengl.mesh.selection import RenderSelectionHighlightable
+from amulet.api.selection import SelectionGroup
+from amulet_map_editor.api.opengl.data_types import RGBColour
+from ..box.colours import colours
 
 
 class RenderSelectionGroupHighlightable(RenderSelectionGroup):
-    """A group of selection boxes to be drawn with an added editable box."""
+    """A group of selection boxes to be drawn with edges that can be highlighted."""
 
-    def _new_render_selection(self):
-        return RenderSelectionHighlightable(
-            self._context_identifier, self.resource_pack
-        )
+    @property
+    def highlight_colour(self) -> RGBColour:
+        return colours.get("box_highlight", (0.5, 0.5, 1.0))
+
+    @RenderSelectionGroup.selection_group.setter
+    def selection_group(self, selection_group: SelectionGroup):
+        RenderSelectionGroup.selection_group.fset(self, selection_group)
+        # which edges of each box are highlighted
+        self._highlight_edges = numpy.zeros(self._points.shape, dtype=bool)
 
     def reset_highlight_edges(self):
-        self._boxes: List[RenderSelectionHighlightable]
-        for box in self._boxes:
-            box.reset_highlight_edges()
+        highlighted = numpy.flatnonzero(
+            numpy.any(self._highlight_edges.reshape((-1, 6)), 1)
+        )
+        if highlighted.size:
+            self._highlight_edges[:] = False
+            self._mark_boxes_changed(highlighted.tolist())
 
     def set_highlight_edges(
         self, box_index: int, highlight_edges: Union[numpy.ndarray, bool]
     ):
-        self._boxes: List[RenderSelectionHighlightable]
-        self._boxes[box_index].set_highlight_edges(highlight_edges)
+        if not numpy.array_equal(self._highlight_edges[box_index], highlight_edges):
+            self._highlight_edges[box_index] = highlight_edges
+            self._mark_boxes_changed((box_index,))
+
+    def _get_box_tints(self, box_indexes: numpy.ndarray) -> numpy.ndarray:
+        tints = numpy.empty((len(box_indexes), 6, 3), dtype=numpy.float32)
+        tints[:] = self.box_tint
+        highlight_edges = self._highlight_edges[box_indexes]
+        if numpy.any(highlight_edges):
+            # The faces are in the order down, west, north, east, south, up.
+            # Find the index into the highlight edges of each face.
+            # Edges are stored for point1 and point2 so this depends on which point is larger.
+            points = self._points[box_indexes]
+            flipped = (points[:, 1] > points[:, 0]).astype(numpy.int64)
+            indexes = numpy.empty((len(box_indexes), 6), dtype=numpy.int64)
+            indexes[:, 1], indexes[:, 3] = 3 - 3 * flipped[:, 0], 3 * flipped[:, 0]
+            indexes[:, 0], indexes[:, 5] = 4 - 3 * flipped[:, 1], 1 + 3 * flipped[:, 1]
+            indexes[:, 2], indexes[:, 4] = 5 - 3 * flipped[:, 2], 2 + 3 * flipped[:, 2]
+            highlighted = numpy.take_along_axis(
+                highlight_edges.reshape((-1, 6)), indexes, 1
+            )
+            tints[highlighted] = self.highlight_colour
+        return numpy.repeat(tints, 6, 1)
@@ -23,6 +23,8 @@ class SkyBox(TriMesh, OpenGLResourcePackManager):
         self._rebuild()
 
     def _rebuild(self):
+        # the OpenGL state holds the texture and shader of the previous resource pack
+        self.unload()
         model = get_cube(
             self.resource_pack.get_texture_path("amulet", "amulet_ui/cubemap/down"),
             self.resource_pack.get_texture_path("amulet", "amulet_ui/cubemap/up"),
@@ -1,7 +1,7 @@
 import logging
+from typing import Sequence
 from OpenGL.GL import (
     glBindTexture,
-    GL_TEXTURE_2D,
     GL_TRIANGLES,
     glBindVertexArray,
     glBindBuffer,
@@ -20,6 +20,7 @@ from OpenGL.GL import (
     glDeleteVertexArrays,
     glUniformMatrix4fv,
     glUniform1i,
+    glUniform1f,
     glActiveTexture,
     GL_TEXTURE0,
     glDrawArrays,
@@ -62,6 +63,12 @@ class TriMesh(Drawable, OpenGLResourcePackManagerStatic, ContextManager):
             None  # the reference within the shader program of the transformation matrix
         )
         self._texture_location = None  # the location of the texture in the shader
+        self._biome_tint_location = (
+            None  # the location of the biome tint texture in the shader
+        )
+        self._biome_tint_size_location = (
+            None  # the location of the biome tint texture size in the shader
+        )
         self._texture = None
         self.verts = self.new_empty_verts()  # the vertices to draw
         self.draw_start = 0
@@ -83,16 +90,28 @@ class TriMesh(Drawable, OpenGLResourcePackManagerStatic, ContextManager):
     def shader_name(self) -> str:
         return "render_chunk"
 
+    @property
+    def biome_tint_size(self) -> int:
+        """The number of block columns along each side of the biome tint texture bound while drawing."""
+        return 16
+
     def _setup(self):
         """Setup OpenGL attributes if required"""
         if self._vao is None:  # if the opengl state has not been set
             self._texture = self.resource_pack.get_atlas_id(self.context_identifier)
-            self._shader = get_shader(self.context_identifier, self.shader_name)
+            self._shader = get_shader(
+                self.context_identifier,
+                self.resource_pack.get_shader_name(self.shader_name),
+            )
             glUseProgram(self._shader)
             self._transform_location = glGetUniformLocation(
                 self._shader, "transformation_matrix"
             )
             self._texture_location = glGetUniformLocation(self._shader, "image")
+            self._biome_tint_location = glGetUniformLocation(self._shader, "biome_tint")
+            self._biome_tint_size_location = glGetUniformLocation(
+                self._shader, "biome_tint_size"
+            )
             self._vao = glGenVertexArrays(1)  # create the array
             glBindVertexArray(self._vao)
             self._vbo = glGenBuffers(1)  # and the buffer
@@ -161,15 +180,22 @@ class TriMesh(Drawable, OpenGLResourcePackManagerStatic, ContextManager):
         self._setup()
         self._draw(transformation_matrix)
 
+    def draw_instances(self, transformation_matrices: Sequence[numpy.ndarray]):
+        """Draw the mesh once for each transformation matrix.
+        The OpenGL state is only bound once which is faster than calling draw for each matrix."""
+        self._setup()
+        self._draw_instances(transformation_matrices)
+
     def _draw(self, transformation_matrix: numpy.ndarray):
+        self._draw_instances((transformation_matrix,))
+
+    def _draw_instances(self, transformation_matrices: Sequence[numpy.ndarray]):
         glUseProgram(self._shader)
-        glUniformMatrix4fv(
-            self._transform_location,
-            1,
-            GL_FALSE,
-            transformation_matrix.T.astype(numpy.float32),
-        )
         glUniform1i(self._texture_location, 0)
+        if self._biome_tint_location != -1:
+            # the biome tint texture is bound to texture unit 1 by the region being drawn
+            glUniform1i(self._biome_tint_location, 1)
+            glUniform1f(self._biome_tint_size_location, self.biome_tint_size)
         try:
             glBindVertexArray(self._vao)
         except GLError:  # There seems to be errors randomly when binding the VBO
@@ -180,9 +206,16 @@ class TriMesh(Drawable, OpenGLResourcePackManagerStatic, ContextManager):
             self._setup()
             glBindVertexArray(self._vao)
         glActiveTexture(GL_TEXTURE0)
-        glBindTexture(GL_TEXTURE_2D, self._texture)
+        glBindTexture(self.resource_pack.texture_target, self._texture)
 
-        glDrawArrays(self.draw_mode, self.draw_start, self.draw_count)
+        for transformation_matrix in transformation_matrices:
+            glUniformMatrix4fv(
+                self._transform_location,
+                1,
+                GL_FALSE,
+                transformation_matrix.T.astype(numpy.float32),
+            )
+            glDrawArrays(self.draw_mode, self.draw_start, self.draw_count)
 
         glBindVertexArray(0)
         glUseProgram(0)
@@ -1,5 +1,10 @@
-from .resource_pack import OpenGLResourcePack
+from .resource_pack import OpenGLResourcePack, MinTextureArrayLayers
 from .resource_pack_manager import (
     OpenGLResourcePackManager,
     OpenGLResourcePackManagerStatic,
 )
+from .registry import (
+    acquire_resource_pack,
+    try_acquire_resource_pack,
+    release_resource_pack,
+)
@@ -0,0 +1,99 @@
+import os
+import sqlite3
+import pickle
+import logging
+from typing import Optional, Dict
+
+from minecraft_model_reader import BlockMesh
+
+from amulet_map_editor.api.cache_database import CacheDatabase
+
+log = logging.getLogger(__name__)
+
+# Increment this if the format of the stored data changes.
+_BlockModelCacheVersion = 1
+# The maximum number of block model databases to keep. There is one for each resource pack configuration.
+MaxCacheDatabases = 8
+
+
+class BlockModelCache:
+    """A persistent on-disk cache of the block model for each universal block.
+
+    Translating a universal block to the resource pack version and building its model is slow.
+    There is one database per resource pack configuration so a change to the translator or
+    resource packs uses a new database. The least recently used databases are deleted.
+    The database is only opened when it is first used. All of the stored models are read
+    when it is opened so that looking up a model does not need to query the database.
+
+    This class is thread safe.
+    """
+
+    def __init__(self, cache_key: str):
+        """
+        Create the block model cache.
+
+        :param cache_key: A key describing the translator version and resource packs the models are created with.
+        """
+        self._database = CacheDatabase(
+            os.path.join("resource_packs", "block_models"),
+            f"{cache_key}_{_BlockModelCacheVersion}",
+            self._create_tables,
+            MaxCacheDatabases,
+        )
+        # The pickled models read from the database that have not been requested yet.
+        self._models: Dict[str, bytes] = {}
+
+    def _create_tables(self, db: sqlite3.Connection):
+        db.execute(
+            "CREATE TABLE IF NOT EXISTS models ("
+            "blockstate TEXT PRIMARY KEY NOT NULL, "
+            "model BLOB NOT NULL)"
+        )
+        self._models = dict(db.execute("SELECT blockstate, model FROM models"))
+
+    def get(self, blockstate: str) -> Optional[BlockMesh]:
+        """
+        Get the cached model for a block.
+        Each model is only returned once. The caller is expected to keep it.
+
+        :param blockstate: The full blockstate of the universal block.
+        :return: The block model or None if it is not cached.
+        """
+        with self._database.lock:
+            if self._database.get_db() is None:
+                return None
+            data = self._models.pop(blockstate, None)
+        if data is None:
+            return None
+        try:
+            model = pickle.loads(data)
+        except Exception:
+            log.debug(f"Corrupt block model cache entry for {blockstate}")
+            return None
+        if isinstance(model, BlockMesh):
+            return model
+        return None
+
+    def put(self, blockstate: str, model: BlockMesh):
+        """
+        Store the model for a block.
+
+        :param blockstate: The full blockstate of the universal block.
+        :param model: The block model.
+        """
+        data = pickle.dumps(model, pickle.HIGHEST_PROTOCOL)
+        with self._database.lock:
+            db = self._database.get_db()
+            if db is None:
+                return
+            db.execute(
+                "INSERT OR REPLACE INTO models (blockstate, model) VALUES (?, ?)",
+                (blockstate, data),
+            )
+            self._database.count_write()
+
+    def close(self):
+        """Write all pending changes and close the database."""
+        with self._database.lock:
+            self._database.close()
+            self._models.clear()
@@ -0,0 +1,129 @@
+"""Fast change detection for resource packs.
+
+Checking every file in every resource pack for changes is slow because the vanilla pack alone is thousands of files.
+Instead a manifest is stored for each directory pack recording the modification time of each directory in the pack
+and a fingerprint of the metadata of every file.
+On a warm start only the directories are checked. Adding, removing or replacing a file changes the modification
+time of the directory it is in which triggers a full rescan of that pack.
+Zip packs are fingerprinted from the modification time and size of the zip file.
+"""
+
+import os
+import json
+import hashlib
+import logging
+from typing import Dict, Optional, Sequence
+
+log = logging.getLogger(__name__)
+
+# Increment this if the manifest format or fingerprint calculation changes.
+_ManifestVersion = 1
+
+
+def _manifest_path(pack_path: str) -> str:
+    return os.path.join(
+        os.environ["CACHE_DIR"],
+        "resource_packs",
+        "manifest",
+        f"{hashlib.sha256(pack_path.encode('utf-8')).hexdigest()}.json",
+    )
+
+
+def _load_manifest(pack_path: str) -> Optional[dict]:
+    try:
+        with open(_manifest_path(pack_path)) as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if (
+        isinstance(manifest, dict)
+        and manifest.get("version") == _ManifestVersion
+        and manifest.get("path") == pack_path
+    ):
+        return manifest
+    return None
+
+
+def _manifest_valid(pack_path: str, manifest: dict) -> bool:
+    """Check that none of the directories in the pack have changed."""
+    directories: Dict[str, int] = manifest["directories"]
+    for relative_path, mtime in directories.items():
+        try:
+            if os.stat(os.path.join(pack_path, relative_path)).st_mtime_ns != mtime:
+                return False
+        except OSError:
+            return False
+    return True
+
+
+def _scan_directory(pack_path: str) -> dict:
+    """Stat every file in the pack and create a new manifest."""
+    directories: Dict[str, int] = {}
+    file_hash = hashlib.sha256()
+    for directory_path, directory_names, file_names in os.walk(pack_path):
+        directory_names.sort()
+        relative_directory = os.path.relpath(directory_path, pack_path)
+        directories[relative_directory] = os.stat(directory_path).st_mtime_ns
+        for file_name in sorted(file_names):
+            stat = os.stat(os.path.join(directory_path, file_name))
+            file_hash.update(
+                f"{relative_directory}/{file_name}:{stat.st_mtime_ns}:{stat.st_size}\n".encode(
+                    "utf-8"
+                )
+            )
+    return {
+        "version": _ManifestVersion,
+        "path": pack_path,
+        "directories": directories,
+        "fingerprint": file_hash.hexdigest(),
+    }
+
+
+def get_pack_fingerprint(pack_path: str) -> str:
+    """
+    Get a fingerprint of a resource pack that changes if the pack changes.
+
+    :param pack_path: The path to the resource pack directory or zip file.
+    :return: A hex digest.
+    """
+    pack_path = os.path.abspath(pack_path)
+    if os.path.isfile(pack_path):
+        stat = os.stat(pack_path)
+        return hashlib.sha256(
+            f"{pack_path}:{stat.st_mtime_ns}:{stat.st_size}".encode("utf-8")
+        ).hexdigest()
+    elif os.path.isdir(pack_path):
+        manifest = _load_manifest(pack_path)
+        if manifest is None or not _manifest_valid(pack_path, manifest):
+            log.info(f"Scanning resource pack {pack_path} for changes")
+            manifest = _scan_directory(pack_path)
+            manifest_path = _manifest_path(pack_path)
+            try:
+                os.makedirs(os.path.dirname(manifest_path), exist_ok=True)
+                with open(manifest_path, "w") as f:
+                    json.dump(manifest, f)
+            except OSError:
+                log.warning(
+                    f"Failed writing the resource pack manifest for {pack_path}",
+                    exc_info=True,
+                )
+        return manifest["fingerprint"]
+    else:
+        return hashlib.sha256(f"{pack_path}:missing".encode("utf-8")).hexdigest()
+
+
+def get_packs_fingerprint(pack_paths: Sequence[str]) -> str:
+    """
+    Get a fingerprint of an ordered list of resource packs.
+
+    :param pack_paths: The paths of the resource packs in priority order.
+    :return: A full length hex digest suitable for use as a cache key.
+    """
+    packs_hash = hashlib.sha256()
+    for pack_path in pack_paths:
+        packs_hash.update(
+            f"{os.path.abspath(pack_path)}:{get_pack_fingerprint(pack_path)}\n".encode(
+                "utf-8"
+            )
+        )
+    return packs_hash.hexdigest()
@@ -0,0 +1,91 @@
+"""A process-wide registry of OpenGLResourcePack instances.
+
+Loading the resource packs, creating the texture atlas and translating block models is slow.
+Canvases that would load the same packs can share one OpenGLResourcePack through this registry.
+Each user must call release_resource_pack when it no longer needs the pack so that it can be freed.
+"""
+
+from threading import Lock, Event
+from typing import Callable, Dict, Generator, Hashable, Any, Optional
+
+from .resource_pack import OpenGLResourcePack
+
+_lock = Lock()
+# An event for each key that is currently being created.
+# It is set when the creator finishes, whether or not it succeeded.
+_pending: Dict[Hashable, Event] = {}
+_resource_packs: Dict[Hashable, OpenGLResourcePack] = {}
+_ref_counts: Dict[Hashable, int] = {}
+
+
+def acquire_resource_pack(
+    key: Hashable,
+    create: Callable[[], Generator[Any, None, OpenGLResourcePack]],
+) -> Generator[Any, None, OpenGLResourcePack]:
+    """
+    Get the resource pack registered with the given key, creating it if it does not exist.
+    This is a generator so that the progress of creating the resource pack can be reported.
+    If another thread is creating the resource pack for the same key this will wait for it to finish.
+    If that thread fails or abandons the generator this thread will create the resource pack instead.
+
+    :param key: A hashable key describing the resource pack. Eg the platform and the pack paths.
+    :param create: A function returning a generator that creates the resource pack. Its yielded values are forwarded.
+    :return: The resource pack.
+    """
+    while True:
+        with _lock:
+            if key in _resource_packs:
+                _ref_counts[key] += 1
+                return _resource_packs[key]
+            pending = _pending.get(key)
+            if pending is None:
+                pending = _pending[key] = Event()
+                break
+        # Another thread is creating the resource pack. No lock is held while waiting.
+        pending.wait()
+
+    # No lock is held while the generator is suspended so abandoning it cannot block other threads.
+    try:
+        resource_pack = yield from create()
+        with _lock:
+            _resource_packs[key] = resource_pack
+            _ref_counts[key] = 1
+    finally:
+        with _lock:
+            del _pending[key]
+        pending.set()
+    return resource_pack
+
+
+def try_acquire_resource_pack(key: Hashable) -> Optional[OpenGLResourcePack]:
+    """
+    Get the resource pack registered with the given key if it has already been created.
+    This does not wait if another thread is creating the resource pack.
+    If a resource pack is returned it must be released with release_resource_pack.
+
+    :param key: A hashable key describing the resource pack.
+    :return: The resource pack or None if it has not been created.
+    """
+    with _lock:
+        if key in _resource_packs:
+            _ref_counts[key] += 1
+            return _resource_packs[key]
+    return None
+
+
+def release_resource_pack(resource_pack: OpenGLResourcePack):
+    """
+    Release a resource pack acquired with acquire_resource_pack.
+    The resource pack is removed from the registry when it has been released by every user.
+
+    :param resource_pack: The resource pack to release.
+    """
+    with _lock:
+        for key, registered_pack in _resource_packs.items():
+            if registered_pack is resource_pack:
+                _ref_counts[key] -= 1
+                if _ref_counts[key] <= 0:
+                    del _resource_packs[key]
+                    del _ref_counts[key]
+                    resource_pack.close()
+                break
@@ -5,6 +5,7 @@ from OpenGL.GL import (
     GL_RGBA,
     GL_UNSIGNED_BYTE,
     glGenTextures,
+    glDeleteTextures,
     glTexParameteri,
     GL_TEXTURE_MIN_FILTER,
     GL_NEAREST,
@@ -12,26 +13,69 @@ from OpenGL.GL import (
     GL_TEXTURE_MAG_FILTER,
     GL_TEXTURE_WRAP_S,
     GL_TEXTURE_WRAP_T,
+    GL_TEXTURE_2D_ARRAY,
+    glTexImage3D,
+    glGenerateMipmap,
+    GL_NEAREST_MIPMAP_LINEAR,
+    GL_REPEAT,
 )
 from typing import Generator, Any, Tuple, Dict, Optional
-import struct
 import hashlib
 import os
+import glob
 import json
-from PIL import Image
 import numpy
-import glob
 import logging
 
 from minecraft_model_reader.api.resource_pack.base import BaseResourcePackManager
+import minecraft_model_reader
 from minecraft_model_reader import BlockMesh
 import PyMCTranslate
 from amulet.api.block import Block
 
 from amulet_map_editor.api.opengl import textureatlas
+from .pack_manifest import get_packs_fingerprint
+from .block_model_cache import BlockModelCache
 
 log = logging.getLogger(__name__)
 
+# The number of texture array layers that every OpenGL 3 implementation supports.
+MinTextureArrayLayers = 256
+# The maximum number of texture atlases to keep in the cache.
+# Each set of resource packs has its own atlas. The least recently used are deleted.
+MaxCachedAtlases = 4
+
+
+def _prune_atlas_cache(cache_dir: str, keep_key: str):
+    """
+    Delete the files of the least recently used atlases so that at most MaxCachedAtlases remain.
+
+    :param cache_dir: The directory containing the cached atlases.
+    :param keep_key: The key of the atlas in use. This is never deleted.
+    """
+    last_used: Dict[str, float] = {}
+    for path in glob.glob(os.path.join(glob.escape(cache_dir), "*.npy")):
+        atlas_key = os.path.basename(path)[:-4]
+        if atlas_key.endswith("_layers"):
+            continue
+        last_used[atlas_key] = os.path.getmtime(path)
+    last_used.pop(keep_key, None)
+    for atlas_key in sorted(last_used, key=last_used.get, reverse=True)[
+        MaxCachedAtlases - 1 :
+    ]:
+        for file_name in (
+            f"{atlas_key}.npy",
+            f"{atlas_key}.json",
+            f"{atlas_key}_layers.npy",
+            f"{atlas_key}_layers.json",
+        ):
+            try:
+                os.remove(os.path.join(cache_dir, file_name))
+            except FileNotFoundError:
+                pass
+            except OSError:
+                log.debug(f"Failed deleting cached atlas {file_name}", exc_info=True)
+
 
 class OpenGLResourcePack:
     """This class will take a minecraft_model_reader resource pack and
@@ -44,23 +88,70 @@ class OpenGLResourcePack:
     _image_width: int
     _image_height: int
     _gl_textures: Dict[str, int]
+    _texture_layers: Dict[str, int]
+    _layers: Optional[numpy.ndarray]
+    _texture_colours: Dict[str, numpy.ndarray]
+    _block_colours: Dict[Block, Tuple[int, int, int, int]]
 
     def __init__(
-        self, resource_pack: BaseResourcePackManager, translator: PyMCTranslate.Version
+        self,
+        resource_pack: BaseResourcePackManager,
+        translator: PyMCTranslate.Version,
+        texture_array: bool = False,
+        placeholder: bool = False,
+        max_texture_layers: int = MinTextureArrayLayers,
     ):
+        """
+        Create a new OpenGLResourcePack.
+
+        :param resource_pack: The resource pack manager to load the textures and models from.
+        :param translator: The translator to convert universal blocks to the resource pack format.
+        :param texture_array: If True the textures are stored in a mipmapped 2D texture array rather than an atlas.
+        :param placeholder: If True this is a temporary pack used while the real pack loads. Geometry and block models created from it are not cached.
+        :param max_texture_layers: The number of layers the texture array supports (GL_MAX_ARRAY_TEXTURE_LAYERS). If there are more textures than this the atlas is used instead.
+        """
         self._resource_pack = resource_pack
         self._translator = translator
+        self._texture_array = texture_array
+        self._max_texture_layers = max_texture_layers
+        self._placeholder = placeholder
         self._block_models: Dict[Block, BlockMesh] = {}
+        # The persistent block model cache. Created in setup.
+        self._block_model_cache: Optional[BlockModelCache] = None
 
         self._texture_bounds: Dict[str, Tuple[float, float, float, float]] = {}
-        self._image: Optional[Image.Image] = None
+        self._image: Optional[numpy.ndarray] = None
         self._image_width: int = 0
         self._image_height: int = 0
 
         self._gl_textures: Dict[str, int] = {}
+        # The layer index of each texture if using the texture array.
+        self._texture_layers: Dict[str, int] = {}
+        self._layers: Optional[numpy.ndarray] = None
+        self._cache_key: Optional[str] = None
+        # The average colour of each texture and the map colour of each block.
+        self._texture_colours: Dict[str, numpy.ndarray] = {}
+        self._block_colours: Dict[Block, Tuple[int, int, int, int]] = {}
+
+    @property
+    def texture_array(self) -> bool:
+        """Are the textures stored in a 2D texture array.
+        If True the texture bounds are (layer, 0, 0, 0) and the texture must be bound to GL_TEXTURE_2D_ARRAY."""
+        return self._texture_array
+
+    @property
+    def texture_target(self) -> int:
+        """The OpenGL target the texture returned by get_atlas_id must be bound to."""
+        return GL_TEXTURE_2D_ARRAY if self._texture_array else GL_TEXTURE_2D
+
+    def get_shader_name(self, shader_name: str) -> str:
+        """Get the name of the variant of a texture sampling shader that works with this resource pack's texture."""
+        if self._texture_array:
+            return f"{shader_name}_array"
+        return shader_name
 
     def get_atlas_id(self, context_id: str) -> int:
-        """Get the opengl texture id of the atlas for a given context."""
+        """Get the opengl texture id of the atlas (or texture array) for a given context."""
         if context_id not in self._gl_textures:
             if self._image is None:
                 raise Exception(
@@ -76,12 +167,32 @@ class OpenGLResourcePack:
         return self._resource_pack.get_texture_path(namespace, relative_path)
 
     def texture_bounds(self, texture_path: str) -> Tuple[float, float, float, float]:
-        """Get the bounding box of a given texture path."""
-        if texture_path in self._texture_bounds:
+        """Get the bounding box of a given texture path.
+        If using the texture array this is the layer index followed by three zeros."""
+        if self._texture_array:
+            layer = self._texture_layers.get(texture_path)
+            if layer is None:
+                layer = self._texture_layers[self._resource_pack.missing_no]
+            return float(layer), 0.0, 0.0, 0.0
+        elif texture_path in self._texture_bounds:
             return self._texture_bounds[texture_path]
         else:
             return self._texture_bounds[self._resource_pack.missing_no]
 
+    @property
+    def placeholder(self) -> bool:
+        """Is this a temporary pack used while the real resource pack loads."""
+        return self._placeholder
+
+    @property
+    def cache_key(self) -> Optional[str]:
+        """A key that changes if the resource packs, texture atlas or translator change.
+        Used to validate data cached from this resource pack.
+        None until setup has been run or if this is a placeholder pack."""
+        if self._placeholder:
+            return None
+        return self._cache_key
+
     @property
     def translator(self) -> PyMCTranslate.Version:
         """The translator used to convert the universal blocks into the required version for the resource pack."""
@@ -90,42 +201,40 @@ class OpenGLResourcePack:
     def setup(self) -> Generator[float, None, None]:
         """Create and bind the atlas texture."""
         if self._image is None:
-            cache_id = struct.unpack(
-                "H",
-                hashlib.sha1(
-                    "".join(self._resource_pack.pack_paths).encode("utf-8")
-                ).digest()[:2],
-            )[0]
-
-            atlas: Image.Image
+            atlas: numpy.ndarray
 
             if not self._resource_pack.pack_paths:
                 log.warning("There are no resource packs to load.")
 
-            mod_time = max(
-                (
-                    os.stat(path).st_mtime
-                    for pack in self._resource_pack.pack_paths
-                    for path in glob.glob(
-                        os.path.join(glob.escape(pack), "**", "*.*"), recursive=True
-                    )
-                ),
-                default=0,
-            )
+            # A full length key that changes if any of the packs change.
+            atlas_key = get_packs_fingerprint(self._resource_pack.pack_paths)
+            # The block models also depend on the translation and model reading code.
+            if not self._placeholder:
+                self._block_model_cache = BlockModelCache(
+                    hashlib.sha256(
+                        json.dumps(
+                            (
+                                atlas_key,
+                                self._translator.platform,
+                                self._translator.version_number,
+                                PyMCTranslate.__version__,
+                                minecraft_model_reader.__version__,
+                            )
+                        ).encode("utf-8")
+                    ).hexdigest()
+                )
 
             cache_dir = os.path.join(os.environ["CACHE_DIR"], "resource_packs", "atlas")
-            img_path = os.path.join(cache_dir, f"{cache_id}.png")
-            bounds_path = os.path.join(cache_dir, f"{cache_id}.json")
+            # The atlas is stored as a raw RGBA array so that it can be memory mapped
+            # and uploaded directly without decoding or copying.
+            img_path = os.path.join(cache_dir, f"{atlas_key}.npy")
+            bounds_path = os.path.join(cache_dir, f"{atlas_key}.json")
             try:
                 with open(bounds_path) as f:
-                    cache_mod_time, bounds = json.load(f)
-                if mod_time != cache_mod_time:
-                    raise Exception(
-                        "The resource packs have changed since last merging."
-                    )
-                atlas = Image.open(img_path)
+                    bounds = json.load(f)
+                atlas = numpy.load(img_path, mmap_mode="r")
             except:
-                atlas_iter = textureatlas.create_atlas_iter(
+                atlas_iter = textureatlas.create_atlas_array_iter(
                     self._resource_pack.textures
                 )
                 try:
@@ -137,16 +246,62 @@ class OpenGLResourcePack:
                         bounds,
                     ) = e.value
                     os.makedirs(cache_dir, exist_ok=True)
-                    atlas.save(img_path)
+                    numpy.save(img_path, atlas)
                     with open(bounds_path, "w") as f:
-                        json.dump((mod_time, bounds), f)
+                        json.dump(bounds, f)
+                    _prune_atlas_cache(cache_dir, atlas_key)
 
-            self._image_width, self._image_height = atlas.size
-            self._image = numpy.array(atlas, numpy.uint8).ravel()
+            try:
+                # mark the atlas as recently used so that it is not pruned
+                os.utime(img_path)
+            except OSError:
+                pass
+
+            self._image_height, self._image_width = atlas.shape[:2]
+            self._image = atlas
             self._texture_bounds = bounds
 
+            if self._texture_array and len(bounds) > self._max_texture_layers:
+                log.warning(
+                    f"There are {len(bounds)} textures but the texture array only supports {self._max_texture_layers}. "
+                    f"Using the texture atlas instead."
+                )
+                self._texture_array = False
+
+            self._cache_key = hashlib.sha256(
+                json.dumps(
+                    (
+                        atlas_key,
+                        self._translator.platform,
+                        self._translator.version_number,
+                        self._texture_array,
+                    )
+                ).encode("utf-8")
+            ).hexdigest()
+
+            if self._texture_array:
+                layers_path = os.path.join(cache_dir, f"{atlas_key}_layers.npy")
+                layer_indexes_path = os.path.join(cache_dir, f"{atlas_key}_layers.json")
+                try:
+                    with open(layer_indexes_path) as f:
+                        layer_indexes = json.load(f)
+                    layers = numpy.load(layers_path, mmap_mode="r")
+                except:
+                    layers, layer_indexes = textureatlas.create_texture_array(
+                        atlas, bounds
+                    )
+                    os.makedirs(cache_dir, exist_ok=True)
+                    numpy.save(layers_path, layers)
+                    with open(layer_indexes_path, "w") as f:
+                        json.dump(layer_indexes, f)
+                self._layers = layers
+                self._texture_layers = layer_indexes
+
     def _setup_texture(self, context_id: str):
         """Set up the texture for a given context"""
+        if self._texture_array:
+            self._setup_texture_array(context_id)
+            return
         gl_texture = self._gl_textures[context_id] = glGenTextures(
             1
         )  # Create the texture location
@@ -171,11 +326,51 @@ class OpenGLResourcePack:
         glBindTexture(GL_TEXTURE_2D, 0)
         log.info("Finished setting up texture atlas in OpenGL")
 
+    def _setup_texture_array(self, context_id: str):
+        """Set up the mipmapped texture array for a given context"""
+        layers = self._layers
+        layer_count, size = layers.shape[:2]
+
+        gl_texture = self._gl_textures[context_id] = glGenTextures(1)
+        glBindTexture(GL_TEXTURE_2D_ARRAY, gl_texture)
+        # Nearest filtering within a mip level keeps the pixelated look close up.
+        # Blending between mip levels removes the shimmer at range.
+        glTexParameteri(
+            GL_TEXTURE_2D_ARRAY, GL_TEXTURE_MIN_FILTER, GL_NEAREST_MIPMAP_LINEAR
+        )
+        glTexParameteri(GL_TEXTURE_2D_ARRAY, GL_TEXTURE_MAG_FILTER, GL_NEAREST)
+        glTexParameteri(GL_TEXTURE_2D_ARRAY, GL_TEXTURE_WRAP_S, GL_REPEAT)
+        glTexParameteri(GL_TEXTURE_2D_ARRAY, GL_TEXTURE_WRAP_T, GL_REPEAT)
+        glTexImage3D(
+            GL_TEXTURE_2D_ARRAY,
+            0,
+            GL_RGBA,
+            size,
+            size,
+            layer_count,
+            0,
+            GL_RGBA,
+            GL_UNSIGNED_BYTE,
+            numpy.ascontiguousarray(layers),
+        )
+        glGenerateMipmap(GL_TEXTURE_2D_ARRAY)
+        glBindTexture(GL_TEXTURE_2D_ARRAY, 0)
+        log.info("Finished setting up texture array in OpenGL")
+
     def get_block_model(self, universal_block: Block) -> BlockMesh:
         """Get the BlockMesh class for a given universal Block.
         The Block will be translated to the version format using the
-        previously specified translator."""
+        previously specified translator.
+        Models are also stored in a persistent cache so that later sessions do not need to translate the block."""
         if universal_block not in self._block_models:
+            block_model_cache = self._block_model_cache
+            if block_model_cache is not None:
+                blockstate = universal_block.full_blockstate
+                block_model = block_model_cache.get(blockstate)
+                if block_model is not None:
+                    self._block_models[universal_block] = block_model
+                    return block_model
+
             version_block = self._translator.block.from_universal(
                 universal_block.base_block
             )[0]
@@ -183,8 +378,91 @@ class OpenGLResourcePack:
                 for block_ in universal_block.extra_blocks:
                     version_block += self._translator.block.from_universal(block_)[0]
 
-            self._block_models[universal_block] = self._resource_pack.get_block_model(
-                version_block
-            )
+            block_model = self._resource_pack.get_block_model(version_block)
+            self._block_models[universal_block] = block_model
+            if block_model_cache is not None:
+                block_model_cache.put(blockstate, block_model)
 
         return self._block_models[universal_block]
+
+    def get_texture_colour(self, texture_path: str) -> numpy.ndarray:
+        """Get the average colour of a texture weighted by the alpha of each pixel.
+
+        :param texture_path: The texture path as used in the block models.
+        :return: A float array of the red, green, blue and alpha values in the range 0-1.
+        """
+        if texture_path not in self._texture_colours:
+            if self._image is None:
+                raise Exception(
+                    "OpenGLResourcePack.setup() needs to be run before accessing a texture."
+                )
+            if texture_path in self._texture_bounds:
+                u0, v0, u1, v1 = self._texture_bounds[texture_path]
+            else:
+                u0, v0, u1, v1 = self._texture_bounds[self._resource_pack.missing_no]
+            pixels = (
+                numpy.asarray(
+                    self._image[
+                        round(v0 * self._image_height) : round(v1 * self._image_height),
+                        round(u0 * self._image_width) : round(u1 * self._image_width),
+                    ],
+                    dtype=numpy.float32,
+                ).reshape(-1, 4)
+                / 255
+            )
+            colour = numpy.zeros(4, dtype=numpy.float32)
+            if pixels.size:
+                alpha_sum = numpy.sum(pixels[:, 3])
+                if alpha_sum:
+                    colour[:3] = (
+                        numpy.sum(pixels[:, :3] * pixels[:, 3:], axis=0) / alpha_sum
+                    )
+                colour[3] = alpha_sum / pixels.shape[0]
+            self._texture_colours[texture_path] = colour
+        return self._texture_colours[texture_path]
+
+    def get_block_colour(self, universal_block: Block) -> Tuple[int, int, int, int]:
+        """Get the colour of a block when viewed from above. Used to draw maps.
+
+        This is the average colour of the textures on the top faces of the block model multiplied by their tint.
+
+        :param universal_block: The universal block.
+        :return: The red, green, blue and alpha values in the range 0-255.
+        """
+        if universal_block not in self._block_colours:
+            colour = numpy.zeros(4, dtype=numpy.float32)
+            block_model = self.get_block_model(universal_block)
+            # Use the faces on the top of the block. Fall back to the uncullable faces (eg plants and slabs).
+            for cull_dir in ("up", None):
+                if cull_dir in block_model.faces and block_model.faces[cull_dir].size:
+                    tint = block_model.tint_verts[cull_dir].reshape(-1, 3)
+                    texture_colours = numpy.array(
+                        [
+                            self.get_texture_colour(block_model.textures[texture_index])
+                            for texture_index in block_model.texture_index[cull_dir]
+                        ]
+                    )
+                    colour = numpy.mean(texture_colours, axis=0)
+                    if tint.size:
+                        colour[:3] *= numpy.mean(tint, axis=0)
+                    break
+            self._block_colours[universal_block] = tuple(
+                int(v) for v in numpy.clip(numpy.round(colour * 255), 0, 255)
+            )
+        return self._block_colours[universal_block]
+
+    def unload(self, context_id: str):
+        """
+        Delete the OpenGL texture created for a context.
+        The context must be current.
+
+        :param context_id: The identifier of the context the texture was created in.
+        """
+        gl_texture = self._gl_textures.pop(context_id, None)
+        if gl_texture is not None:
+            glDeleteTextures([gl_texture])
+
+    def close(self):
+        """Write and close the persistent block model cache."""
+        if self._block_model_cache is not None:
+            self._block_model_cache.close()
@@ -0,0 +1,11 @@
+#version 120
+varying vec2 fTexCoord;
+
+uniform sampler2D image;
+
+void main(){
+    vec4 texColor = texture2D(image, fTexCoord);
+    if(texColor.a < 0.02)
+        discard;
+    gl_FragColor = texColor;
+}
\ No newline at end of file
@@ -0,0 +1,14 @@
+#version 120
+#extension GL_ARB_explicit_attrib_location : enable
+
+layout(location = 0) in vec3 positions;
+layout(location = 1) in vec2 vTexCoord;
+
+varying vec2 fTexCoord;
+
+uniform mat4 transformation_matrix;
+
+void main(){
+    gl_Position = transformation_matrix * vec4(positions, 1.0);
+    fTexCoord = vTexCoord;
+}
\ No newline at end of file
@@ -0,0 +1,13 @@
+#version 330
+in vec2 fTexCoord;
+
+out vec4 outColor;
+
+uniform sampler2D image;
+
+void main(){
+    vec4 texColor = texture(image, fTexCoord);
+    if(texColor.a < 0.02)
+        discard;
+    outColor = texColor;
+}
\ No newline at end of file
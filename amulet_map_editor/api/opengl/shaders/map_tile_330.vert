@@ -0,0 +1,12 @@
+#version 330
+layout(location = 0) in vec3 positions;
+layout(location = 1) in vec2 vTexCoord;
+
+out vec2 fTexCoord;
+
+uniform mat4 transformation_matrix;
+
+void main(){
+    gl_Position = transformation_matrix * vec4(positions, 1.0);
+    fTexCoord = vTexCoord;
+}
\ No newline at end of file
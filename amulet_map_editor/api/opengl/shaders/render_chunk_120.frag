@@ -2,8 +2,12 @@
 varying vec2 fTexCoord;
 varying vec4 fTexOffset;
 varying vec3 fTint;
+varying vec2 fBiomeCoord;
 
 uniform sampler2D image;
+uniform sampler2D biome_tint;
+// The number of block columns along each side of the biome tint texture.
+uniform float biome_tint_size;
 
 void main(){
     vec4 texColor = texture2D(
@@ -15,6 +19,13 @@ void main(){
 	);
 	if(texColor.a < 0.02)
         discard;
-    texColor.xyz = texColor.xyz * fTint * 0.85;
+    vec3 tint = fTint;
+    if(fTint.x < 0.0){
+        // Biome tinted face. fTint.x is minus the tint class and fTint.y is the shading.
+        // The tint texture holds one square of columns per tint class for the region.
+        vec2 column = clamp(fBiomeCoord / biome_tint_size, 0.5 / biome_tint_size, 1.0 - 0.5 / biome_tint_size);
+        tint = texture2D(biome_tint, vec2(column.x, (column.y - fTint.x - 1.0) * 0.5)).rgb * fTint.y;
+    }
+    texColor.xyz = texColor.xyz * tint * 0.85;
 	gl_FragColor = texColor;
 }
\ No newline at end of file
@@ -9,6 +9,7 @@ layout(location = 3) in vec3 vTint;
 varying vec2 fTexCoord;
 varying vec4 fTexOffset;
 varying vec3 fTint;
+varying vec2 fBiomeCoord;
 
 uniform mat4 transformation_matrix;
 
@@ -17,4 +18,5 @@ void main(){
     fTexCoord = vTexCoord;
     fTexOffset = vTexOffset;
     fTint = vTint;
+    fBiomeCoord = positions.xz;
 }
\ No newline at end of file
@@ -2,10 +2,14 @@
 in vec2 fTexCoord;
 in vec4 fTexOffset;
 in vec3 fTint;
+in vec2 fBiomeCoord;
 
 out vec4 outColor;
 
 uniform sampler2D image;
+uniform sampler2D biome_tint;
+// The number of block columns along each side of the biome tint texture.
+uniform float biome_tint_size;
 
 void main(){
     vec4 texColor = texture(
@@ -17,6 +21,13 @@ void main(){
 	);
 	if(texColor.a < 0.02)
         discard;
-    texColor.xyz = texColor.xyz * fTint * 0.85;
+    vec3 tint = fTint;
+    if(fTint.x < 0.0){
+        // Biome tinted face. fTint.x is minus the tint class and fTint.y is the shading.
+        // The tint texture holds one square of columns per tint class for the region.
+        vec2 column = clamp(fBiomeCoord / biome_tint_size, 0.5 / biome_tint_size, 1.0 - 0.5 / biome_tint_size);
+        tint = texture(biome_tint, vec2(column.x, (column.y - fTint.x - 1.0) * 0.5)).rgb * fTint.y;
+    }
+    texColor.xyz = texColor.xyz * tint * 0.85;
 	outColor = texColor;
 }
\ No newline at end of file
@@ -7,6 +7,7 @@ layout(location = 3) in vec3 vTint;
 out vec2 fTexCoord;
 out vec4 fTexOffset;
 out vec3 fTint;
+out vec2 fBiomeCoord;
 
 uniform mat4 transformation_matrix;
 
@@ -15,4 +16,5 @@ void main(){
     fTexCoord = vTexCoord;
     fTexOffset = vTexOffset;
     fTint = vTint;
+    fBiomeCoord = positions.xz;
 }
\ No newline at end of file
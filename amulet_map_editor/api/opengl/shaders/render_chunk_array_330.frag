@@ -0,0 +1,34 @@
+#version 330
+in vec2 fTexCoord;
+in vec4 fTexOffset;
+in vec3 fTint;
+in vec2 fBiomeCoord;
+
+out vec4 outColor;
+
+uniform sampler2DArray image;
+uniform sampler2D biome_tint;
+// The number of block columns along each side of the biome tint texture.
+uniform float biome_tint_size;
+
+void main(){
+    // fTexOffset.x is the texture layer.
+    // The gradients are taken from the unwrapped coordinates so that the mip level does not jump where the texture repeats.
+    vec4 texColor = textureGrad(
+    	image,
+    	vec3(fract(fTexCoord), fTexOffset.x),
+    	dFdx(fTexCoord),
+    	dFdy(fTexCoord)
+	);
+	if(texColor.a < 0.02)
+        discard;
+    vec3 tint = fTint;
+    if(fTint.x < 0.0){
+        // Biome tinted face. fTint.x is minus the tint class and fTint.y is the shading.
+        // The tint texture holds one square of columns per tint class for the region.
+        vec2 column = clamp(fBiomeCoord / biome_tint_size, 0.5 / biome_tint_size, 1.0 - 0.5 / biome_tint_size);
+        tint = texture(biome_tint, vec2(column.x, (column.y - fTint.x - 1.0) * 0.5)).rgb * fTint.y;
+    }
+    texColor.xyz = texColor.xyz * tint * 0.85;
+	outColor = texColor;
+}
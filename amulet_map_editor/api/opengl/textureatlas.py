@@ -24,7 +24,10 @@
 
 import logging
 from PIL import Image
+import numpy
 import math
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, Tuple, List, Optional, Generator
 
 log = logging.getLogger(__name__)
@@ -154,18 +157,141 @@ class PackRegion(object):
         return self._sub1.pack(packable, border) or self._sub2.pack(packable, border)
 
 
+class SkylinePacker(object):
+    """A skyline bottom-left packer.
+
+    The top edge of the packed area is stored as a list of horizontal segments.
+    Each packable is placed where its top edge is lowest, breaking ties by the left-most position.
+    If a packable does not fit the canvas is grown in place without repacking the existing packables.
+    """
+
+    def __init__(self, width: int, height: int, max_size: Optional[int] = None):
+        """
+        Create a new SkylinePacker.
+
+        :param width: The initial width of the canvas.
+        :param height: The initial height of the canvas.
+        :param max_size: The maximum width and height the canvas may grow to. None for no limit.
+        """
+        self._width = width
+        self._height = height
+        self._max_size = max_size
+        # A list of [x, y, width] segments ordered by x covering the full width of the canvas.
+        self._skyline: List[List[int]] = [[0, 0, width]]
+
+    @property
+    def width(self) -> int:
+        return self._width
+
+    @property
+    def height(self) -> int:
+        return self._height
+
+    def _find_position(self, width: int, height: int) -> Optional[Tuple[int, int, int]]:
+        """Find the best position for a rectangle.
+
+        :return: The skyline index, x and y of the best position or None if it does not fit.
+        """
+        best = None
+        best_top = best_x = 0
+        skyline = self._skyline
+        for index, (x, _, _) in enumerate(skyline):
+            if x + width > self._width:
+                break
+            # The rectangle sits on the highest segment it spans
+            y = 0
+            remaining = width
+            span_index = index
+            while remaining > 0:
+                _, segment_y, segment_width = skyline[span_index]
+                y = max(y, segment_y)
+                remaining -= segment_width
+                span_index += 1
+            top = y + height
+            if top > self._height:
+                continue
+            if best is None or top < best_top or (top == best_top and x < best_x):
+                best = (index, x, y)
+                best_top = top
+                best_x = x
+        return best
+
+    def _place(self, index: int, x: int, y: int, width: int, height: int):
+        """Add a rectangle to the skyline."""
+        skyline = self._skyline
+        end = x + width
+        # Remove or shorten the segments covered by the rectangle
+        while index < len(skyline) and skyline[index][0] < end:
+            segment_x, segment_y, segment_width = skyline[index]
+            if segment_x + segment_width <= end:
+                del skyline[index]
+            else:
+                skyline[index] = [end, segment_y, segment_x + segment_width - end]
+                break
+        skyline.insert(index, [x, y + height, width])
+        self._merge()
+
+    def _merge(self):
+        """Merge neighbouring segments of the same height."""
+        skyline = self._skyline
+        index = 0
+        while index < len(skyline) - 1:
+            if skyline[index][1] == skyline[index + 1][1]:
+                skyline[index][2] += skyline.pop(index + 1)[2]
+            else:
+                index += 1
+
+    def _grow(self) -> bool:
+        """Double the smaller side of the canvas.
+
+        :return: False if the canvas cannot grow any further.
+        """
+        if self._width <= self._height:
+            if self._max_size is not None and self._width * 2 > self._max_size:
+                return False
+            self._skyline.append([self._width, 0, self._width])
+            self._width *= 2
+            self._merge()
+        else:
+            if self._max_size is not None and self._height * 2 > self._max_size:
+                return False
+            self._height *= 2
+        log.info(f"Grew the texture atlas to {self._width}x{self._height}")
+        return True
+
+    def pack(self, packable: Packable, border: int):
+        """Pack 2D packable into this canvas, growing the canvas if required."""
+        width = packable.width + border * 2
+        height = packable.height + border * 2
+        while True:
+            position = self._find_position(width, height)
+            if position is not None:
+                break
+            if not self._grow():
+                raise AtlasTooSmall("Failed to pack frame")
+        index, x, y = position
+        self._place(index, x, y, width, height)
+        packable.x = x + border
+        packable.y = y + border
+
+
 class Frame(Packable):
     """An image file that can be packed into a PackRegion."""
 
-    def __init__(self, filename: str):
+    def __init__(self, filename: str, image: Optional[numpy.ndarray] = None):
+        """
+        Create a new Frame.
+
+        :param filename: The path of the image file.
+        :param image: The decoded RGBA image array. If not given the file will be decoded.
+        """
         self._filename = filename
 
-        # Determine frame dimensions
-        image: Image.Image = Image.open(filename)
-        self._image: Image.Image = image.copy()
-        image.close()
+        if image is None:
+            image = decode_image(filename)
+        self._image: numpy.ndarray = image
 
-        width, height = self._image.size
+        height, width = self._image.shape[:2]
 
         super(Frame, self).__init__(width, height)
 
@@ -173,14 +299,26 @@ class Frame(Packable):
     def filename(self) -> str:
         return self._filename
 
-    def draw(self, image: Image.Image, border: int):
-        """Draw this frame into another Image."""
+    def draw(self, image: numpy.ndarray, border: int):
+        """Draw this frame into an RGBA image array."""
         if border:
-            image.paste(
-                self._image.resize(tuple(s + border * 2 for s in self._image.size)),
-                (self.x - border, self.y - border),
+            image[
+                self.y - border : self.y + self.height + border,
+                self.x - border : self.x + self.width + border,
+            ] = numpy.pad(
+                self._image, ((border, border), (border, border), (0, 0)), mode="edge"
             )
-        image.paste(self._image, (self.x, self.y))
+        else:
+            image[
+                self.y : self.y + self.height, self.x : self.x + self.width
+            ] = self._image
+
+
+def decode_image(filename: str) -> numpy.ndarray:
+    """Decode an image file into an RGBA uint8 array of shape (height, width, 4).
+    PIL releases the GIL while decoding so this can be run in a thread pool."""
+    with Image.open(filename) as image:
+        return numpy.asarray(image.convert("RGBA"), numpy.uint8)
 
 
 class Texture(object):
@@ -199,11 +337,13 @@ class Texture(object):
         return self._frames
 
 
-class TextureAtlas(PackRegion):
+class TextureAtlas(SkylinePacker):
     """Texture Atlas generator."""
 
-    def __init__(self, width: int, height: int, border: int = 0):
-        super(TextureAtlas, self).__init__(0, 0, width, height)
+    def __init__(
+        self, width: int, height: int, border: int = 0, max_size: Optional[int] = None
+    ):
+        super(TextureAtlas, self).__init__(width, height, max_size)
         self._textures: List[Texture] = []
         self._border = border
 
@@ -215,7 +355,9 @@ class TextureAtlas(PackRegion):
         """Pack a Texture into this atlas."""
         self._textures.append(texture)
         for frame in texture.frames:
-            if not super(TextureAtlas, self).pack(frame, self._border):
+            try:
+                super(TextureAtlas, self).pack(frame, self._border)
+            except AtlasTooSmall:
                 raise AtlasTooSmall("Failed to pack frame %s" % frame.filename)
 
     def to_dict(self) -> Dict[str, Tuple[int, int, int, int]]:
@@ -230,14 +372,21 @@ class TextureAtlas(PackRegion):
             for tex in self.textures
         }
 
-    def generate(self, mode: str) -> Image.Image:
-        """Generates the final texture atlas."""
-        out = Image.new(mode, (self.width, self.height))
+    def generate_array(self) -> numpy.ndarray:
+        """Generates the final texture atlas as an RGBA uint8 array of shape (height, width, 4)."""
+        out = numpy.zeros((self.height, self.width, 4), numpy.uint8)
         for t in self._textures:
             for f in t.frames:
                 f.draw(out, self._border)
         return out
 
+    def generate(self, mode: str) -> Image.Image:
+        """Generates the final texture atlas."""
+        out = Image.fromarray(self.generate_array())
+        if mode != "RGBA":
+            out = out.convert(mode)
+        return out
+
     def write(self, filename: str, mode: str):
         """Generates and saves the final texture atlas."""
         out = self.generate(mode)
@@ -273,23 +422,43 @@ def create_atlas_iter(
     None,
     Tuple[Image.Image, Dict[str, Tuple[float, float, float, float]]],
 ]:
+    texture_atlas, texture_bounds = yield from create_atlas_array_iter(texture_tuple)
+    return Image.fromarray(texture_atlas), texture_bounds
+
+
+def create_atlas_array_iter(
+    texture_tuple: Tuple[str, ...]
+) -> Generator[
+    float,
+    None,
+    Tuple[numpy.ndarray, Dict[str, Tuple[float, float, float, float]]],
+]:
+    """Create a texture atlas as an RGBA uint8 array of shape (height, width, 4)."""
     log.info("Creating texture atlas")
     # Parse texture names
     textures = []
-    for texture_index, texture in enumerate(texture_tuple):
-        if not texture_index % 100:
-            yield texture_index / (len(texture_tuple) * 2)
-        # Look for a texture name
-        name, frames = texture, [texture]
-
-        # Build frame objects
-        frames = [Frame(f) for f in frames]
-
-        # Add frames to texture object list
-        textures.append(Texture(name, frames))
-
-    # Sort textures by perimeter size in non-increasing order
-    textures = sorted(textures, key=lambda i: i.frames[0].perimeter, reverse=True)
+    # Decode the images in parallel. PIL releases the GIL while decoding.
+    with ThreadPoolExecutor() as executor:
+        images = executor.map(decode_image, texture_tuple)
+        for texture_index, (texture, image) in enumerate(zip(texture_tuple, images)):
+            if not texture_index % 100:
+                yield texture_index / (len(texture_tuple) * 2)
+            # Look for a texture name
+            name = texture
+
+            # Build frame objects
+            frames = [Frame(texture, image)]
+
+            # Add frames to texture object list
+            textures.append(Texture(name, frames))
+
+    # Sort textures by height then width in non-increasing order.
+    # The skyline packer wastes the least space when packing the tallest textures first.
+    textures = sorted(
+        textures,
+        key=lambda i: (i.frames[0].height, i.frames[0].width),
+        reverse=True,
+    )
 
     height = 0
     width = 0
@@ -302,26 +471,20 @@ def create_atlas_iter(
 
     size = max(height, width, 1 << (math.ceil(pixels**0.5) - 1).bit_length())
 
-    atlas_created = False
-    atlas = None
-    while not atlas_created:
-        try:
-            # Create the atlas and pack textures in
-            log.info(f"Trying to pack textures into image of size {size}x{size}")
-            atlas = TextureAtlas(size, size)
+    # Create the atlas and pack textures in. The atlas grows in place if it is too small.
+    log.info(f"Packing textures into image of size {size}x{size}")
+    atlas = TextureAtlas(size, size)
 
-            for texture_index, texture in enumerate(textures):
-                if not texture_index % 30:
-                    yield 0.5 + texture_index / (len(textures) / 2)
-                atlas.pack(texture)
-            atlas_created = True
-        except AtlasTooSmall:
-            log.info(f"Image was too small. Trying with a larger area")
-            size *= 2
+    for texture_index, texture in enumerate(textures):
+        if not texture_index % 30:
+            yield 0.5 + texture_index / (len(textures) * 2)
+        atlas.pack(texture)
 
-    log.info(f"Successfully packed textures into an image of size {size}x{size}")
+    log.info(
+        f"Successfully packed textures into an image of size {atlas.width}x{atlas.height}"
+    )
 
-    texture_atlas = atlas.generate("RGBA")
+    texture_atlas = atlas.generate_array()
 
     texture_bounds = atlas.to_dict()
     texture_bounds = {
@@ -330,3 +493,44 @@ def create_atlas_iter(
 
     log.info("Finished creating texture atlas")
     return texture_atlas, texture_bounds
+
+
+def create_texture_array(
+    atlas: numpy.ndarray, texture_bounds: Dict[str, Tuple[float, float, float, float]]
+) -> Tuple[numpy.ndarray, Dict[str, int]]:
+    """
+    Split a texture atlas into layers of the same size for use in a 2D texture array.
+    Each texture is scaled to the most common texture size. Animated textures use their first frame.
+
+    :param atlas: The texture atlas as an RGBA uint8 array of shape (height, width, 4).
+    :param texture_bounds: The bounds of each texture in the atlas as returned by create_atlas_array_iter.
+    :return: An RGBA uint8 array of shape (layer_count, size, size, 4) and the layer index of each texture.
+    """
+    height, width = atlas.shape[:2]
+    regions: Dict[str, Tuple[int, int, int, int]] = {
+        name: (
+            round(u0 * width),
+            round(v0 * height),
+            round(u1 * width),
+            round(v1 * height),
+        )
+        for name, (u0, v0, u1, v1) in texture_bounds.items()
+    }
+    sizes = Counter(max(x1 - x0, y1 - y0, 1) for x0, y0, x1, y1 in regions.values())
+    size = sizes.most_common(1)[0][0] if sizes else 1
+    log.info(f"Creating texture array of {len(regions)} layers of size {size}x{size}")
+
+    layers = numpy.zeros((max(len(regions), 1), size, size, 4), numpy.uint8)
+    layer_indexes: Dict[str, int] = {}
+    for layer_index, (name, (x0, y0, x1, y1)) in enumerate(regions.items()):
+        region = atlas[y0:y1, x0:x1]
+        if region.shape[:2] != (size, size) and region.size:
+            region = numpy.asarray(
+                Image.fromarray(numpy.ascontiguousarray(region)).resize(
+                    (size, size), Image.NEAREST
+                )
+            )
+        if region.shape[:2] == (size, size):
+            layers[layer_index] = region
+        layer_indexes[name] = layer_index
+    return layers, layer_indexes
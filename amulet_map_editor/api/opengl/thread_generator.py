@@ -1,54 +1,145 @@
-from typing import List
+from typing import List, Dict, Optional, Generator
+import time
 
 
 class ThreadedObject:
     """Data/Geometry generation controlled by an external thread."""
 
-    def thread_action(self):
-        """The action the thread will call."""
+    def thread_action(self) -> Optional[bool]:
+        """The action the thread will call.
+        Return False if there was nothing to do so that lower priority objects can be serviced.
+        Any other return value is treated as work having been done."""
         raise NotImplementedError
 
     @property
     def thread_weighting(self) -> int:
-        """The number of times the thread_action should be called."""
+        """The relative length of the time slice given to this object when sharing the thread with objects of the same priority."""
         return 1
 
 
+class ThreadedObjectStats:
+    """Throughput statistics for an object registered with a ThreadedObjectContainer."""
+
+    __slots__ = ("action_count", "work_count", "total_time")
+
+    def __init__(self):
+        # The number of times thread_action was called
+        self.action_count = 0
+        # The number of calls to thread_action that did work
+        self.work_count = 0
+        # The total time in seconds spent in thread_action
+        self.total_time = 0.0
+
+    @property
+    def throughput(self) -> float:
+        """The number of actions that did work per second spent in thread_action."""
+        if self.total_time:
+            return self.work_count / self.total_time
+        return 0.0
+
+    def __repr__(self):
+        return (
+            f"ThreadedObjectStats(action_count={self.action_count}, "
+            f"work_count={self.work_count}, total_time={self.total_time:.3f})"
+        )
+
+
 class ThreadedObjectContainer(ThreadedObject):
+    """A ThreadedObject that shares the thread between a number of ThreadedObjects.
+
+    Objects with a higher priority are always serviced first.
+    Objects of lower priority are only serviced when all higher priority objects have nothing to do.
+    Objects with the same priority share the thread in time slices scaled by their thread_weighting.
+    """
+
+    # The base length of a time slice in seconds.
+    time_slice = 0.05
+
     def __init__(self):
         self._objects: List[ThreadedObject] = []
-        self._obj_index = 0
-        self._obj_sub_index = 0
+        self._priorities: Dict[ThreadedObject, int] = {}
+        self._stats: Dict[ThreadedObject, ThreadedObjectStats] = {}
+        # The object that owns the current time slice
+        self._active_object: Optional[ThreadedObject] = None
+        self._slice_end = 0.0
+
+    def register(self, thread_object: ThreadedObject, priority: int = 0):
+        """
+        Register a ThreadedObject to be serviced by this container.
 
-    def register(self, thread_object: ThreadedObject):
+        :param thread_object: The object to register.
+        :param priority: The priority of the object. Higher priority objects are serviced first.
+        """
         assert isinstance(thread_object, ThreadedObject)
         if thread_object in self._objects:
             raise Exception("ThreadedObject object is already registered.")
         self._objects.append(thread_object)
+        self._priorities[thread_object] = priority
+        self._stats[thread_object] = ThreadedObjectStats()
 
     def unregister(self, thread_object: ThreadedObject):
         assert isinstance(thread_object, ThreadedObject)
         if thread_object not in self._objects:
             raise Exception("ThreadedObject object was not already registered.")
         self._objects.remove(thread_object)
+        self._priorities.pop(thread_object, None)
+        self._stats.pop(thread_object, None)
+        if self._active_object is thread_object:
+            self._active_object = None
+
+    def get_priority(self, thread_object: ThreadedObject) -> int:
+        """Get the priority of a registered object."""
+        return self._priorities[thread_object]
+
+    def set_priority(self, thread_object: ThreadedObject, priority: int):
+        """Change the priority of a registered object."""
+        if thread_object not in self._priorities:
+            raise Exception("ThreadedObject object was not already registered.")
+        self._priorities[thread_object] = priority
+
+    @property
+    def thread_stats(self) -> Dict[ThreadedObject, ThreadedObjectStats]:
+        """The throughput statistics for each registered object."""
+        return dict(self._stats)
+
+    def _schedule(self) -> Generator[ThreadedObject, None, None]:
+        """Yield the registered objects in the order they should be tried."""
+        levels: Dict[int, List[ThreadedObject]] = {}
+        for obj in self._objects:
+            levels.setdefault(self._priorities.get(obj, 0), []).append(obj)
+
+        active = self._active_object
+        slice_expired = time.perf_counter() >= self._slice_end
+        for priority in sorted(levels, reverse=True):
+            objects = levels[priority]
+            if active in objects:
+                # rotate the objects so that the active object continues until its time slice expires
+                index = objects.index(active) + slice_expired
+                objects = objects[index:] + objects[:index]
+            yield from objects
 
-    def thread_action(self):
-        """The action the thread will call."""
-        if self._obj_index >= len(self._objects):
-            self._obj_index = 0
-            self._obj_sub_index = 0
-        while (
-            self._obj_index < len(self._objects)
-            and self._objects[self._obj_index].thread_weighting < self._obj_sub_index
-        ):
-            self._obj_index += 1
-            self._obj_sub_index = 0
-
-        if self._obj_index < len(self._objects):
-            self._objects[self._obj_index].thread_action()
-            self._obj_sub_index += 1
+    def thread_action(self) -> bool:
+        """The action the thread will call.
+        Returns False if none of the registered objects had anything to do."""
+        for obj in self._schedule():
+            start = time.perf_counter()
+            did_work = obj.thread_action() is not False
+            end = time.perf_counter()
+            stats = self._stats.get(obj)
+            if stats is not None:
+                stats.action_count += 1
+                stats.work_count += did_work
+                stats.total_time += end - start
+            if did_work:
+                if obj is not self._active_object or end >= self._slice_end:
+                    self._active_object = obj
+                    self._slice_end = end + self.time_slice * max(
+                        1, obj.thread_weighting
+                    )
+                return True
+        return False
 
     @property
     def thread_weighting(self) -> int:
-        """The number of times the thread_action should be called."""
+        """The relative length of the time slice given to this object when sharing the thread with objects of the same priority."""
         return sum(obj.thread_weighting for obj in self._objects)
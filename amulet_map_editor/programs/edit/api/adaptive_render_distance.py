@@ -0,0 +1,131 @@
+import time
+from typing import Optional
+
+
+class AdaptiveRenderDistance:
+    """Automatically scale the effective render distance to hold a target frame rate.
+
+    The frame time is measured between :meth:`start_frame` and :meth:`end_frame` and smoothed over time.
+    :meth:`end_frame` must be called before the buffers are swapped so that the vsync wait is not counted.
+    Periodically the effective render distance is grown if there is frame time to spare and the chunk
+    pipeline has caught up, or shrunk if the frame time is over budget.
+    The effective render distance is never larger than the user's configured render distance.
+    """
+
+    # The minimum effective render distance in chunks.
+    min_render_distance = 2
+    # How quickly the frame time average responds to changes (0-1).
+    smoothing = 0.1
+    # The minimum number of seconds between two changes of the render distance.
+    adjust_interval = 1.0
+    # The frame time must be below this fraction of the target to grow the render distance.
+    grow_threshold = 0.7
+    # The frame time must be above this fraction of the target to shrink the render distance.
+    shrink_threshold = 1.1
+    # The render distance will only grow if fewer than this many chunks are waiting to be loaded.
+    max_backlog = 32
+
+    def __init__(self, max_render_distance: int, target_fps: float = 60.0):
+        """
+        Create a new AdaptiveRenderDistance instance.
+
+        :param max_render_distance: The largest render distance that may be used.
+        :param target_fps: The frame rate to aim for.
+        """
+        self._enabled = False
+        self._max_render_distance = max_render_distance
+        self._render_distance = max_render_distance
+        self._target_fps = target_fps
+        self._frame_start: Optional[float] = None
+        self._frame_time: Optional[float] = None
+        self._last_adjust_time = 0.0
+
+    @property
+    def enabled(self) -> bool:
+        """Is the render distance being adapted."""
+        return self._enabled
+
+    @enabled.setter
+    def enabled(self, enabled: bool):
+        self._enabled = bool(enabled)
+        self._frame_time = None
+        if not self._enabled:
+            self._render_distance = self._max_render_distance
+
+    @property
+    def target_fps(self) -> float:
+        """The frame rate to aim for."""
+        return self._target_fps
+
+    @target_fps.setter
+    def target_fps(self, target_fps: float):
+        self._target_fps = max(1.0, float(target_fps))
+
+    @property
+    def max_render_distance(self) -> int:
+        """The largest render distance that may be used."""
+        return self._max_render_distance
+
+    @max_render_distance.setter
+    def max_render_distance(self, max_render_distance: int):
+        self._max_render_distance = max_render_distance
+        if self._enabled:
+            self._render_distance = min(self._render_distance, max_render_distance)
+        else:
+            self._render_distance = max_render_distance
+
+    @property
+    def render_distance(self) -> int:
+        """The render distance that should currently be used."""
+        return self._render_distance
+
+    @property
+    def frame_time(self) -> Optional[float]:
+        """The smoothed time in seconds it takes to draw a frame. None if no frame has been measured."""
+        return self._frame_time
+
+    def start_frame(self):
+        """Mark the start of a frame."""
+        self._frame_start = time.perf_counter()
+
+    def end_frame(self):
+        """Mark the end of a frame and update the frame time average."""
+        if self._frame_start is not None:
+            frame_time = time.perf_counter() - self._frame_start
+            self._frame_start = None
+            if self._frame_time is None:
+                self._frame_time = frame_time
+            else:
+                self._frame_time += (frame_time - self._frame_time) * self.smoothing
+
+    def update(self, chunk_backlog: int) -> bool:
+        """
+        Grow or shrink the render distance based on the frame time and chunk backlog.
+
+        :param chunk_backlog: The number of chunks waiting to be loaded.
+        :return: True if the render distance changed.
+        """
+        if not self._enabled or self._frame_time is None:
+            return False
+        t = time.perf_counter()
+        if t < self._last_adjust_time + self.adjust_interval:
+            return False
+
+        target_frame_time = 1 / self._target_fps
+        render_distance = self._render_distance
+        if self._frame_time > target_frame_time * self.shrink_threshold:
+            render_distance = max(
+                min(self.min_render_distance, self._max_render_distance),
+                render_distance - 1,
+            )
+        elif (
+            self._frame_time < target_frame_time * self.grow_threshold
+            and chunk_backlog < self.max_backlog
+        ):
+            render_distance = min(self._max_render_distance, render_distance + 1)
+
+        if render_distance != self._render_distance:
+            self._render_distance = render_distance
+            self._last_adjust_time = t
+            return True
+        return False
@@ -38,6 +38,8 @@ class ChunkSelectionBehaviour(PointerBehaviour):
             self.canvas.context_identifier,
             self.canvas.renderer.opengl_resource_pack,
         )
+        self.canvas.renderer.add_resource_pack_user(self._editing_selection)
+        self.canvas.renderer.add_resource_pack_user(self._selection)
         self._editing = False
         self._press_time = 0
         self._start_box = numpy.zeros((2, 3))
@@ -131,12 +133,9 @@ class ChunkSelectionBehaviour(PointerBehaviour):
         else:
             camera_location = self.canvas.camera.location
             look_vector = self.look_vector()
-            (
-                box,
-                max_distance,
-            ) = self._selection.selection_group.closest_vector_intersection(
-                camera_location, look_vector
-            )
+            box, max_distance = self.canvas.selection.get_selection_bvh(
+                self._selection.selection_group
+            ).closest_vector_intersection(camera_location, look_vector)
             location, hit = self.closest_block_3d(min(max_distance, 100))
 
         chunk_size = self.canvas.world.sub_chunk_size
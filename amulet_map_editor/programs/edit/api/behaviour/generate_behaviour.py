@@ -93,6 +93,7 @@ class GenerationBehaviour(PointerBehaviour):
                 self.canvas.renderer.opengl_resource_pack,
             )
         )
+        self.canvas.renderer.add_resource_pack_user(self._selection)
 
         volume_half = [volume_size[0] // 2, volume_size[1] // 2, volume_size[2] // 2]
 
@@ -126,6 +127,7 @@ class GenerationBehaviour(PointerBehaviour):
                 self.canvas.context_identifier,
                 self.canvas.renderer.opengl_resource_pack,
             )
+            self.canvas.renderer.add_resource_pack_user(self._active_selection)
 
     def _unload_active_selection(self):
         """Unload the active selection if it exists."""
@@ -484,9 +486,16 @@ class GenerationBehaviour(PointerBehaviour):
         self, camera: PointCoordinates, look_vector: NPVector3
     ) -> Tuple[SelectionGroup, Optional[int], float]:
         selection_group = self.selection_group
-        box_index, max_distance = selection_group.closest_vector_intersection(
-            camera, look_vector
-        )
+        # The static boxes change less often than the active box so they use a cached hierarchy.
+        box_index, max_distance = self.canvas.selection.get_selection_bvh(
+            self._selection.selection_group
+        ).closest_vector_intersection(camera, look_vector)
+        if self._active_selection is not None and not self._editing:
+            distance = self._active_selection.selection_box.intersects_vector(
+                camera, look_vector
+            )
+            if distance is not None and distance < max_distance:
+                box_index, max_distance = len(self._selection), distance
         return selection_group, box_index, max_distance
 
     def _get_box_faces(self) -> Tuple[Optional[int], float, NPArray2x3]:
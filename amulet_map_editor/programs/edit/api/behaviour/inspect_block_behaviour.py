@@ -1,8 +1,11 @@
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Tuple, Optional, Any
+from collections import OrderedDict
 import logging
 
 import wx
 from wx.adv import RichToolTip
+from amulet.api.block import Block
+from amulet.api.block_entity import BlockEntity
 from amulet.api.chunk.biomes import BiomesShape
 
 from .base_behaviour import BaseBehaviour
@@ -20,6 +23,9 @@ if TYPE_CHECKING:
 
 log = logging.getLogger(__name__)
 
+# The number of translated block messages to keep.
+MaxCachedVersionText = 1024
+
 
 class InspectBlockBehaviour(BaseBehaviour):
     """Adds a popup with block information."""
@@ -27,6 +33,11 @@ class InspectBlockBehaviour(BaseBehaviour):
     def __init__(self, canvas: "EditCanvas", pointer_behaviour: PointerBehaviour):
         super().__init__(canvas)
         self._pointer_behaviour = pointer_behaviour
+        # A map from the translator key, universal block and block entity key
+        # to the version text and the universal block entity text.
+        self._version_text_cache: "OrderedDict[Tuple[str, Any, Block, Optional[tuple]], Tuple[str, Optional[str]]]" = (
+            OrderedDict()
+        )
 
     def bind_events(self):
         """Set up all events required to run."""
@@ -58,37 +69,75 @@ class InspectBlockBehaviour(BaseBehaviour):
         x, y = self.canvas.mouse.xy
         tooltip.ShowFor(self.canvas, wx.Rect(x, y, 1, 1))
 
+    @staticmethod
+    def _get_block_entity_key(block_entity: Optional[BlockEntity]) -> Optional[tuple]:
+        """Get a hashable key for a block entity.
+        The binary NBT is much faster to create than the text shown to the user."""
+        if not block_entity:
+            return None
+        return (
+            block_entity.namespaced_name,
+            block_entity.location,
+            block_entity.nbt.save_to(compressed=False),
+        )
+
+    def _get_version_text(
+        self,
+        block: Block,
+        block_entity: Optional[BlockEntity],
+        location: Tuple[int, int, int],
+    ) -> Tuple[str, Optional[str]]:
+        """Get the text describing the block in the world's native version and the universal block entity text.
+        Translating and formatting the block entity is slow so the text is cached for each block and block entity.
+        """
+        platform = self.canvas.world.level_wrapper.platform
+        version = self.canvas.world.level_wrapper.version
+        key = (platform, version, block, self._get_block_entity_key(block_entity))
+        if key in self._version_text_cache:
+            self._version_text_cache.move_to_end(key)
+            return self._version_text_cache[key]
+        block_entity_str = str(block_entity) if block_entity else None
+
+        translator = self.canvas.world.translation_manager.get_version(
+            platform,
+            version,
+        )
+        (
+            version_block,
+            version_block_entity,
+            extra_needed,
+        ) = translator.block.from_universal(
+            block, block_entity, block_location=location
+        )
+        if isinstance(version, tuple):
+            version_str = ".".join(str(v) for v in version[:4])
+        else:
+            version_str = str(version)
+        version_text = f"{platform.capitalize()} {version_str}\n{version_block}"
+        if version_block_entity:
+            version_block_entity_str = str(version_block_entity)
+            version_text = f"{version_text}\n{version_block_entity_str}"
+
+        # If the translation depends on the location the result cannot be reused.
+        if not extra_needed:
+            self._version_text_cache[key] = (version_text, block_entity_str)
+            if len(self._version_text_cache) > MaxCachedVersionText:
+                self._version_text_cache.popitem(last=False)
+        return version_text, block_entity_str
+
     def _get_block_info_message(self) -> str:
-        x, y, z = self._pointer_behaviour.pointer_base
+        x, y, z = map(int, self._pointer_behaviour.pointer_base)
         try:
-            block = self.canvas.world.get_block(x, y, z, self.canvas.dimension)
             chunk = self.canvas.world.get_chunk(x >> 4, z >> 4, self.canvas.dimension)
+            block = chunk.get_block(x & 15, y, z & 15)
             block_entity = chunk.block_entities.get((x, y, z), None)
-            platform = self.canvas.world.level_wrapper.platform
-            version = self.canvas.world.level_wrapper.version
-            translator = self.canvas.world.translation_manager.get_version(
-                platform,
-                version,
-            )
-            (
-                version_block,
-                version_block_entity,
-                _,
-            ) = translator.block.from_universal(
-                block, block_entity, block_location=(x, y, z)
+            version_text, block_entity_str = self._get_version_text(
+                block, block_entity, (x, y, z)
             )
-            if isinstance(version, tuple):
-                version_str = ".".join(str(v) for v in version[:4])
-            else:
-                version_str = str(version)
-            block_data_text = f"x: {x}, y: {y}, z: {z}\n\n{platform.capitalize()} {version_str}\n{version_block}"
-            if version_block_entity:
-                version_block_entity_str = str(version_block_entity)
-                block_data_text = f"{block_data_text}\n{version_block_entity_str}"
+            block_data_text = f"x: {x}, y: {y}, z: {z}\n\n{version_text}"
 
             block_data_text = f"{block_data_text}\n\nUniversal\n{block}"
             if block_entity:
-                block_entity_str = str(block_entity)
                 block_data_text = f"{block_data_text}\n{block_entity_str}"
 
             if chunk.biomes.dimension == BiomesShape.Shape2D:
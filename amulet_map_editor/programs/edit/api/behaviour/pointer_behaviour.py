@@ -48,16 +48,26 @@ class PointerBehaviour(RaycastBehaviour):
         # the distance between the camera and the pointer
         self._pointer_distance = 10
 
+        # is the pointer on a block found by the ray cast
+        self._pointer_hit = False
+
         # the pointer
         self._pointer = RenderSelection(
             self.canvas.context_identifier,
             self.canvas.renderer.opengl_resource_pack,
         )
+        self.canvas.renderer.add_resource_pack_user(self._pointer)
 
     @property
     def pointer_base(self) -> BlockCoordinatesNDArray:
         return self._pointer.point1
 
+    @property
+    def pointer_hit(self) -> bool:
+        """Is the pointer on a non-air block.
+        False if the ray cast did not find a block or the pointer is at a fixed distance from the camera."""
+        return self._pointer_hit
+
     def bind_events(self):
         super().bind_events()
         self.canvas.Bind(EVT_PRE_DRAW, self._pre_draw)
@@ -92,12 +102,13 @@ class PointerBehaviour(RaycastBehaviour):
     def _update_pointer(self):
         """Update the pointer location."""
         if self.canvas.camera.projection_mode == Projection.TOP_DOWN:
-            location = self.closest_block_2d()[0]
+            location, self._pointer_hit = self.closest_block_2d()
         else:
             if self.canvas.camera.rotating:
                 location = self.distance_block_3d(self._pointer_distance)
+                self._pointer_hit = False
             else:
-                location = self.closest_block_3d()[0]
+                location, self._pointer_hit = self.closest_block_3d()
 
         self._pointer.point1, self._pointer.point2 = location, location + 1
         self._post_change_event()
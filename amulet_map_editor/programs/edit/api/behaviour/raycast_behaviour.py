@@ -2,10 +2,6 @@ from typing import TYPE_CHECKING, Optional, Tuple, Generator, List
 import numpy
 import math
 
-from amulet.api.chunk import Chunk
-from amulet.api.block import UniversalAirLikeBlocks
-from amulet.api.errors import ChunkLoadError
-
 from amulet_map_editor.api.opengl.matrix import rotation_matrix_xy
 
 from amulet.api.data_types import PointCoordinatesNDArray
@@ -16,6 +12,44 @@ if TYPE_CHECKING:
     from amulet_map_editor.programs.edit.api.canvas import EditCanvas
 
 
+def voxel_traversal(
+    start_location: numpy.ndarray, look_vector: numpy.ndarray, max_distance: float
+) -> numpy.ndarray:
+    """
+    The block locations that a ray passes through in order.
+    This is a vectorised DDA traversal.
+    :param start_location: The start location of the ray.
+    :param look_vector: The unit direction of the ray. Components must not be zero.
+    :param max_distance: The maximum distance along the ray to traverse.
+    :return: An int array of shape (N, 3) containing the x, y, z coordinates of each block.
+    """
+    start = numpy.array(start_location, dtype=numpy.float64)
+    look_vector = numpy.array(look_vector, dtype=numpy.float64)
+    block = numpy.floor(start).astype(numpy.int64)
+    step = numpy.where(look_vector > 0, 1, -1)
+    # the distance along the ray between two block faces in each axis
+    delta = 1 / numpy.abs(look_vector)
+    # the distance along the ray to the first block face in each axis
+    first = numpy.where(look_vector > 0, block + 1 - start, start - block) * delta
+
+    face_distances = []
+    face_axes = []
+    for axis in range(3):
+        if first[axis] <= max_distance:
+            count = int((max_distance - first[axis]) // delta[axis]) + 1
+            face_distances.append(first[axis] + numpy.arange(count) * delta[axis])
+            face_axes.append(numpy.full(count, axis))
+    if not face_distances:
+        return block.reshape(1, 3)
+    # the axis of each block face crossed, ordered by distance along the ray
+    crossed_axes = numpy.concatenate(face_axes)[
+        numpy.argsort(numpy.concatenate(face_distances), kind="stable")
+    ]
+    steps = numpy.zeros((crossed_axes.size + 1, 3), dtype=numpy.int64)
+    steps[numpy.arange(1, crossed_axes.size + 1), crossed_axes] = step[crossed_axes]
+    return block + numpy.cumsum(steps, axis=0)
+
+
 class RaycastBehaviour(BaseBehaviour):
     """Adds the base behaviour for behaviours that needs to do ray casting."""
 
@@ -65,35 +99,39 @@ class RaycastBehaviour(BaseBehaviour):
         :param max_distance: The distance to search up to.
         :return: Tuple[The block coordinate, was a non-air block found in the range]
         """
-        cx: Optional[int] = None
-        cz: Optional[int] = None
-        chunk: Optional[Chunk] = None
+        locations = self.voxel_traversal(max_distance)
+        chunk_x = locations[:, 0] >> 4
+        chunk_z = locations[:, 2] >> 4
+        # the index of the first location in each chunk the ray passes through
+        chunk_starts = numpy.concatenate(
+            (
+                [0],
+                numpy.flatnonzero(
+                    (numpy.diff(chunk_x) != 0) | (numpy.diff(chunk_z) != 0)
+                )
+                + 1,
+            )
+        )
+        chunk_ends = numpy.append(chunk_starts[1:], len(locations))
+        chunk_mask_cache = self.canvas.chunk_mask_cache
         in_air = False
-
-        location = numpy.array([0, 0, 0], dtype=numpy.int32)
-        for location in self.collision_locations(max_distance):
-            x, y, z = location
-            cx_ = x >> 4
-            cz_ = z >> 4
-            if cx is None or cx != cx_ or cz != cz_:
-                cx = cx_
-                cz = cz_
-                try:
-                    chunk = self.canvas.world.get_chunk(cx, cz, self.canvas.dimension)
-                except ChunkLoadError:
-                    chunk = None
-
-            if (
-                chunk is not None
-                and chunk.block_palette[chunk.blocks[x % 16, y, z % 16]]
-                not in UniversalAirLikeBlocks
-            ):
-                # the block is not air
-                if in_air:  # if we have previously found an air block
-                    return location, True
-            elif not in_air:
+        for start, end in zip(chunk_starts, chunk_ends):
+            chunk_locations = locations[start:end]
+            air_mask = chunk_mask_cache.get_air_mask(
+                int(chunk_x[start]), int(chunk_z[start]), self.canvas.dimension
+            )
+            if air_mask is None:
+                # chunks that do not exist or failed to load are treated as air
                 in_air = True
-        return location, False
+                continue
+            air = air_mask.is_air(*chunk_locations.T)
+            # a block can only be hit once the ray has passed through air
+            passed_air = numpy.logical_or.accumulate(air) | in_air
+            hit = numpy.invert(air) & numpy.concatenate(([in_air], passed_air[:-1]))
+            if numpy.any(hit):
+                return chunk_locations[numpy.argmax(hit)], True
+            in_air = bool(passed_air[-1])
+        return locations[-1], False
 
     def get_2d_mouse_location(self) -> Tuple[float, float]:
         """Get the x and z location of the cursor when in 2D mode."""
@@ -122,38 +160,18 @@ class RaycastBehaviour(BaseBehaviour):
         x, z = self.get_2d_mouse_location()
         sub_chunk_size = self.canvas.world.sub_chunk_size
         y = min_y
-        try:
-            chunk = self.canvas.world.get_chunk(
-                int(x // sub_chunk_size),
-                int(z // sub_chunk_size),
-                self.canvas.dimension,
-            )
-        except ChunkLoadError:
-            pass
-        else:
-            box_max_chunk = int(min_y // sub_chunk_size)
-            sub_chunks = sorted(
-                [cy for cy in chunk.blocks.sub_chunks if cy >= box_max_chunk],
-                reverse=True,
-            )
-            if sub_chunks:
-                dx, dz = (numpy.floor([x, z]) % sub_chunk_size).astype(numpy.int64)
-                for sy in sub_chunks:
-                    blocks = numpy.invert(
-                        numpy.isin(
-                            chunk.blocks.get_section(sy)[dx, ::-1, dz],
-                            UniversalAirLikeBlocks,
-                        )
-                    )
-                    if numpy.any(blocks):
-                        y = (
-                            sub_chunk_size
-                            - 1
-                            - numpy.argmax(blocks)
-                            + sy * sub_chunk_size
-                        )
-                        y = max(min_y, y)
-                        return numpy.asarray((x, y, z)), True
+        heightmap = self.canvas.chunk_mask_cache.get_heightmap(
+            int(x // sub_chunk_size),
+            int(z // sub_chunk_size),
+            self.canvas.dimension,
+        )
+        if heightmap is not None:
+            dx, dz = (numpy.floor([x, z]) % sub_chunk_size).astype(numpy.int64)
+            height = int(heightmap[dx, dz])
+            # blocks in the sub-chunk containing min_y are found and clamped to min_y
+            if height >= (min_y // sub_chunk_size) * sub_chunk_size:
+                y = max(min_y, height)
+                return numpy.asarray((x, y, z)), True
         return numpy.asarray((x, y, z)), False
 
     def distance_block_3d(
@@ -177,6 +195,26 @@ class RaycastBehaviour(BaseBehaviour):
         ).astype(int)
         return position
 
+    def voxel_traversal(
+        self,
+        max_distance: float = 100,
+        start_location: Optional[numpy.ndarray] = None,
+        look_vector: Optional[numpy.ndarray] = None,
+    ) -> numpy.ndarray:
+        """
+        The block locations that the camera's look vector passes through in order.
+        This is a vectorised DDA traversal.
+        :param max_distance: The maximum distance along the look vector to traverse.
+        :param start_location: The start location. Defaults to the camera location.
+        :param look_vector: The unit look vector. Defaults to the camera look vector.
+        :return: An int array of shape (N, 3) containing the x, y, z coordinates of each block.
+        """
+        if look_vector is None:
+            look_vector = self.look_vector()
+        if start_location is None:
+            start_location = self.canvas.camera.location
+        return voxel_traversal(start_location, look_vector, max_distance)
+
     def collision_locations(
         self,
         max_distance: float = 100,
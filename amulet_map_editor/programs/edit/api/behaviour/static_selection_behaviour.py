@@ -18,6 +18,7 @@ class StaticSelectionBehaviour(BaseBehaviour):
             self.canvas.context_identifier,
             self.canvas.renderer.opengl_resource_pack,
         )
+        self.canvas.renderer.add_resource_pack_user(self._selection)
 
     def bind_events(self):
         self.canvas.Bind(EVT_SELECTION_CHANGE, self._on_selection_change)
@@ -0,0 +1,350 @@
+"""
+An index of which chunks contain each block so that blocks can be found without scanning the world.
+
+The index is stored in a database in the cache directory so that it only needs to be built once for each world.
+Chunks are indexed in the background and are re-indexed when they change.
+"""
+
+import os
+import time
+import hashlib
+import logging
+import sqlite3
+import weakref
+from typing import Optional, List, Tuple, Dict, Set
+
+import numpy
+
+from amulet.api.level import BaseLevel
+from amulet.api.chunk import Chunk
+from amulet.api.errors import ChunkDoesNotExist, ChunkLoadError
+from amulet.api.data_types import Dimension, BlockCoordinates
+
+from amulet_map_editor.api.opengl import ThreadedObject
+from amulet_map_editor.api.cache_database import CacheDatabase
+
+log = logging.getLogger(__name__)
+
+# Increment this if the format of the stored data changes.
+_BlockIndexVersion = 1
+# The number of seconds spent indexing chunks on each call to thread_action.
+ChunkBatchTime = 0.02
+# The maximum number of chunks returned by a search.
+MaxSearchResults = 1000
+# The maximum number of world indexes to keep. The least recently used are deleted.
+MaxCacheDatabases = 16
+
+
+def _escape_like(text: str) -> str:
+    """Escape the wildcard characters in a LIKE pattern."""
+    return text.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+class BlockIndex(ThreadedObject):
+    """An inverted index from each universal block to the chunks containing it and the number of times it occurs.
+
+    The chunks in the active dimension are indexed in the background.
+    Chunks are re-indexed when their changed_time differs from the one they were indexed with.
+    Chunks with unsaved changes are flagged in the database and are re-indexed when the world is next opened
+    because the changes may have been discarded. The whole index is discarded if the world was played since it was built.
+
+    This class is thread safe.
+    """
+
+    def __init__(self, level: BaseLevel):
+        self._level = weakref.ref(level)
+        self._dimension: Optional[Dimension] = None
+        # If the database cannot be opened the index is kept in memory for this session.
+        self._database = CacheDatabase(
+            "block_index",
+            f"{hashlib.sha1(os.path.abspath(level.level_path).encode()).hexdigest()}_{_BlockIndexVersion}",
+            self._create_tables,
+            MaxCacheDatabases,
+            in_memory_fallback=True,
+        )
+        self._lock = self._database.lock
+        self._closed = False
+
+        # The database id of each block in the level's block palette.
+        self._palette_ids: List[int] = []
+        # The chunks in the active dimension that have not been indexed yet. The last chunk is indexed first.
+        self._pending: Optional[List[Tuple[int, int]]] = None
+        # The number of chunks in the active dimension.
+        self._chunk_count = 0
+        # The changed_time of each chunk in the active dimension when it was indexed.
+        self._chunk_times: Dict[Tuple[int, int], float] = {}
+        self._check_changed = False
+
+    @property
+    def level(self) -> BaseLevel:
+        return self._level()
+
+    @property
+    def dimension(self) -> Optional[Dimension]:
+        """The dimension being indexed."""
+        return self._dimension
+
+    @dimension.setter
+    def dimension(self, dimension: Dimension):
+        with self._lock:
+            if dimension != self._dimension:
+                self._dimension = dimension
+                self._pending = None
+                self._chunk_count = 0
+                self._chunk_times.clear()
+
+    @property
+    def progress(self) -> Tuple[int, int]:
+        """The number of chunks indexed in the active dimension and the total number of chunks."""
+        with self._lock:
+            if self._pending is None:
+                return 0, 0
+            return self._chunk_count - len(self._pending), self._chunk_count
+
+    def _get_db(self) -> Optional[sqlite3.Connection]:
+        return self._database.get_db()
+
+    def _create_tables(self, db: sqlite3.Connection):
+        db.execute(
+            "CREATE TABLE IF NOT EXISTS meta ("
+            "key TEXT PRIMARY KEY NOT NULL, "
+            "value TEXT NOT NULL)"
+        )
+        db.execute(
+            "CREATE TABLE IF NOT EXISTS blocks ("
+            "block_id INTEGER PRIMARY KEY, "
+            "blockstate TEXT UNIQUE NOT NULL)"
+        )
+        db.execute(
+            "CREATE TABLE IF NOT EXISTS chunks ("
+            "dimension TEXT NOT NULL, "
+            "cx INTEGER NOT NULL, "
+            "cz INTEGER NOT NULL, "
+            "changed INTEGER NOT NULL, "
+            "PRIMARY KEY (dimension, cx, cz))"
+        )
+        db.execute(
+            "CREATE TABLE IF NOT EXISTS chunk_blocks ("
+            "dimension TEXT NOT NULL, "
+            "cx INTEGER NOT NULL, "
+            "cz INTEGER NOT NULL, "
+            "block_id INTEGER NOT NULL, "
+            "count INTEGER NOT NULL, "
+            "PRIMARY KEY (dimension, cx, cz, block_id))"
+        )
+        db.execute(
+            "CREATE INDEX IF NOT EXISTS chunk_blocks_block_id "
+            "ON chunk_blocks (block_id, dimension)"
+        )
+
+        # The world may have been modified by the game since the index was built.
+        last_played = str(getattr(self.level.level_wrapper, "last_played", 0))
+        row = db.execute("SELECT value FROM meta WHERE key='last_played'").fetchone()
+        if row is None or row[0] != last_played:
+            db.execute("DELETE FROM chunk_blocks")
+            db.execute("DELETE FROM chunks")
+            db.execute(
+                "INSERT OR REPLACE INTO meta (key, value) VALUES ('last_played', ?)",
+                (last_played,),
+            )
+        else:
+            # Chunks that were changed but not saved may not match the world data.
+            db.execute(
+                "DELETE FROM chunk_blocks WHERE EXISTS ("
+                "SELECT 1 FROM chunks WHERE chunks.changed=1 "
+                "AND chunks.dimension=chunk_blocks.dimension "
+                "AND chunks.cx=chunk_blocks.cx AND chunks.cz=chunk_blocks.cz)"
+            )
+            db.execute("DELETE FROM chunks WHERE changed=1")
+
+    def rebuild_changed(self):
+        """Re-index the chunks that have changed."""
+        self._check_changed = True
+
+    def mark_saved(self):
+        """Mark all indexed chunks as matching the data on disk. Call this after the world is saved."""
+        with self._lock:
+            db = self._get_db()
+            if db is not None:
+                db.execute("UPDATE chunks SET changed=0")
+                db.commit()
+
+    def _find_pending(self):
+        """Find the chunks in the active dimension that have not been indexed."""
+        dimension = self._dimension
+        all_chunks = self.level.all_chunk_coords(dimension)
+        db = self._get_db()
+        indexed = set(
+            db.execute(
+                "SELECT cx, cz FROM chunks WHERE dimension=?", (dimension,)
+            ).fetchall()
+        )
+        # remove chunks that no longer exist
+        for cx, cz in indexed.difference(all_chunks):
+            self._remove_chunk(db, cx, cz)
+        db.commit()
+        self._pending = sorted(set(all_chunks).difference(indexed), reverse=True)
+        self._chunk_count = len(all_chunks)
+
+    def _find_changed_chunks(self):
+        """Queue the chunks that have changed since they were indexed."""
+        changed: Set[Tuple[int, int]] = set()
+        for dimension, cx, cz in self.level.chunks.changed_chunks():
+            if dimension != self._dimension:
+                continue
+            try:
+                chunk_time = self.level.get_chunk(cx, cz, dimension).changed_time
+            except ChunkLoadError:
+                chunk_time = None
+            if chunk_time is None or chunk_time != self._chunk_times.get((cx, cz)):
+                changed.add((cx, cz))
+        if changed:
+            pending = set(self._pending)
+            # these are at the end so that they are processed first
+            self._pending.extend(changed.difference(pending))
+            self._chunk_count = len(self.level.all_chunk_coords(self._dimension))
+
+    def _get_palette_ids(self, db: sqlite3.Connection) -> numpy.ndarray:
+        """Get the database id of each block in the level's block palette."""
+        block_palette = self.level.block_palette
+        for block_index in range(len(self._palette_ids), len(block_palette)):
+            blockstate = block_palette[block_index].full_blockstate
+            db.execute(
+                "INSERT OR IGNORE INTO blocks (blockstate) VALUES (?)", (blockstate,)
+            )
+            self._palette_ids.append(
+                db.execute(
+                    "SELECT block_id FROM blocks WHERE blockstate=?", (blockstate,)
+                ).fetchone()[0]
+            )
+        return numpy.array(self._palette_ids, dtype=numpy.int64)
+
+    def _remove_chunk(self, db: sqlite3.Connection, cx: int, cz: int):
+        db.execute(
+            "DELETE FROM chunk_blocks WHERE dimension=? AND cx=? AND cz=?",
+            (self._dimension, cx, cz),
+        )
+        db.execute(
+            "DELETE FROM chunks WHERE dimension=? AND cx=? AND cz=?",
+            (self._dimension, cx, cz),
+        )
+        self._chunk_times.pop((cx, cz), None)
+
+    def _index_chunk(self, db: sqlite3.Connection, cx: int, cz: int):
+        """Count the blocks in a chunk and store them in the index."""
+        try:
+            chunk = self.level.get_chunk(cx, cz, self._dimension)
+        except ChunkDoesNotExist:
+            self._remove_chunk(db, cx, cz)
+            return
+        except ChunkLoadError:
+            log.debug(f"Could not load chunk {cx}, {cz} to index it.", exc_info=True)
+            chunk = None
+
+        db.execute(
+            "DELETE FROM chunk_blocks WHERE dimension=? AND cx=? AND cz=?",
+            (self._dimension, cx, cz),
+        )
+        if chunk is not None:
+            blocks = chunk.blocks
+            sub_chunks = [blocks.get_sub_chunk(cy).ravel() for cy in blocks.sub_chunks]
+            if sub_chunks:
+                palette_indexes, counts = numpy.unique(
+                    numpy.concatenate(sub_chunks), return_counts=True
+                )
+                block_ids = self._get_palette_ids(db)[palette_indexes]
+                db.executemany(
+                    "INSERT INTO chunk_blocks (dimension, cx, cz, block_id, count) VALUES (?, ?, ?, ?, ?)",
+                    [
+                        (self._dimension, cx, cz, block_id, count)
+                        for block_id, count in zip(block_ids.tolist(), counts.tolist())
+                    ],
+                )
+            changed_time = chunk.changed_time
+        else:
+            changed_time = 0.0
+        db.execute(
+            "INSERT OR REPLACE INTO chunks (dimension, cx, cz, changed) VALUES (?, ?, ?, ?)",
+            (self._dimension, cx, cz, int(bool(changed_time))),
+        )
+        self._chunk_times[(cx, cz)] = changed_time
+
+    def thread_action(self) -> bool:
+        with self._lock:
+            if self._closed or self._dimension is None:
+                return False
+            if self._pending is None:
+                self._find_pending()
+            elif self._check_changed:
+                self._check_changed = False
+                self._find_changed_chunks()
+            elif self._pending:
+                db = self._get_db()
+                end_time = time.time() + ChunkBatchTime
+                while self._pending and time.time() < end_time:
+                    self._index_chunk(db, *self._pending.pop())
+                db.commit()
+            else:
+                return False
+            return True
+
+    def find(
+        self, dimension: Dimension, text: str, limit: int = MaxSearchResults
+    ) -> List[Tuple[int, int, int]]:
+        """
+        Find the chunks containing blocks with a blockstate containing the given text.
+
+        :param dimension: The dimension to search in.
+        :param text: The text to search for in the universal blockstates. This is not case sensitive.
+        :param limit: The maximum number of chunks to return.
+        :return: The chunk x and z coordinates and the number of matching blocks in each chunk. Most matches first.
+        """
+        with self._lock:
+            db = self._get_db()
+            if db is None:
+                return []
+            return db.execute(
+                "SELECT cx, cz, SUM(count) AS total FROM chunk_blocks "
+                "WHERE dimension=? AND block_id IN ("
+                "SELECT block_id FROM blocks WHERE blockstate LIKE ? ESCAPE '\\') "
+                "GROUP BY cx, cz ORDER BY total DESC LIMIT ?",
+                (dimension, f"%{_escape_like(text)}%", limit),
+            ).fetchall()
+
+    def find_block_in_chunk(
+        self, dimension: Dimension, cx: int, cz: int, text: str
+    ) -> Optional[BlockCoordinates]:
+        """
+        Find the location of a block in a chunk with a blockstate containing the given text.
+
+        :param dimension: The dimension the chunk is in.
+        :param cx: The chunk x coordinate.
+        :param cz: The chunk z coordinate.
+        :param text: The text to search for in the universal blockstates. This is not case sensitive.
+        :return: The location of the highest matching block or None if there are no matching blocks.
+        """
+        text = text.lower()
+        level = self.level
+        try:
+            chunk: Chunk = level.get_chunk(cx, cz, dimension)
+        except ChunkLoadError:
+            return None
+        block_palette = level.block_palette
+        matches = numpy.array(
+            [text in block.full_blockstate.lower() for block in block_palette],
+            dtype=bool,
+        )
+        blocks = chunk.blocks
+        for cy in sorted(blocks.sub_chunks, reverse=True):
+            sub_chunk = blocks.get_sub_chunk(cy)
+            locations = numpy.argwhere(matches[sub_chunk])
+            if len(locations):
+                dx, dy, dz = locations[numpy.argmax(locations[:, 1])].tolist()
+                return cx * 16 + dx, cy * 16 + dy, cz * 16 + dz
+        return None
+
+    def close(self):
+        """Write all pending changes and close the database."""
+        with self._lock:
+            self._closed = True
+            self._database.close()
@@ -4,12 +4,15 @@ import traceback
 from OpenGL.GL import (
     glClearColor,
     glViewport,
+    glGetIntegerv,
+    GL_MAX_ARRAY_TEXTURE_LAYERS,
 )
 import os
-from typing import Optional, Generator
+from typing import Optional, Generator, List
 import weakref
 import sys
 import time
+from threading import Thread
 
 from minecraft_model_reader.api.resource_pack.java.download_resources import (
     get_java_vanilla_latest_iter,
@@ -33,7 +36,13 @@ from amulet.api.data_types import OperationYieldType, Dimension
 
 from amulet_map_editor import experimental_bedrock_resources
 from amulet_map_editor.api.opengl.canvas import EventCanvas
-from amulet_map_editor.api.opengl.resource_pack.resource_pack import OpenGLResourcePack
+from amulet_map_editor.api.opengl.resource_pack import (
+    OpenGLResourcePack,
+    MinTextureArrayLayers,
+    acquire_resource_pack,
+    try_acquire_resource_pack,
+    release_resource_pack,
+)
 from amulet_map_editor.programs.edit.api.selection import (
     SelectionManager,
     SelectionHistoryManager,
@@ -46,6 +55,8 @@ from amulet_map_editor.api.wx.util.button_input import ButtonInput
 from amulet_map_editor.api.wx.util.mouse_movement import MouseMovement
 from amulet_map_editor.api.wx.ui.traceback_dialog import TracebackDialog
 from ..renderer import Renderer
+from ..chunk_mask_cache import ChunkMaskCache
+from ..block_index import BlockIndex
 
 from amulet.api.level import BaseLevel
 
@@ -59,9 +70,21 @@ class BaseEditCanvas(EventCanvas):
 
     background_colour = (0.61, 0.70, 0.85)
 
-    def __init__(self, parent: wx.Window, world: BaseLevel):
+    def __init__(
+        self, parent: wx.Window, world: BaseLevel, texture_array: bool = False
+    ):
+        """
+        Create a new BaseEditCanvas instance.
+
+        :param parent: The parent window.
+        :param world: The world to edit.
+        :param texture_array: Store the textures in a mipmapped texture array rather than an atlas.
+        """
         super().__init__(parent)
         self._world = weakref.ref(world)
+        self._texture_array = texture_array
+        # The number of texture array layers supported by the OpenGL implementation. Found in _init_opengl.
+        self._max_texture_layers = MinTextureArrayLayers
 
         self._selection: Optional[SelectionHistoryManager] = SelectionHistoryManager(
             SelectionManager(self)
@@ -77,6 +100,9 @@ class BaseEditCanvas(EventCanvas):
         self._mouse: MouseMovement = MouseMovement(self)
         self._mouse.set_middle()
 
+        self._chunk_mask_cache = ChunkMaskCache(world)
+        self._block_index = BlockIndex(world)
+
         resource_packs_dir = os.path.join(os.environ["DATA_DIR"], "resource_packs")
         readme_path = os.path.join(resource_packs_dir, "readme.txt")
         # create the resource packs location
@@ -86,20 +112,156 @@ class BaseEditCanvas(EventCanvas):
                 f.write("Put the Java resource pack you want loaded in here.")
 
         self._renderer: Optional[Renderer] = None
-        self._opengl_resource_pack = None
+        self._opengl_resource_pack: Optional[OpenGLResourcePack] = None
+        # The thread loading the full resource pack while the placeholder pack is in use.
+        self._resource_pack_thread: Optional[Thread] = None
+        self._closed = False
 
     def thread_setup(self) -> Generator[OperationYieldType, None, None]:
         """
         Set up objects that take a while to set up.
         All code in here must be thread safe and not touch the OpenGL state.
+
+        If the resource packs have not already been loaded by another canvas a small placeholder
+        pack is loaded so that the world can be opened straight away.
+        The full resource pack is loaded in a background thread and swapped in when it is ready.
         """
-        packs = []
         resource_packs_dir = os.path.join(os.environ["DATA_DIR"], "resource_packs")
-        user_packs = [
-            load_resource_pack(os.path.join(resource_packs_dir, rp))
+        user_pack_paths = sorted(
+            os.path.join(resource_packs_dir, rp)
             for rp in os.listdir(resource_packs_dir)
             if os.path.isdir(os.path.join(resource_packs_dir, rp))
+        )
+        if (
+            self.world.level_wrapper.platform == "bedrock"
+            and experimental_bedrock_resources
+        ):
+            pack_platform = "bedrock"
+        else:
+            pack_platform = "java"
+        texture_array = self._texture_array
+        # Worlds using the same platform, packs and texture backend share the resource pack.
+        resource_pack_key = (pack_platform, tuple(user_pack_paths), texture_array)
+        self._opengl_resource_pack = try_acquire_resource_pack(resource_pack_key)
+        if self._opengl_resource_pack is None:
+            self._opengl_resource_pack = (
+                yield from self._load_placeholder_resource_pack(
+                    pack_platform, texture_array
+                )
+            )
+            # This is started in _init_opengl once the texture limits are known.
+            self._resource_pack_thread = Thread(
+                target=self._load_resource_pack_thread,
+                args=(resource_pack_key, user_pack_paths, texture_array),
+                daemon=True,
+            )
+
+    @property
+    def resource_pack_loading(self) -> bool:
+        """Is the full resource pack still being loaded in the background."""
+        return self._resource_pack_thread is not None
+
+    def _load_placeholder_resource_pack(
+        self, pack_platform: str, texture_array: bool = False
+    ) -> Generator[OperationYieldType, None, OpenGLResourcePack]:
+        """
+        Load a minimal resource pack from the packs bundled with Amulet.
+        Blocks are drawn with the missing texture until the full resource pack is loaded.
+
+        :param pack_platform: The platform of the resource packs. "java" or "bedrock".
+        :param texture_array: Store the textures in a mipmapped texture array rather than an atlas.
+        :return: The placeholder resource pack.
+        """
+        yield 0.1, lang.get("program_3d_edit.canvas.loading_resource_packs")
+        packs = [
+            load_resource_pack(
+                os.path.join(
+                    os.path.dirname(amulet_edit.__file__),
+                    "amulet_resource_pack",
+                    pack_platform,
+                )
+            )
         ]
+        if pack_platform == "bedrock":
+            packs.append(get_bedrock_vanilla_fix())
+        else:
+            packs.append(get_java_vanilla_fix())
+        translator = self.world.translation_manager.get_version(
+            pack_platform, (999, 0, 0)
+        )
+        resource_pack = load_resource_pack_manager(packs, load=False)
+        for i in resource_pack.reload():
+            yield i / 2
+
+        opengl_resource_pack = OpenGLResourcePack(
+            resource_pack, translator, texture_array, placeholder=True
+        )
+        yield 0.5, lang.get("program_3d_edit.canvas.creating_texture_atlas")
+        for i in opengl_resource_pack.setup():
+            yield i / 2 + 0.5
+        return opengl_resource_pack
+
+    def _load_resource_pack_thread(
+        self, resource_pack_key, user_pack_paths: List[str], texture_array: bool
+    ):
+        """Load the full resource pack and swap it in from the main thread."""
+        log.info("Loading the resource packs in the background")
+        try:
+            gen = acquire_resource_pack(
+                resource_pack_key,
+                lambda: self._load_resource_pack(user_pack_paths, texture_array),
+            )
+            try:
+                while True:
+                    next(gen)
+            except StopIteration as e:
+                opengl_resource_pack = e.value
+        except Exception:
+            log.error("Failed loading the resource packs", exc_info=True)
+            wx.CallAfter(self._resource_pack_failed)
+        else:
+            wx.CallAfter(self._set_resource_pack, opengl_resource_pack)
+
+    def _resource_pack_failed(self):
+        """The full resource pack could not be loaded. The placeholder resource pack stays in use."""
+        self._resource_pack_thread = None
+        if self._closed:
+            return
+        wx.MessageBox(
+            lang.get("program_3d_edit.canvas.resource_pack_failed"),
+            style=wx.OK | wx.ICON_ERROR,
+        )
+
+    def _set_resource_pack(self, opengl_resource_pack: OpenGLResourcePack):
+        """Replace the placeholder resource pack with the fully loaded resource pack."""
+        self._resource_pack_thread = None
+        if self._closed:
+            release_resource_pack(opengl_resource_pack)
+            return
+        placeholder = self._opengl_resource_pack
+        self._opengl_resource_pack = opengl_resource_pack
+        if self._renderer is not None:
+            self.SetCurrent(self._context)
+            self._renderer.opengl_resource_pack = opengl_resource_pack
+            if placeholder is not None:
+                # nothing draws with the placeholder textures after the swap
+                placeholder.unload(self.context_identifier)
+        if placeholder is not None:
+            placeholder.close()
+        log.info("Finished loading the resource packs")
+
+    def _load_resource_pack(
+        self, user_pack_paths: List[str], texture_array: bool = False
+    ) -> Generator[OperationYieldType, None, OpenGLResourcePack]:
+        """
+        Load the vanilla and user resource packs and create the texture atlas.
+
+        :param user_pack_paths: The paths of the user resource packs to load.
+        :param texture_array: Store the textures in a mipmapped texture array rather than an atlas.
+        :return: The created resource pack.
+        """
+        packs = []
+        user_packs = [load_resource_pack(path) for path in user_pack_paths]
         if (
             self.world.level_wrapper.platform == "bedrock"
             and experimental_bedrock_resources
@@ -192,11 +354,17 @@ class BaseEditCanvas(EventCanvas):
         for i in resource_pack.reload():
             yield i / 4 + 0.5
 
-        self._opengl_resource_pack = OpenGLResourcePack(resource_pack, translator)
+        opengl_resource_pack = OpenGLResourcePack(
+            resource_pack,
+            translator,
+            texture_array,
+            max_texture_layers=self._max_texture_layers,
+        )
 
         yield 0.75, lang.get("program_3d_edit.canvas.creating_texture_atlas")
-        for i in self._opengl_resource_pack.setup():
+        for i in opengl_resource_pack.setup():
             yield i / 4 + 0.75
+        return opengl_resource_pack
 
     def post_thread_setup(self) -> Generator[OperationYieldType, None, None]:
         """
@@ -216,6 +384,23 @@ class BaseEditCanvas(EventCanvas):
         super()._init_opengl()
         glClearColor(*self.background_colour, 1.0)
 
+        if self._texture_array:
+            try:
+                self._max_texture_layers = int(
+                    glGetIntegerv(GL_MAX_ARRAY_TEXTURE_LAYERS)
+                )
+            except Exception:
+                log.warning(
+                    "Failed getting the maximum number of texture array layers.",
+                    exc_info=True,
+                )
+        if (
+            self._resource_pack_thread is not None
+            and self._resource_pack_thread.ident is None
+        ):
+            # start loading the full resource pack now that the texture limits are known
+            self._resource_pack_thread.start()
+
         try:
             player = self.world.get_player(LOCAL_PLAYER)
             location, rotation = player.location, player.rotation
@@ -252,7 +437,16 @@ class BaseEditCanvas(EventCanvas):
 
     def close(self):
         """Destroy all contained data so that the window can be safely destroyed."""
+        self._closed = True
         self.renderer.close()
+        self._chunk_mask_cache.clear()
+        self._block_index.close()
+        if self._opengl_resource_pack is not None:
+            if self._opengl_resource_pack.placeholder:
+                self._opengl_resource_pack.close()
+            else:
+                release_resource_pack(self._opengl_resource_pack)
+            self._opengl_resource_pack = None
 
     @property
     def world(self) -> BaseLevel:
@@ -274,6 +468,16 @@ class BaseEditCanvas(EventCanvas):
         """Set the currently loaded dimension in the renderer."""
         self.renderer.dimension = dimension
 
+    @property
+    def chunk_mask_cache(self) -> ChunkMaskCache:
+        """A cache of per-chunk data used to find blocks quickly."""
+        return self._chunk_mask_cache
+
+    @property
+    def block_index(self) -> BlockIndex:
+        """An index of the chunks containing each block. This is built in the background."""
+        return self._block_index
+
     @property
     def camera(self) -> ControllableCamera:
         """A class holding the state of the camera with methods to access and modify the state."""
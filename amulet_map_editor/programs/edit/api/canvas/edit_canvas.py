@@ -1,7 +1,7 @@
 import logging
 import warnings
 import wx
-from typing import Callable, TYPE_CHECKING, Any, Generator, Optional
+from typing import Callable, TYPE_CHECKING, Any, Generator, Optional, Dict, Tuple
 from types import GeneratorType
 from threading import RLock, Thread
 
@@ -16,6 +16,8 @@ from ..key_config import (
 
 import time
 import traceback
+from operator import itemgetter
+import numpy
 
 from amulet.api.data_types import OperationReturnType, OperationYieldType, Dimension
 from amulet.api.structure import structure_cache
@@ -25,6 +27,7 @@ from amulet_map_editor import CONFIG
 from amulet_map_editor import close_level
 from amulet_map_editor.api.wx.ui.traceback_dialog import TracebackDialog
 from amulet_map_editor.programs.edit.api.ui.goto import show_goto
+from amulet_map_editor.programs.edit.api.ui.find_block import show_find_block
 from amulet_map_editor.programs.edit.api.ui.tool_manager import ToolManagerSizer
 from amulet_map_editor.programs.edit.api.operations.errors import (
     OperationError,
@@ -146,8 +149,10 @@ class OperationThread(Thread):
 
 
 class EditCanvas(BaseEditCanvas):
-    def __init__(self, parent: wx.Window, world: "BaseLevel"):
-        super().__init__(parent, world)
+    def __init__(
+        self, parent: wx.Window, world: "BaseLevel", texture_array: bool = False
+    ):
+        super().__init__(parent, world, texture_array)
         self._file_panel: Optional[FilePanel] = None
         self._tool_sizer: Optional[ToolManagerSizer] = None
         self.buttons.register_actions(self.key_binds)
@@ -161,6 +166,10 @@ class EditCanvas(BaseEditCanvas):
         # call run_operation to acquire it.
         self._edit_lock = RLock()
 
+        # The minimum and maximum chunk x and z coordinates in each dimension. None if the dimension has no chunks.
+        # This is cleared when the world is modified because chunks may have been created or deleted.
+        self._chunk_extents: Dict[Dimension, Optional[Tuple[int, int, int, int]]] = {}
+
     def _init_opengl(self):
         super()._init_opengl()
         self._file_panel = FilePanel(self)
@@ -302,7 +311,8 @@ class EditCanvas(BaseEditCanvas):
                     self.world.restore_last_undo_point()
 
             self.renderer.enable_threads()
-            self.renderer.render_world.rebuild_changed()
+            self.renderer.rebuild_changed()
+            self._chunk_extents.clear()
             self._operation_running = False
             if op.error is not None:
                 raise op.error
@@ -321,22 +331,34 @@ class EditCanvas(BaseEditCanvas):
 
     def undo(self):
         self.world.undo()
-        self.renderer.render_world.rebuild_changed()
+        self.renderer.rebuild_changed()
+        self._chunk_extents.clear()
         wx.PostEvent(self, UndoEvent())
 
     def redo(self):
         self.world.redo()
-        self.renderer.render_world.rebuild_changed()
+        self.renderer.rebuild_changed()
+        self._chunk_extents.clear()
         wx.PostEvent(self, RedoEvent())
 
     def cut(self):
         self.run_operation(
-            lambda: cut(self.world, self.dimension, self.selection.selection_group)
+            lambda: cut(
+                self.world,
+                self.dimension,
+                self.selection.selection_group,
+                self.selection.selection_mask,
+            )
         )
 
     def copy(self):
         self.run_operation(
-            lambda: copy(self.world, self.dimension, self.selection.selection_group)
+            lambda: copy(
+                self.world,
+                self.dimension,
+                self.selection.selection_group,
+                self.selection.selection_mask,
+            )
         )
 
     def paste(self, structure: BaseLevel, dimension: Dimension):
@@ -361,7 +383,12 @@ class EditCanvas(BaseEditCanvas):
 
     def delete(self):
         self.run_operation(
-            lambda: delete(self.world, self.dimension, self.selection.selection_group)
+            lambda: delete(
+                self.world,
+                self.dimension,
+                self.selection.selection_group,
+                self.selection.selection_mask,
+            )
         )
 
     def goto(self):
@@ -369,20 +396,60 @@ class EditCanvas(BaseEditCanvas):
         if location:
             self.camera.location = location
 
-    def select_all(self):
-        all_chunk_coords = tuple(self.world.all_chunk_coords(self.dimension))
-        if all_chunk_coords:
-            min_x, min_z = max_x, max_z = all_chunk_coords[0]
-            for x, z in all_chunk_coords:
-                if x < min_x:
-                    min_x = x
-                elif x > max_x:
-                    max_x = x
-                if z < min_z:
-                    min_z = z
-                elif z > max_z:
-                    max_z = z
+    def find_block(self):
+        """Search the block index and move the camera to the chosen chunk."""
+        result = show_find_block(self, self.block_index, self.dimension)
+        if result:
+            text, cx, cz = result
+            location = self.block_index.find_block_in_chunk(
+                self.dimension, cx, cz, text
+            )
+            if location is None:
+                self.camera.location = (
+                    cx * 16 + 8,
+                    self.camera.location[1],
+                    cz * 16 + 8,
+                )
+            else:
+                x, y, z = location
+                self.camera.location = (x + 0.5, y + 2, z + 0.5)
+
+    def _get_chunk_extent(
+        self, dimension: Dimension
+    ) -> Optional[Tuple[int, int, int, int]]:
+        """
+        Get the minimum and maximum chunk coordinates in a dimension.
+        The result is cached until the world is next modified.
+
+        :param dimension: The dimension to get the extent of.
+        :return: The minimum x, minimum z, maximum x and maximum z chunk coordinates. None if there are no chunks.
+        """
+        if dimension not in self._chunk_extents:
+            all_chunk_coords = self.world.all_chunk_coords(dimension)
+            if all_chunk_coords:
+                # Read each axis straight from the coordinate set.
+                # itemgetter runs in C so no intermediate tuples or lists are created.
+                count = len(all_chunk_coords)
+                x = numpy.fromiter(
+                    map(itemgetter(0), all_chunk_coords), dtype=numpy.int64, count=count
+                )
+                z = numpy.fromiter(
+                    map(itemgetter(1), all_chunk_coords), dtype=numpy.int64, count=count
+                )
+                self._chunk_extents[dimension] = (
+                    int(x.min()),
+                    int(z.min()),
+                    int(x.max()),
+                    int(z.max()),
+                )
+            else:
+                self._chunk_extents[dimension] = None
+        return self._chunk_extents[dimension]
 
+    def select_all(self):
+        chunk_extent = self._get_chunk_extent(self.dimension)
+        if chunk_extent is not None:
+            min_x, min_z, max_x, max_z = chunk_extent
             self.selection.selection_corners = [
                 (
                     (
@@ -417,6 +484,7 @@ class EditCanvas(BaseEditCanvas):
             yield 0, "Saving Chunks."
             for chunk_index, chunk_count in self.world.save_iter():
                 yield chunk_index / chunk_count
+            self.block_index.mark_saved()
 
         self._run_operation(save, "Saving world.", "Please wait.", False)
         wx.PostEvent(self, SaveEvent())
@@ -21,6 +21,11 @@ if ThreadingEnabled:
                 self._thread = Thread(target=self._generate_chunks)
                 self._thread.start()
 
+        @property
+        def running(self) -> bool:
+            """Is the generation thread running."""
+            return self._enabled
+
         def stop(self):
             if self._enabled:
                 self._enabled = False
@@ -37,6 +42,11 @@ if ThreadingEnabled:
 else:
 
     class ChunkGenerator(ThreadedObjectContainer):
+        @property
+        def running(self) -> bool:
+            """Is the generation thread running."""
+            return False
+
         def start(self):
             pass
 
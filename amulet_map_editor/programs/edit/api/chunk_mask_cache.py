@@ -0,0 +1,255 @@
+import weakref
+from collections import OrderedDict
+from threading import RLock
+from typing import Optional, Tuple, Hashable, Callable, Any
+
+import numpy
+
+from amulet.api.level import BaseLevel
+from amulet.api.chunk import Chunk
+from amulet.api.block import UniversalAirLikeBlocks
+from amulet.api.registry import BlockManager
+from amulet.api.errors import ChunkLoadError
+from amulet.api.data_types import Dimension
+
+# The height stored in a heightmap for columns that only contain air.
+EmptyColumnHeight = numpy.iinfo(numpy.int32).min
+
+
+class ChunkAirMask:
+    """A boolean array storing which blocks in a chunk are air-like."""
+
+    def __init__(self, air: numpy.ndarray, min_y: int):
+        """
+        Create a new ChunkAirMask.
+
+        :param air: A bool array of shape (16, height, 16) indexed by x, y - min_y, z.
+        :param min_y: The y coordinate of the bottom of the array.
+        """
+        self.air = air
+        self.min_y = min_y
+
+    @property
+    def max_y(self) -> int:
+        """The y coordinate above the top of the array."""
+        return self.min_y + self.air.shape[1]
+
+    def is_air(
+        self, x: numpy.ndarray, y: numpy.ndarray, z: numpy.ndarray
+    ) -> numpy.ndarray:
+        """
+        Check if the blocks at the given locations are air-like.
+        Blocks outside the stored height range are air.
+
+        :param x: An int array of x coordinates. Only the position within the chunk is used.
+        :param y: An int array of y coordinates.
+        :param z: An int array of z coordinates. Only the position within the chunk is used.
+        :return: A bool array with the same shape as the inputs.
+        """
+        y_index = numpy.asarray(y) - self.min_y
+        in_range = (0 <= y_index) & (y_index < self.air.shape[1])
+        air = numpy.ones(y_index.shape, dtype=bool)
+        air[in_range] = self.air[
+            numpy.asarray(x)[in_range] % 16,
+            y_index[in_range],
+            numpy.asarray(z)[in_range] % 16,
+        ]
+        return air
+
+
+class ChunkMaskCache:
+    """A cache of derived per-chunk data used to find blocks quickly.
+
+    Entries are created lazily and are invalidated when the chunk object or its changed_time changes.
+    Only a weak reference to the chunk is kept so that the cache does not stop chunks being unloaded.
+    The least recently used entries are discarded when the cache is full.
+
+    This class is thread safe.
+    """
+
+    # The maximum number of air masks to keep.
+    max_air_masks = 256
+    # The maximum number of heightmaps to keep. These are much smaller than the air masks.
+    max_heightmaps = 4096
+
+    def __init__(self, world: BaseLevel):
+        self._world = weakref.ref(world)
+        self._lock = RLock()
+        # The air-like state of each block in the block palette.
+        self._air_lut = numpy.zeros(0, dtype=bool)
+        self._air_lut_palette: Optional[BlockManager] = None
+        self._air_masks: "OrderedDict[Hashable, Tuple[weakref.ref, float, Any]]" = (
+            OrderedDict()
+        )
+        self._heightmaps: "OrderedDict[Hashable, Tuple[weakref.ref, float, Any]]" = (
+            OrderedDict()
+        )
+
+    @property
+    def world(self) -> BaseLevel:
+        return self._world()
+
+    def clear(self):
+        """Remove all cached data."""
+        with self._lock:
+            self._air_masks.clear()
+            self._heightmaps.clear()
+            self._air_lut = numpy.zeros(0, dtype=bool)
+            self._air_lut_palette = None
+
+    def _get_chunk(self, cx: int, cz: int, dimension: Dimension) -> Optional[Chunk]:
+        try:
+            return self.world.get_chunk(cx, cz, dimension)
+        except ChunkLoadError:
+            return None
+
+    def _get_air_lut(self, palette: BlockManager) -> numpy.ndarray:
+        """Get an array mapping each block id in the palette to True if the block is air-like."""
+        if palette is not self._air_lut_palette:
+            self._air_lut_palette = palette
+            self._air_lut = numpy.zeros(0, dtype=bool)
+        palette_size = len(palette)
+        if self._air_lut.size < palette_size:
+            # The palette only grows so only the new blocks need checking.
+            self._air_lut = numpy.concatenate(
+                [
+                    self._air_lut,
+                    numpy.fromiter(
+                        (
+                            palette[block_id] in UniversalAirLikeBlocks
+                            for block_id in range(self._air_lut.size, palette_size)
+                        ),
+                        dtype=bool,
+                        count=palette_size - self._air_lut.size,
+                    ),
+                ]
+            )
+        return self._air_lut
+
+    def _create_air_mask(self, chunk: Chunk) -> ChunkAirMask:
+        blocks = chunk.blocks
+        sub_chunks = sorted(blocks.sub_chunks)
+        if not sub_chunks:
+            return ChunkAirMask(numpy.ones((16, 0, 16), dtype=bool), 0)
+        air_lut = self._get_air_lut(chunk.block_palette)
+        min_cy = sub_chunks[0]
+        air = numpy.ones((16, (sub_chunks[-1] - min_cy + 1) * 16, 16), dtype=bool)
+        for cy in sub_chunks:
+            y = (cy - min_cy) * 16
+            air[:, y : y + 16, :] = air_lut[blocks.get_sub_chunk(cy)]
+        return ChunkAirMask(air, min_cy * 16)
+
+    def _create_heightmap(self, chunk: Chunk) -> Tuple[numpy.ndarray, numpy.ndarray]:
+        heightmap = numpy.full((16, 16), EmptyColumnHeight, dtype=numpy.int32)
+        top_blocks = numpy.zeros((16, 16), dtype=numpy.uint32)
+        blocks = chunk.blocks
+        sub_chunks = sorted(blocks.sub_chunks, reverse=True)
+        if not sub_chunks:
+            return heightmap, top_blocks
+        air_lut = self._get_air_lut(chunk.block_palette)
+        unfilled = numpy.ones((16, 16), dtype=bool)
+        x, z = numpy.nonzero(unfilled)
+        for cy in sub_chunks:
+            # flip the y axis so that argmax finds the highest block
+            sub_chunk = blocks.get_sub_chunk(cy)[:, ::-1, :]
+            solid = numpy.invert(air_lut[sub_chunk])
+            has_block = numpy.any(solid, axis=1) & unfilled
+            if numpy.any(has_block):
+                dy = numpy.argmax(solid, axis=1)
+                heightmap[has_block] = cy * 16 + 15 - dy[has_block]
+                top_blocks[has_block] = sub_chunk[x, dy.ravel(), z].reshape(16, 16)[
+                    has_block
+                ]
+                unfilled &= numpy.invert(has_block)
+                if not numpy.any(unfilled):
+                    break
+        return heightmap, top_blocks
+
+    def _get_cached(
+        self,
+        cache: "OrderedDict[Hashable, Tuple[weakref.ref, float, Any]]",
+        max_size: int,
+        cx: int,
+        cz: int,
+        dimension: Dimension,
+        create: Callable[[Chunk], Any],
+    ) -> Any:
+        chunk = self._get_chunk(cx, cz, dimension)
+        if chunk is None:
+            return None
+        key = (dimension, cx, cz)
+        with self._lock:
+            entry = cache.get(key)
+            if (
+                entry is not None
+                and entry[0]() is chunk
+                and entry[1] == chunk.changed_time
+            ):
+                cache.move_to_end(key)
+                return entry[2]
+            value = create(chunk)
+            cache[key] = (weakref.ref(chunk), chunk.changed_time, value)
+            cache.move_to_end(key)
+            while len(cache) > max_size:
+                cache.popitem(last=False)
+            return value
+
+    def get_air_mask(
+        self, cx: int, cz: int, dimension: Dimension
+    ) -> Optional[ChunkAirMask]:
+        """
+        Get the air mask for a chunk.
+
+        :param cx: The chunk x coordinate.
+        :param cz: The chunk z coordinate.
+        :param dimension: The dimension the chunk is in.
+        :return: The air mask or None if the chunk does not exist or could not be loaded.
+        """
+        return self._get_cached(
+            self._air_masks,
+            self.max_air_masks,
+            cx,
+            cz,
+            dimension,
+            self._create_air_mask,
+        )
+
+    def get_heightmap(
+        self, cx: int, cz: int, dimension: Dimension
+    ) -> Optional[numpy.ndarray]:
+        """
+        Get the y coordinate of the highest non-air block in each column of a chunk.
+        The returned array must not be modified.
+
+        :param cx: The chunk x coordinate.
+        :param cz: The chunk z coordinate.
+        :param dimension: The dimension the chunk is in.
+        :return: An int32 array of shape (16, 16) indexed by x and z or None if the chunk does not exist or could not be loaded.
+            Columns that only contain air have the value EmptyColumnHeight.
+        """
+        top_blocks = self.get_top_blocks(cx, cz, dimension)
+        if top_blocks is None:
+            return None
+        return top_blocks[0]
+
+    def get_top_blocks(
+        self, cx: int, cz: int, dimension: Dimension
+    ) -> Optional[Tuple[numpy.ndarray, numpy.ndarray]]:
+        """
+        Get the heightmap and the highest non-air block in each column of a chunk.
+        The returned arrays must not be modified.
+
+        :param cx: The chunk x coordinate.
+        :param cz: The chunk z coordinate.
+        :param dimension: The dimension the chunk is in.
+        :return: The heightmap as returned by get_heightmap and a uint32 array of shape (16, 16) containing the block palette index of the highest block in each column.
+            None if the chunk does not exist or could not be loaded.
+        """
+        return self._get_cached(
+            self._heightmaps,
+            self.max_heightmaps,
+            cx,
+            cz,
+            dimension,
+            self._create_heightmap,
+        )
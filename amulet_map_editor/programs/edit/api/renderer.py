@@ -1,20 +1,26 @@
-from typing import TYPE_CHECKING, Optional
+from typing import TYPE_CHECKING, Optional, Dict
+from weakref import WeakSet
 import wx
 from OpenGL.GL import (
     glClear,
+    glFinish,
     GL_COLOR_BUFFER_BIT,
     GL_DEPTH_BUFFER_BIT,
 )
 
 from amulet.api.data_types import Dimension
 
+from amulet_map_editor.api.opengl import ThreadedObject, ThreadedObjectStats
 from amulet_map_editor.api.opengl.camera import Projection
 from amulet_map_editor.api.opengl.mesh.level import RenderLevel
 from amulet_map_editor.api.opengl.mesh.level_group import LevelGroup
 from amulet_map_editor.api.opengl.mesh.sky_box import SkyBox
 from amulet_map_editor.api.opengl.resource_pack.resource_pack import OpenGLResourcePack
+from amulet_map_editor.api.opengl.resource_pack import OpenGLResourcePackManager
 
 from .chunk_generator import ThreadingEnabled, ChunkGenerator
+from .top_down_map import TopDownMap
+from .adaptive_render_distance import AdaptiveRenderDistance
 from .edit_canvas_container import EditCanvasContainer
 from .events import (
     DimensionChangeEvent,
@@ -29,17 +35,33 @@ if TYPE_CHECKING:
     from amulet_map_editor.programs.edit.api.canvas import EditCanvas
 
 
+# The priority of the main level in the chunk generator.
+RenderWorldPriority = 0
+# The priority of the floating levels in the chunk generator.
+# These are the levels the active tool is manipulating (eg the paste preview) so they are meshed first.
+FakeLevelsPriority = 1
+# The priority of the top-down map in the chunk generator.
+# The map is only processed while it is visible so it does not slow the main level down when it is not in use.
+TopDownMapPriority = -1
+# The priority of the block index in the chunk generator.
+# Chunks are only indexed when there is nothing else to do.
+BlockIndexPriority = -2
+
+
 class Renderer(EditCanvasContainer):
     """This class holds the drawable objects and has methods to draw them."""
 
     __slots__ = (
         "_render_distance",
+        "_adaptive_render_distance",
         "_chunk_generator",
         "_opengl_resource_pack",
+        "_resource_pack_users",
         "_render_world",
         "_chunk_generator",
         "_fake_levels",
         "_sky_box",
+        "_top_down_map",
         "_draw_timer",
         "_gc_timer",
     )
@@ -56,9 +78,12 @@ class Renderer(EditCanvasContainer):
     ):
         super().__init__(canvas)
         self._render_distance = 5
+        self._adaptive_render_distance = AdaptiveRenderDistance(self._render_distance)
 
         self._chunk_generator = ChunkGenerator()
         self._opengl_resource_pack = opengl_resource_pack
+        # Objects not owned by the renderer that must switch to the new resource pack when it changes.
+        self._resource_pack_users: WeakSet[OpenGLResourcePackManager] = WeakSet()
 
         self._render_world = RenderLevel(
             context_identifier,
@@ -67,7 +92,19 @@ class Renderer(EditCanvasContainer):
             draw_floor=True,
             draw_ceil=True,
         )
-        self._chunk_generator.register(self._render_world)
+        self._chunk_generator.register(self._render_world, RenderWorldPriority)
+
+        self._top_down_map = TopDownMap(
+            context_identifier,
+            opengl_resource_pack,
+            world,
+            canvas.chunk_mask_cache,
+        )
+        # The dimension setter does nothing if the dimension does not change so start in the level's dimension.
+        self._top_down_map.dimension = self._render_world.dimension
+        self._chunk_generator.register(self._top_down_map, TopDownMapPriority)
+        canvas.block_index.dimension = self._render_world.dimension
+        self._chunk_generator.register(canvas.block_index, BlockIndexPriority)
 
         self._fake_levels = None
         self._sky_box = None
@@ -95,6 +132,7 @@ class Renderer(EditCanvasContainer):
         self.disable_threads()
         self.render_world.unload()
         self.fake_levels.unload()
+        self.top_down_map.unload()
 
     def _on_destroy(self, evt):
         self.disable()
@@ -108,6 +146,7 @@ class Renderer(EditCanvasContainer):
         """Close and destroy all data."""
         self.render_world.close()
         self.fake_levels.clear()
+        self.top_down_map.clear()
         self.sky_box.unload()
 
     def disable_threads(self):
@@ -135,10 +174,42 @@ class Renderer(EditCanvasContainer):
     def opengl_resource_pack(self) -> OpenGLResourcePack:
         return self._opengl_resource_pack
 
+    @opengl_resource_pack.setter
+    def opengl_resource_pack(self, opengl_resource_pack: OpenGLResourcePack):
+        """Swap the resource pack and rebuild all the geometry with it.
+        The OpenGL context must be current."""
+        running = self._chunk_generator.running
+        self._chunk_generator.stop()
+        self._opengl_resource_pack = opengl_resource_pack
+        self.render_world.resource_pack = opengl_resource_pack
+        self.top_down_map.resource_pack = opengl_resource_pack
+        if self._fake_levels is not None:
+            self._fake_levels.resource_pack = opengl_resource_pack
+        if self._sky_box is not None:
+            self._sky_box.resource_pack = opengl_resource_pack
+        for user in list(self._resource_pack_users):
+            user.resource_pack = opengl_resource_pack
+        if running:
+            self._chunk_generator.start()
+
+    def add_resource_pack_user(self, user: OpenGLResourcePackManager):
+        """
+        Switch the resource pack of an object created with this renderer's resource pack when it changes.
+        Only a weak reference to the object is kept.
+
+        :param user: The object holding the resource pack.
+        """
+        self._resource_pack_users.add(user)
+
     @property
     def render_world(self) -> RenderLevel:
         return self._render_world
 
+    @property
+    def top_down_map(self) -> TopDownMap:
+        """The flat map drawn in place of the main level when zoomed out in the top-down view."""
+        return self._top_down_map
+
     @property
     def fake_levels(self) -> LevelGroup:
         """Floating levels that are not the main level."""
@@ -147,9 +218,14 @@ class Renderer(EditCanvasContainer):
                 self.canvas.context_identifier,
                 self.opengl_resource_pack,
             )
-            self._chunk_generator.register(self._fake_levels)
+            self._chunk_generator.register(self._fake_levels, FakeLevelsPriority)
         return self._fake_levels
 
+    @property
+    def thread_stats(self) -> Dict[ThreadedObject, ThreadedObjectStats]:
+        """The throughput statistics for each object registered with the chunk generator."""
+        return self._chunk_generator.thread_stats
+
     @property
     def sky_box(self) -> SkyBox:
         """The cube in the distance displaying the sky."""
@@ -171,6 +247,8 @@ class Renderer(EditCanvasContainer):
         if dimension != self.dimension:
             self.disable_threads()
             self.render_world.dimension = dimension
+            self.top_down_map.dimension = dimension
+            self.canvas.block_index.dimension = dimension
             wx.PostEvent(self.canvas, DimensionChangeEvent(dimension=dimension))
             self.enable_threads()
 
@@ -183,9 +261,47 @@ class Renderer(EditCanvasContainer):
     def render_distance(self, render_distance: int):
         """Set the distance from the camera in chunks that should be drawn"""
         self._render_distance = render_distance
-        self.render_world.render_distance = render_distance
+        self._adaptive_render_distance.max_render_distance = render_distance
+        self.render_world.render_distance = (
+            self._adaptive_render_distance.render_distance
+        )
         # self.fake_levels.render_distance = render_distance  # TODO
 
+    @property
+    def adaptive_render_distance(self) -> bool:
+        """Should the render distance be automatically reduced to hold the target frame rate."""
+        return self._adaptive_render_distance.enabled
+
+    @adaptive_render_distance.setter
+    def adaptive_render_distance(self, adaptive_render_distance: bool):
+        self._adaptive_render_distance.enabled = adaptive_render_distance
+        self.render_world.render_distance = (
+            self._adaptive_render_distance.render_distance
+        )
+
+    @property
+    def target_fps(self) -> float:
+        """The frame rate the adaptive render distance aims to hold."""
+        return self._adaptive_render_distance.target_fps
+
+    @target_fps.setter
+    def target_fps(self, target_fps: float):
+        self._adaptive_render_distance.target_fps = target_fps
+
+    @property
+    def cache_chunk_geometry(self) -> bool:
+        """Should the main level geometry be cached on disk so that the level opens faster next time."""
+        return self.render_world.mesh_cache_enabled
+
+    @cache_chunk_geometry.setter
+    def cache_chunk_geometry(self, cache_chunk_geometry: bool):
+        self.render_world.mesh_cache_enabled = cache_chunk_geometry
+
+    @property
+    def effective_render_distance(self) -> int:
+        """The render distance actually in use. This may be lower than render_distance if adaptive mode is enabled."""
+        return self.render_world.render_distance
+
     def _on_camera_moved(self, evt: CameraMovedEvent):
         """The camera has moved. Update each class's camera state."""
         self.move_camera(evt.camera_location, evt.camera_rotation)
@@ -217,15 +333,39 @@ class Renderer(EditCanvasContainer):
 
     def start_draw(self):
         """Run commands before drawing."""
+        self._adaptive_render_distance.start_frame()
         glClear(GL_COLOR_BUFFER_BIT | GL_DEPTH_BUFFER_BIT)
 
     def draw_sky_box(self):
         """Draw the skybox."""
         self.sky_box.draw(self.canvas.camera.transformation_matrix)
 
+    def rebuild_changed(self):
+        """Rebuild the geometry and the block index of the chunks in the main level that have changed."""
+        self.render_world.rebuild_changed()
+        self.top_down_map.rebuild_changed()
+        self.canvas.block_index.rebuild_changed()
+
     def draw_level(self):
-        """Draw the main level."""
-        self.render_world.draw(self.canvas.camera.transformation_matrix)
+        """Draw the main level.
+        In the top-down view the level is drawn as a flat map if more is visible than the render distance covers."""
+        camera = self.canvas.camera
+        if camera.projection_mode == Projection.TOP_DOWN:
+            half_width = camera.fov * camera.aspect_ratio
+            half_height = camera.fov
+            if max(half_width, half_height) > self.render_world.render_distance * 16:
+                self.top_down_map.active = True
+                x, y, z = camera.location
+                self.top_down_map.set_view(
+                    x, z, half_width, half_height, self.canvas.GetSize()[0]
+                )
+                near, far = camera.orthographic_clipping
+                self.top_down_map.draw(
+                    camera.transformation_matrix, y - (near + far) / 2
+                )
+                return
+        self.top_down_map.active = False
+        self.render_world.draw(camera.transformation_matrix)
 
     def draw_fake_levels(self):
         """Draw the floating structure levels."""
@@ -235,15 +375,29 @@ class Renderer(EditCanvasContainer):
 
         def end_draw(self):
             """Run commands after drawing."""
+            self._update_render_distance()
             self.canvas.SwapBuffers()
 
     else:
 
         def end_draw(self):
             """Run commands after drawing."""
+            self._update_render_distance()
             self.canvas.SwapBuffers()
             self._chunk_generator.thread_action()
 
+    def _update_render_distance(self):
+        """Record the frame time and adapt the render distance if required.
+        This must run before the buffers are swapped so that the vsync wait is not included in the frame time."""
+        if self._adaptive_render_distance.enabled:
+            # Wait for the GPU so that the frame time includes the GPU work.
+            glFinish()
+        self._adaptive_render_distance.end_frame()
+        if self._adaptive_render_distance.update(self.render_world.chunk_backlog):
+            self.render_world.render_distance = (
+                self._adaptive_render_distance.render_distance
+            )
+
     def _gc(self, event):
         """Unload data to limit memory usage."""
         self.render_world.run_garbage_collector()
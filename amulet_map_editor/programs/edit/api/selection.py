@@ -1,17 +1,26 @@
-from typing import Tuple, Optional, Any, TYPE_CHECKING
+from typing import Tuple, Optional, Any, Generator, TYPE_CHECKING
+from collections import OrderedDict
 import logging
 import wx
 import weakref
+import numpy
 from amulet.api.selection import SelectionGroup, SelectionBox
 from amulet.api.history.history_manager import ObjectHistoryManager
 from amulet.api.history import Changeable
 
+from .selection_bvh import SelectionBVH
+from .selection_mask import SelectionMask
+
 log = logging.getLogger(__name__)
 
 if TYPE_CHECKING:
     from amulet_map_editor.programs.edit.api.canvas import EditCanvas
 
 BoxType = Tuple[Tuple[int, int, int], Tuple[int, int, int]]  # min and max positions
+# The number of selection groups to keep a bounding volume hierarchy for.
+MaxSelectionBVHs = 4
+# The maximum number of arrays the boxes in a selection snapshot are split between before they are merged.
+MaxSnapshotSegments = 16
 
 
 _SelectionChangeEventType = wx.NewEventType()
@@ -32,6 +41,11 @@ class SelectionManager(Changeable):
         super().__init__()
         self._selection_corners: Tuple[BoxType, ...] = ()
         self._selection_group: SelectionGroup = SelectionGroup()
+        # The individual blocks selected. If None every block in the selection group is selected.
+        self._selection_mask: Optional[SelectionMask] = None
+        # The hierarchies of the most recently used selection groups keyed by the id of the group.
+        # The hierarchy stores the group so the id cannot be reused while it is in here.
+        self._selection_bvhs: "OrderedDict[int, SelectionBVH]" = OrderedDict()
         self._canvas = weakref.ref(canvas)
 
         self._timer = wx.Timer(canvas)
@@ -113,8 +127,29 @@ class SelectionManager(Changeable):
         self._selection_group = SelectionGroup(
             [SelectionBox(*box) for box in self._selection_corners]
         )
+        self._clear_changed_mask()
         wx.PostEvent(self._canvas(), SelectionChangeEvent())
 
+    def get_selection_bvh(
+        self, selection_group: Optional[SelectionGroup] = None
+    ) -> SelectionBVH:
+        """Get a bounding volume hierarchy to quickly find the box a vector hits.
+        The hierarchy is cached until the selection group is no longer used.
+
+        :param selection_group: The selection group to get the hierarchy for. Defaults to the current selection.
+        :return: The `SelectionBVH` for the selection group.
+        """
+        if selection_group is None:
+            selection_group = self._selection_group
+        key = id(selection_group)
+        bvh = self._selection_bvhs.get(key)
+        if bvh is None or bvh.selection_group is not selection_group:
+            bvh = self._selection_bvhs[key] = SelectionBVH(selection_group)
+        self._selection_bvhs.move_to_end(key)
+        while len(self._selection_bvhs) > MaxSelectionBVHs:
+            self._selection_bvhs.popitem(last=False)
+        return bvh
+
     @property
     def selection_group(self) -> SelectionGroup:
         """Get the selection as a `SelectionGroup`
@@ -146,19 +181,183 @@ class SelectionManager(Changeable):
             (box.min, box.max) for box in selection_group.selection_boxes
         ]
         self._selection_group = selection_group
+        self._clear_changed_mask()
         wx.PostEvent(self._canvas(), SelectionChangeEvent())
 
+    def _clear_changed_mask(self):
+        """Remove the selection mask if the selection group no longer matches it."""
+        if (
+            self._selection_mask is not None
+            and self._selection_group != self._selection_mask.selection_group
+        ):
+            self._selection_mask = None
+
+    @property
+    def selection_mask(self) -> Optional[SelectionMask]:
+        """Get the individual blocks selected.
+        If this is None every block in `selection_group` is selected.
+        Otherwise `selection_group` contains the bounding boxes of the selected blocks.
+        """
+        return self._selection_mask
+
+    @selection_mask.setter
+    def selection_mask(self, selection_mask: Optional[SelectionMask]):
+        """Select individual blocks.
+        Will create events that allow the program to update.
+
+        :param selection_mask: The blocks to select. If None every block in the selection group is selected.
+        :return:
+        """
+        self.set_selection_mask(selection_mask)
+        self._start_undo_point()
+
+    def set_selection_mask(self, selection_mask: Optional[SelectionMask]):
+        """Select individual blocks.
+        The selection group is set to the bounding boxes of the selected blocks.
+        Note this method will not trigger the history logic.
+        You may instead want the selection_mask setter method.
+
+        :param selection_mask: The blocks to select. If None every block in the selection group is selected.
+        :return:
+        """
+        if selection_mask is None:
+            if self._selection_mask is not None:
+                self.changed = True
+                self._selection_mask = None
+                wx.PostEvent(self._canvas(), SelectionChangeEvent())
+        else:
+            self._selection_mask = selection_mask
+            self.set_selection_group(selection_mask.selection_group)
+
+
+class SelectionSnapshot:
+    """An immutable copy of the selection stored in the undo history.
+
+    The box corners are stored in read only int32 arrays.
+    The boxes are split between a number of arrays so that a snapshot can reuse the arrays of the previous snapshot
+    when only the boxes at the end of the selection have changed.
+    """
+
+    __slots__ = ("_segments", "_box_count", "_selection_mask")
+
+    def __init__(
+        self,
+        segments: Tuple[numpy.ndarray, ...],
+        selection_mask: Optional[SelectionMask],
+    ):
+        """
+        Create a new snapshot. Use create to make a snapshot from the selection corners.
+
+        :param segments: The corners of the boxes. Each array has shape (box_count, 2, 3).
+        :param selection_mask: The selection mask or None if there is no mask.
+        """
+        self._segments = segments
+        self._box_count = sum(len(segment) for segment in segments)
+        self._selection_mask = selection_mask
+
+    @classmethod
+    def create(
+        cls,
+        selection_corners: Tuple[BoxType, ...],
+        selection_mask: Optional[SelectionMask],
+        previous: Optional["SelectionSnapshot"] = None,
+    ) -> "SelectionSnapshot":
+        """
+        Create a snapshot of a selection.
+
+        :param selection_corners: The minimum and maximum points of each box.
+        :param selection_mask: The selection mask or None if there is no mask.
+        :param previous: The previous snapshot. The arrays matching the start of the selection are shared with this.
+        :return: The new snapshot.
+        """
+        corners = numpy.array(selection_corners, dtype=numpy.int32).reshape((-1, 2, 3))
+        segments = []
+        start = 0
+        if previous is not None:
+            for segment in previous._segments:
+                end = start + len(segment)
+                if end > len(corners) or not numpy.array_equal(
+                    corners[start:end], segment
+                ):
+                    break
+                segments.append(segment)
+                start = end
+        if start < len(corners):
+            # copy so that the shared boxes are not kept alive by the new array
+            segments.append(corners if start == 0 else corners[start:].copy())
+        if len(segments) > MaxSnapshotSegments:
+            segments = [corners]
+        for segment in segments:
+            segment.flags.writeable = False
+        return cls(tuple(segments), selection_mask)
+
+    def __eq__(self, other):
+        if not isinstance(other, SelectionSnapshot):
+            return NotImplemented
+        return (
+            self._box_count == other._box_count
+            and numpy.array_equal(self.corners, other.corners)
+            and self._selection_mask == other._selection_mask
+        )
+
+    @property
+    def corners(self) -> numpy.ndarray:
+        """The corners of every box. Shape (box_count, 2, 3)"""
+        if not self._segments:
+            return numpy.zeros((0, 2, 3), dtype=numpy.int32)
+        elif len(self._segments) == 1:
+            return self._segments[0]
+        return numpy.concatenate(self._segments).reshape((-1, 2, 3))
+
+    @property
+    def selection_corners(self) -> Tuple[BoxType, ...]:
+        """The minimum and maximum points of each box."""
+        return tuple(
+            (tuple(point_1), tuple(point_2))
+            for point_1, point_2 in self.corners.tolist()
+        )
+
+    @property
+    def selection_mask(self) -> Optional[SelectionMask]:
+        return self._selection_mask
+
 
 class SelectionHistoryManager(ObjectHistoryManager):
     def __init__(self, selection_manager: SelectionManager):
+        # The snapshot stored in the current undo point.
+        self._snapshot: Optional[SelectionSnapshot] = None
         super().__init__(selection_manager)
+        self._snapshot = self._revision_manager.get_current_entry()
 
     @property
     def value(self) -> SelectionManager:
         return self._value
 
+    def purge(self):
+        super().purge()
+        self._snapshot = self._revision_manager.get_current_entry()
+
+    def create_undo_point_iter(self) -> Generator[float, None, bool]:
+        if self._value.changed:
+            snapshot = self._pack_value(self._value)
+            if snapshot == self._snapshot:
+                # The selection was changed back to how it was at the last undo point so no undo point is needed.
+                self._value.changed = False
+            else:
+                self._snapshot = snapshot
+        return (yield from super().create_undo_point_iter())
+
+    def _pack(self):
+        # The snapshot was created when checking if the selection changed.
+        self._revision_manager.put_new_entry(self._snapshot)
+
     def _unpack_value(self, value: Optional[Any]):
-        self.value.set_selection_corners(value)
+        self._snapshot = value
+        self.value.set_selection_corners(value.selection_corners)
+        # The mask must be cleared as well because it is only cleared automatically when the boxes change.
+        self.value.set_selection_mask(value.selection_mask)
 
     def _pack_value(self, value: SelectionManager) -> Optional[Any]:
-        return value.selection_corners
+        return SelectionSnapshot.create(
+            value.selection_corners, value.selection_mask, self._snapshot
+        )
@@ -0,0 +1,146 @@
+from typing import Optional, Tuple, List
+
+import numpy
+
+from amulet.api.selection import SelectionGroup
+from amulet.api.data_types import PointCoordinatesAny
+
+# The maximum number of boxes in a leaf node. The boxes in a leaf are tested together.
+LeafSize = 8
+
+
+class SelectionBVH:
+    """A bounding volume hierarchy over the boxes in a selection group.
+
+    This finds the box a vector hits without testing every box in the group.
+    The results match SelectionGroup.closest_vector_intersection.
+    """
+
+    def __init__(self, selection_group: SelectionGroup):
+        self._selection_group = selection_group
+        # The min and max point of each box. Shape (box_count, 2, 3)
+        self._box_bounds = numpy.array(
+            [(box.min, box.max) for box in selection_group.selection_boxes],
+            dtype=numpy.float64,
+        ).reshape((-1, 2, 3))
+        # The box indexes ordered so that the boxes in each node are contiguous.
+        self._order = numpy.arange(len(self._box_bounds))
+        node_bounds: List[numpy.ndarray] = []
+        # The two child nodes of each node. None for leaf nodes.
+        self._node_children: List[Optional[Tuple[int, int]]] = []
+        # The start and end index into _order of the boxes in each node.
+        self._node_ranges: List[Tuple[int, int]] = []
+        if len(self._box_bounds):
+            self._build(node_bounds, 0, len(self._box_bounds))
+        self._node_bounds = numpy.array(node_bounds, dtype=numpy.float64).reshape(
+            (-1, 2, 3)
+        )
+
+    @property
+    def selection_group(self) -> SelectionGroup:
+        """The selection group the hierarchy was built from."""
+        return self._selection_group
+
+    def _build(self, node_bounds: List[numpy.ndarray], start: int, end: int) -> int:
+        """Create the node containing the boxes in _order[start:end] and its children.
+
+        :return: The index of the new node.
+        """
+        indexes = self._order[start:end]
+        bounds = self._box_bounds[indexes]
+        node_index = len(node_bounds)
+        node_bounds.append(
+            numpy.array([numpy.min(bounds[:, 0], 0), numpy.max(bounds[:, 1], 0)])
+        )
+        self._node_children.append(None)
+        self._node_ranges.append((start, end))
+        if end - start > LeafSize:
+            # split the boxes in half along the axis their centres are most spread out on
+            centres = bounds[:, 0] + bounds[:, 1]
+            axis = numpy.argmax(numpy.max(centres, 0) - numpy.min(centres, 0))
+            self._order[start:end] = indexes[
+                numpy.argsort(centres[:, axis], kind="stable")
+            ]
+            middle = (start + end) // 2
+            self._node_children[node_index] = (
+                self._build(node_bounds, start, middle),
+                self._build(node_bounds, middle, end),
+            )
+        return node_index
+
+    @staticmethod
+    def _intersect(
+        bounds: numpy.ndarray, origin: numpy.ndarray, vector: numpy.ndarray
+    ) -> numpy.ndarray:
+        """Find the multiplier of the vector to each box.
+
+        :param bounds: The min and max point of each box. Shape (N, 2, 3)
+        :param origin: The origin of the vector.
+        :param vector: The vector with no zero components.
+        :return: The multiplier of the vector to each box. inf where the vector does not hit the box.
+        """
+        t = numpy.sort((bounds - origin) / vector, axis=1)
+        t_near = numpy.max(t[:, 0], 1)
+        t_far = numpy.min(t[:, 1], 1)
+        # If the origin is inside the box the far side is hit.
+        return numpy.where(
+            t_near > t_far,
+            numpy.inf,
+            numpy.where(t_near >= 0, t_near, numpy.where(t_far >= 0, t_far, numpy.inf)),
+        )
+
+    def closest_vector_intersection(
+        self, origin: PointCoordinatesAny, vector: PointCoordinatesAny
+    ) -> Tuple[Optional[int], float]:
+        """
+        Returns the index for the closest box in the look vector and the multiplier of the look vector to get there.
+
+        :param origin: The origin tuple of the vector
+        :param vector: The vector magnitude in x, y and z
+        :return: Index for the closest box and the multiplier of the vector to get there. None, inf if no intersection.
+        """
+        best_index = None
+        best_multiplier = float("inf")
+        if not len(self._node_bounds):
+            return best_index, best_multiplier
+        origin = numpy.array(origin, dtype=numpy.float64)
+        vector = numpy.array(vector, dtype=numpy.float64)
+        vector[abs(vector) < 0.000001] = 0.000001
+
+        # The boxes in a node are at least as far as the near side of the node.
+        # The nodes are visited nearest first and skipped if they are further than the best box found.
+        stack = [(0.0, 0)]
+        while stack:
+            node_multiplier, node_index = stack.pop()
+            if node_multiplier > best_multiplier:
+                continue
+            children = self._node_children[node_index]
+            if children is None:
+                start, end = self._node_ranges[node_index]
+                indexes = self._order[start:end]
+                multipliers = self._intersect(self._box_bounds[indexes], origin, vector)
+                multiplier = numpy.min(multipliers)
+                if multiplier <= best_multiplier and multiplier != numpy.inf:
+                    # The box with the lowest index is used if more than one box is the same distance.
+                    box_index = int(numpy.min(indexes[multipliers == multiplier]))
+                    if (
+                        multiplier < best_multiplier
+                        or best_index is None
+                        or box_index < best_index
+                    ):
+                        best_index = box_index
+                        best_multiplier = float(multiplier)
+            else:
+                bounds = self._node_bounds[list(children)]
+                t = numpy.sort((bounds - origin) / vector, axis=1)
+                t_near = numpy.max(t[:, 0], 1)
+                t_far = numpy.min(t[:, 1], 1)
+                hit = (t_near <= t_far) & (t_far >= 0)
+                t_near = numpy.maximum(t_near, 0)
+                # push the further child first so that the nearer child is visited first
+                for child_index in numpy.argsort(-t_near, kind="stable"):
+                    if hit[child_index] and t_near[child_index] <= best_multiplier:
+                        stack.append(
+                            (float(t_near[child_index]), children[child_index])
+                        )
+        return best_index, best_multiplier
@@ -0,0 +1,21 @@
+"""Checks shared by the operations that export the selection to a file."""
+
+from typing import Optional
+
+from .operations.errors import OperationError
+from .selection_mask import SelectionMask
+
+
+def check_selection_exportable(selection_mask: Optional[SelectionMask]):
+    """
+    Check that the selection can be exported.
+    The export formats store the selection boxes so a selection of individual blocks cannot be exported.
+
+    :param selection_mask: The selection mask of the canvas.
+    :raises:
+        OperationError: If the selection is a selection of individual blocks.
+    """
+    if selection_mask is not None:
+        raise OperationError(
+            "Block selections cannot be exported. Select the region with boxes instead."
+        )
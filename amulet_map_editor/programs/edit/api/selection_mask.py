@@ -0,0 +1,406 @@
+"""Selections of individual blocks.
+
+A SelectionGroup can only describe a union of boxes so an irregular shape needs a box for every run of blocks.
+A SelectionMask stores which blocks are selected in each chunk as a packed bit array.
+The SelectionManager stores the bounding box of the selected blocks in each chunk as the selection group
+so code that only understands boxes still works and operations that understand masks only touch the selected blocks.
+"""
+
+from collections import deque
+from typing import Dict, Tuple, Optional, Generator, KeysView
+
+import numpy
+
+from amulet.api.level import BaseLevel
+from amulet.api.block import UniversalAirBlock
+from amulet.api.chunk import Chunk
+from amulet.api.selection import SelectionGroup, SelectionBox
+from amulet.api.errors import ChunkLoadError
+from amulet.api.data_types import Dimension, ChunkCoordinates, BlockCoordinates
+
+# The default maximum number of blocks a flood fill can select.
+MaxFloodFillBlocks = 1_000_000
+
+ChunkSlices = Tuple[slice, slice, slice]
+
+
+class SelectionMask:
+    """An immutable selection of individual blocks.
+
+    The selected blocks in each chunk are stored as a packed bit array trimmed to the height range of the selected blocks.
+    Chunks without any selected blocks are not stored.
+    """
+
+    def __init__(
+        self,
+        chunk_masks: Optional[Dict[ChunkCoordinates, Tuple[int, numpy.ndarray]]] = None,
+    ):
+        """
+        Construct a new SelectionMask.
+
+        :param chunk_masks: A dictionary mapping chunk coordinates to the y coordinate of the bottom of the mask and
+            a bool array of shape (16, height, 16) indexed by x, y - min_y, z.
+        """
+        # The min y, height and packed bits of each chunk
+        self._chunks: Dict[ChunkCoordinates, Tuple[int, int, numpy.ndarray]] = {}
+        self._volume = 0
+        self._selection_group: Optional[SelectionGroup] = None
+        if chunk_masks:
+            for (cx, cz), (min_y, mask) in chunk_masks.items():
+                self._add_chunk_mask(cx, cz, min_y, mask)
+
+    def _add_chunk_mask(self, cx: int, cz: int, min_y: int, mask: numpy.ndarray):
+        mask = numpy.asarray(mask, dtype=bool)
+        if mask.shape[0] != 16 or mask.shape[2] != 16:
+            raise ValueError("Chunk masks must have shape (16, height, 16)")
+        y_indexes = numpy.flatnonzero(numpy.any(mask, axis=(0, 2)))
+        if y_indexes.size:
+            mask = mask[:, y_indexes[0] : y_indexes[-1] + 1]
+            self._chunks[(cx, cz)] = (
+                min_y + int(y_indexes[0]),
+                mask.shape[1],
+                numpy.packbits(mask, axis=None),
+            )
+            self._volume += int(numpy.count_nonzero(mask))
+
+    def __bool__(self) -> bool:
+        return bool(self._chunks)
+
+    def __eq__(self, other) -> bool:
+        return (
+            isinstance(other, SelectionMask)
+            and self._chunks.keys() == other._chunks.keys()
+            and all(
+                min_y == other._chunks[key][0]
+                and height == other._chunks[key][1]
+                and numpy.array_equal(packed, other._chunks[key][2])
+                for key, (min_y, height, packed) in self._chunks.items()
+            )
+        )
+
+    @property
+    def volume(self) -> int:
+        """The number of selected blocks."""
+        return self._volume
+
+    def chunk_locations(self) -> KeysView[ChunkCoordinates]:
+        """The coordinates of the chunks containing selected blocks."""
+        return self._chunks.keys()
+
+    def get_chunk_mask(self, cx: int, cz: int) -> Optional[Tuple[int, numpy.ndarray]]:
+        """
+        Get the selected blocks in a chunk.
+
+        :param cx: The chunk x coordinate.
+        :param cz: The chunk z coordinate.
+        :return: The y coordinate of the bottom of the mask and a bool array of shape (16, height, 16) indexed by x, y - min_y, z.
+            None if no blocks in the chunk are selected.
+        """
+        entry = self._chunks.get((cx, cz))
+        if entry is None:
+            return None
+        min_y, height, packed = entry
+        return (
+            min_y,
+            numpy.unpackbits(packed, count=16 * height * 16)
+            .reshape((16, height, 16))
+            .astype(bool),
+        )
+
+    def get_slice_mask(self, cx: int, cz: int, slices: ChunkSlices) -> numpy.ndarray:
+        """
+        Get the selected blocks in a slice of a chunk.
+
+        :param cx: The chunk x coordinate.
+        :param cz: The chunk z coordinate.
+        :param slices: The slices into the chunk as returned by BaseLevel.get_chunk_slice_box.
+        :return: A bool array with the same shape as the slice of the chunk.
+        """
+        slice_x, slice_y, slice_z = slices
+        slice_mask = numpy.zeros(
+            (
+                slice_x.stop - slice_x.start,
+                slice_y.stop - slice_y.start,
+                slice_z.stop - slice_z.start,
+            ),
+            dtype=bool,
+        )
+        chunk_mask = self.get_chunk_mask(cx, cz)
+        if chunk_mask is not None:
+            min_y, mask = chunk_mask
+            y_start = max(slice_y.start, min_y)
+            y_stop = min(slice_y.stop, min_y + mask.shape[1])
+            if y_start < y_stop:
+                slice_mask[:, y_start - slice_y.start : y_stop - slice_y.start] = mask[
+                    slice_x, y_start - min_y : y_stop - min_y, slice_z
+                ]
+        return slice_mask
+
+    def contains_block(self, x: int, y: int, z: int) -> bool:
+        """Is the block at the given location selected."""
+        cx, cz = x >> 4, z >> 4
+        return bool(
+            self.get_slice_mask(
+                cx,
+                cz,
+                (
+                    slice(x - cx * 16, x - cx * 16 + 1),
+                    slice(y, y + 1),
+                    slice(z - cz * 16, z - cz * 16 + 1),
+                ),
+            )[0, 0, 0]
+        )
+
+    @property
+    def selection_group(self) -> SelectionGroup:
+        """A selection group containing the bounding box of the selected blocks in each chunk."""
+        if self._selection_group is None:
+            boxes = []
+            for (cx, cz), (min_y, height, _) in sorted(self._chunks.items()):
+                _, mask = self.get_chunk_mask(cx, cz)
+                x_indexes = numpy.flatnonzero(numpy.any(mask, axis=(1, 2)))
+                z_indexes = numpy.flatnonzero(numpy.any(mask, axis=(0, 1)))
+                boxes.append(
+                    SelectionBox(
+                        (cx * 16 + x_indexes[0], min_y, cz * 16 + z_indexes[0]),
+                        (
+                            cx * 16 + x_indexes[-1] + 1,
+                            min_y + height,
+                            cz * 16 + z_indexes[-1] + 1,
+                        ),
+                    )
+                )
+            self._selection_group = SelectionGroup(boxes)
+        return self._selection_group
+
+    def union(self, other: "SelectionMask") -> "SelectionMask":
+        """Create a new SelectionMask containing the blocks selected in this mask and the other mask."""
+        chunk_masks = {}
+        for key in self._chunks.keys() | other._chunks.keys():
+            masks = [
+                mask
+                for mask in (self.get_chunk_mask(*key), other.get_chunk_mask(*key))
+                if mask is not None
+            ]
+            min_y = min(mask_min_y for mask_min_y, _ in masks)
+            max_y = max(mask_min_y + mask.shape[1] for mask_min_y, mask in masks)
+            chunk_mask = numpy.zeros((16, max_y - min_y, 16), dtype=bool)
+            for mask_min_y, mask in masks:
+                chunk_mask[
+                    :, mask_min_y - min_y : mask_min_y - min_y + mask.shape[1]
+                ] |= mask
+            chunk_masks[key] = (min_y, chunk_mask)
+        return SelectionMask(chunk_masks)
+
+
+def get_chunk_slice_box_mask(
+    world: BaseLevel,
+    dimension: Dimension,
+    selection: SelectionGroup,
+    selection_mask: Optional[SelectionMask] = None,
+    create_missing: bool = False,
+) -> Generator[
+    Tuple[Chunk, ChunkSlices, SelectionBox, Optional[numpy.ndarray]], None, None
+]:
+    """
+    Iterate over the chunk slices in the selection like BaseLevel.get_chunk_slice_box
+    and get which blocks in each slice are selected.
+
+    :param world: The world to get the chunks from.
+    :param dimension: The dimension the selection is in.
+    :param selection: The selection group to iterate over.
+    :param selection_mask: The selected blocks. If None all blocks in the selection group are selected.
+    :param create_missing: If true chunks will be created if they do not exist.
+    :return: A generator of the chunk, the slices into the chunk, the box and a bool array with the same shape as the
+        slice of the chunk. The array is None if every block in the slice is selected.
+    """
+    for chunk, slices, box in world.get_chunk_slice_box(
+        dimension, selection, create_missing
+    ):
+        if selection_mask is None:
+            yield chunk, slices, box, None
+        else:
+            yield chunk, slices, box, selection_mask.get_slice_mask(
+                *chunk.coordinates, slices
+            )
+
+
+def clear_unselected(
+    structure: BaseLevel,
+    dimension: Dimension,
+    selection: SelectionGroup,
+    selection_mask: Optional[SelectionMask],
+):
+    """
+    Replace the blocks in the selection group that are not in the selection mask with air.
+    This is used to apply a mask to a structure extracted from the bounding boxes of the mask.
+    The structure must keep the coordinates of the level it was extracted from.
+
+    :param structure: The structure to modify.
+    :param dimension: The dimension in the structure.
+    :param selection: The selection group the structure was extracted from.
+    :param selection_mask: The selected blocks. If None nothing is changed.
+    """
+    if selection_mask is None:
+        return
+    air_id = structure.block_palette.get_add_block(UniversalAirBlock)
+    for chunk, slices, _, mask in get_chunk_slice_box_mask(
+        structure, dimension, selection, selection_mask
+    ):
+        unselected = numpy.invert(mask)
+        if not numpy.any(unselected):
+            continue
+        blocks = chunk.blocks[slices]
+        blocks[unselected] = air_id
+        chunk.blocks[slices] = blocks
+
+        x_min = chunk.cx * 16 + slices[0].start
+        y_min = slices[1].start
+        z_min = chunk.cz * 16 + slices[2].start
+        for x, y, z in list(chunk.block_entities.keys()):
+            dx, dy, dz = x - x_min, y - y_min, z - z_min
+            if (
+                0 <= dx < unselected.shape[0]
+                and 0 <= dy < unselected.shape[1]
+                and 0 <= dz < unselected.shape[2]
+                and unselected[dx, dy, dz]
+            ):
+                chunk.block_entities.pop((x, y, z))
+        chunk.changed = True
+
+
+def _grow(
+    filled: numpy.ndarray, frontier: numpy.ndarray, match: numpy.ndarray, limit: int
+) -> Tuple[int, bool]:
+    """
+    Grow the filled region through the matching blocks until it cannot grow any more.
+    This modifies filled in place.
+
+    :param filled: The blocks that have been filled.
+    :param frontier: The filled blocks that have not been grown from yet.
+    :param match: The blocks that can be filled.
+    :param limit: Stop growing after this many blocks have been added.
+    :return: The number of blocks added and True if the region cannot grow any more.
+    """
+    added = 0
+    while True:
+        grown = numpy.zeros_like(frontier)
+        grown[1:] |= frontier[:-1]
+        grown[:-1] |= frontier[1:]
+        grown[:, 1:] |= frontier[:, :-1]
+        grown[:, :-1] |= frontier[:, 1:]
+        grown[:, :, 1:] |= frontier[:, :, :-1]
+        grown[:, :, :-1] |= frontier[:, :, 1:]
+        frontier = grown & match & numpy.invert(filled)
+        count = int(numpy.count_nonzero(frontier))
+        if not count:
+            return added, True
+        if added >= limit:
+            # There are more blocks to fill but the limit has been reached.
+            return added, False
+        filled |= frontier
+        added += count
+
+
+def flood_fill(
+    world: BaseLevel,
+    dimension: Dimension,
+    location: BlockCoordinates,
+    max_blocks: int = MaxFloodFillBlocks,
+) -> Tuple[SelectionMask, bool]:
+    """
+    Select the blocks connected to a location that are the same as the block at that location.
+    Blocks are connected if they share a face.
+    Each chunk is filled with array operations and the fill continues into the neighbouring chunks through the shared faces.
+
+    :param world: The world to fill in.
+    :param dimension: The dimension to fill in.
+    :param location: The location of the block to start from.
+    :param max_blocks: Stop filling after this many blocks have been selected.
+    :return: The selected blocks and True if the fill was stopped by the block limit.
+    """
+    bounds = world.bounds(dimension)
+    min_y, max_y = bounds.min_y, bounds.max_y
+    x, y, z = map(int, location)
+    if not min_y <= y < max_y:
+        return SelectionMask(), False
+    cx, cz = x >> 4, z >> 4
+
+    def get_blocks(chunk_x: int, chunk_z: int) -> Optional[numpy.ndarray]:
+        try:
+            chunk = world.get_chunk(chunk_x, chunk_z, dimension)
+        except ChunkLoadError:
+            return None
+        return numpy.asarray(chunk.blocks[0:16, min_y:max_y, 0:16])
+
+    blocks = get_blocks(cx, cz)
+    if blocks is None:
+        return SelectionMask(), False
+    target = blocks[x - cx * 16, y - min_y, z - cz * 16]
+
+    matches: Dict[ChunkCoordinates, Optional[numpy.ndarray]] = {
+        (cx, cz): blocks == target
+    }
+    filled: Dict[ChunkCoordinates, numpy.ndarray] = {}
+    seeds: Dict[ChunkCoordinates, numpy.ndarray] = {
+        (cx, cz): numpy.zeros(blocks.shape, dtype=bool)
+    }
+    seeds[(cx, cz)][x - cx * 16, y - min_y, z - cz * 16] = True
+    queue = deque([(cx, cz)])
+    count = 0
+    truncated = False
+
+    while queue:
+        key = queue.popleft()
+        seed = seeds.pop(key)
+        if key not in matches:
+            blocks = get_blocks(*key)
+            matches[key] = None if blocks is None else blocks == target
+        match = matches[key]
+        if match is None:
+            continue
+        chunk_filled = filled.get(key)
+        if chunk_filled is None:
+            chunk_filled = filled[key] = numpy.zeros(match.shape, dtype=bool)
+        frontier = seed & match & numpy.invert(chunk_filled)
+        if count >= max_blocks:
+            if numpy.any(frontier):
+                # The limit was reached but the fill continues into this chunk.
+                truncated = True
+                break
+            continue
+        before = chunk_filled.copy()
+        chunk_filled |= frontier
+        count += int(numpy.count_nonzero(frontier))
+        added_count, finished = _grow(chunk_filled, frontier, match, max_blocks - count)
+        count += added_count
+        if not finished:
+            truncated = True
+            break
+        added = chunk_filled & numpy.invert(before)
+
+        # continue the fill into the neighbouring chunks
+        for neighbour, axis, index, neighbour_index in (
+            ((key[0] - 1, key[1]), 0, 0, 15),
+            ((key[0] + 1, key[1]), 0, 15, 0),
+            ((key[0], key[1] - 1), 2, 0, 15),
+            ((key[0], key[1] + 1), 2, 15, 0),
+        ):
+            face_added = numpy.take(added, index, axis)
+            if not numpy.any(face_added):
+                continue
+            neighbour_seed = seeds.get(neighbour)
+            if neighbour_seed is None:
+                neighbour_seed = seeds[neighbour] = numpy.zeros(match.shape, dtype=bool)
+                queue.append(neighbour)
+            if axis == 0:
+                neighbour_seed[neighbour_index] |= face_added
+            else:
+                neighbour_seed[:, :, neighbour_index] |= face_added
+
+    return (
+        SelectionMask(
+            {key: (min_y, mask) for key, mask in filled.items() if numpy.any(mask)}
+        ),
+        truncated,
+    )
@@ -0,0 +1,639 @@
+"""A top-down 2D map of a level.
+
+Each block column is drawn as one pixel coloured by the highest block and shaded by the height difference to its neighbour.
+The pixels are stored in square tiles arranged in a pyramid.
+Tiles on level 0 have one pixel per block column and each level above covers twice the distance with the same number of pixels.
+The level drawn is chosen so that a texel is roughly the size of a screen pixel
+so the number of tiles drawn does not depend on how far the camera is zoomed out.
+"""
+
+import logging
+import math
+import time
+import ctypes
+import weakref
+from collections import OrderedDict
+from threading import RLock
+from typing import Optional, Dict, Tuple, List, Set
+
+import numpy
+from OpenGL.GL import (
+    glGenTextures,
+    glDeleteTextures,
+    glBindTexture,
+    glTexParameteri,
+    glTexImage2D,
+    glActiveTexture,
+    glGenVertexArrays,
+    glDeleteVertexArrays,
+    glBindVertexArray,
+    glGenBuffers,
+    glDeleteBuffers,
+    glBindBuffer,
+    glBufferData,
+    glVertexAttribPointer,
+    glEnableVertexAttribArray,
+    glUseProgram,
+    glGetUniformLocation,
+    glUniformMatrix4fv,
+    glUniform1i,
+    glDrawArrays,
+    glDepthMask,
+    glIsEnabled,
+    glEnable,
+    glDisable,
+    GL_TEXTURE_2D,
+    GL_TEXTURE0,
+    GL_TEXTURE_MIN_FILTER,
+    GL_TEXTURE_MAG_FILTER,
+    GL_TEXTURE_WRAP_S,
+    GL_TEXTURE_WRAP_T,
+    GL_NEAREST,
+    GL_CLAMP_TO_EDGE,
+    GL_RGBA,
+    GL_UNSIGNED_BYTE,
+    GL_ARRAY_BUFFER,
+    GL_STATIC_DRAW,
+    GL_FLOAT,
+    GL_FALSE,
+    GL_TRUE,
+    GL_TRIANGLES,
+    GL_CULL_FACE,
+)
+
+from amulet.api.level import BaseLevel
+from amulet.api.registry import BlockManager
+from amulet.api.errors import ChunkLoadError
+from amulet.api.data_types import Dimension
+
+from amulet_map_editor.api.opengl import Drawable, ThreadedObject, ContextManager
+from amulet_map_editor.api.opengl.shaders import get_shader
+from amulet_map_editor.api.opengl.matrix import displacement_matrix, scale_matrix
+from amulet_map_editor.api.opengl.resource_pack import (
+    OpenGLResourcePackManager,
+    OpenGLResourcePack,
+)
+
+from .chunk_mask_cache import ChunkMaskCache, EmptyColumnHeight
+
+log = logging.getLogger(__name__)
+
+# The number of pixels along each side of a tile.
+TileSize = 256
+# The number of chunks along each side of a level 0 tile.
+TileChunks = TileSize // 16
+# The highest level of the tile pyramid.
+MaxTileLevel = 10
+# The maximum number of tile textures uploaded each frame.
+MaxTextureUploads = 8
+# The maximum number of tile textures kept in video memory.
+MaxTileTextures = 512
+# The maximum number of level 0 tiles kept in memory.
+# Level 0 tiles are only needed to draw the closest zoom level and to rebuild the level above them.
+MaxLevel0Tiles = 256
+# The number of seconds spent creating chunk pixels on each call to thread_action.
+ChunkBatchTime = 0.02
+# The brightness change for each block of height difference to the neighbouring column.
+HeightShading = 0.05
+
+
+class MapTile:
+    """A square area of the map on one level of the pyramid."""
+
+    def __init__(self, level: int, tx: int, tz: int):
+        self.level = level
+        self.tx = tx
+        self.tz = tz
+        # RGBA pixels indexed by z and x.
+        self.pixels = numpy.zeros((TileSize, TileSize, 4), numpy.uint8)
+        # Have the pixels changed since the texture was uploaded.
+        self.changed = True
+        self.texture: Optional[int] = None
+
+    @property
+    def block_size(self) -> int:
+        """The number of blocks along each side of the tile."""
+        return TileSize << self.level
+
+
+class TopDownMap(OpenGLResourcePackManager, Drawable, ThreadedObject, ContextManager):
+    """Draws a level from above as a flat map of the highest block in each column."""
+
+    def __init__(
+        self,
+        context_identifier: str,
+        resource_pack: OpenGLResourcePack,
+        level: BaseLevel,
+        chunk_mask_cache: ChunkMaskCache,
+    ):
+        OpenGLResourcePackManager.__init__(self, resource_pack)
+        ContextManager.__init__(self, context_identifier)
+        self._level = weakref.ref(level)
+        self._chunk_mask_cache = chunk_mask_cache
+        self._dimension: Optional[Dimension] = None
+        self._lock = RLock()
+
+        self._tiles: Dict[Tuple[int, int, int], MapTile] = {}
+        # The level 0 tiles in the order they were last used.
+        self._level_0_tiles: "OrderedDict[Tuple[int, int, int], None]" = OrderedDict()
+        # The x and z coordinates of the level 0 tiles that were discarded after the tile above was built.
+        self._evicted_tiles: Set[Tuple[int, int]] = set()
+        # The tiles that currently have a texture in the order they were last drawn.
+        self._textures: "OrderedDict[Tuple[int, int, int], MapTile]" = OrderedDict()
+        # The changed_time of each chunk when its pixels were created. None if the chunk did not exist.
+        self._chunk_times: Dict[Tuple[int, int], Optional[float]] = {}
+        # The tiles above level 0 that need to be recreated from the level below.
+        self._dirty_tiles: Set[Tuple[int, int, int]] = set()
+        # The chunks waiting to be drawn into the map. The last chunk is created first.
+        self._pending: List[Tuple[int, int]] = []
+        self._all_chunks: Optional[numpy.ndarray] = None
+
+        # The area of the map visible on screen.
+        self._view_level = 0
+        self._view_bounds: Optional[Tuple[int, int, int, int]] = None
+        self._view_changed = False
+        self._check_changed = False
+        self._active = False
+
+        # The colour of each block in the block palette.
+        self._palette_colours = numpy.zeros((0, 4), numpy.uint8)
+        self._palette_colours_palette: Optional[BlockManager] = None
+
+        self._shader = None
+        self._transform_location = None
+        self._texture_location = None
+        self._vao = None
+        self._vbo = None
+
+    @property
+    def level(self) -> BaseLevel:
+        return self._level()
+
+    @property
+    def dimension(self) -> Optional[Dimension]:
+        return self._dimension
+
+    @dimension.setter
+    def dimension(self, dimension: Dimension):
+        """Set the dimension to draw. The OpenGL context must be current."""
+        if dimension != self._dimension:
+            self._dimension = dimension
+            self.clear()
+
+    @property
+    def active(self) -> bool:
+        """Is the map being drawn. Chunks are only processed while the map is active."""
+        return self._active
+
+    @active.setter
+    def active(self, active: bool):
+        self._active = bool(active)
+
+    def rebuild_changed(self):
+        """Redraw the chunks that have changed."""
+        self._check_changed = True
+
+    def set_view(
+        self,
+        x: float,
+        z: float,
+        half_width: float,
+        half_height: float,
+        screen_width: int,
+    ):
+        """
+        Set the area of the map visible on screen.
+
+        :param x: The x coordinate of the centre of the screen.
+        :param z: The z coordinate of the centre of the screen.
+        :param half_width: Half the number of blocks visible in the x axis.
+        :param half_height: Half the number of blocks visible in the z axis.
+        :param screen_width: The width of the screen in pixels.
+        """
+        blocks_per_pixel = 2 * half_width / max(1, screen_width)
+        view_level = min(
+            MaxTileLevel, max(0, int(math.floor(math.log2(max(1.0, blocks_per_pixel)))))
+        )
+        view_bounds = (
+            int(math.floor((x - half_width) / 16)),
+            int(math.floor((z - half_height) / 16)),
+            int(math.floor((x + half_width) / 16)),
+            int(math.floor((z + half_height) / 16)),
+        )
+        if view_bounds != self._view_bounds or view_level != self._view_level:
+            self._view_level = view_level
+            self._view_bounds = view_bounds
+            self._view_changed = True
+
+    def _get_palette_colours(self, palette: BlockManager) -> numpy.ndarray:
+        """Get an array mapping each block id in the palette to its map colour."""
+        if palette is not self._palette_colours_palette:
+            self._palette_colours_palette = palette
+            self._palette_colours = numpy.zeros((0, 4), numpy.uint8)
+        palette_size = len(palette)
+        if self._palette_colours.shape[0] < palette_size:
+            # The palette only grows so only the new blocks need looking up.
+            self._palette_colours = numpy.concatenate(
+                [
+                    self._palette_colours,
+                    numpy.array(
+                        [
+                            self.resource_pack.get_block_colour(palette[block_id])
+                            for block_id in range(
+                                self._palette_colours.shape[0], palette_size
+                            )
+                        ],
+                        numpy.uint8,
+                    ).reshape(-1, 4),
+                ]
+            )
+        return self._palette_colours
+
+    def _create_chunk_pixels(self, cx: int, cz: int) -> Optional[numpy.ndarray]:
+        """Create the pixels for a chunk and record its changed_time.
+
+        :return: An RGBA array of shape (16, 16, 4) indexed by z and x. None if the chunk does not exist.
+        """
+        try:
+            chunk = self.level.get_chunk(cx, cz, self._dimension)
+        except ChunkLoadError:
+            self._chunk_times[(cx, cz)] = None
+            return None
+        self._chunk_times[(cx, cz)] = chunk.changed_time
+        top_blocks = self._chunk_mask_cache.get_top_blocks(cx, cz, self._dimension)
+        if top_blocks is None:
+            return None
+        heightmap, block_ids = top_blocks
+        has_block = heightmap != EmptyColumnHeight
+        pixels = self._get_palette_colours(chunk.block_palette)[block_ids].astype(
+            numpy.float32
+        )
+        # Shade each column by the height difference to the column to the north.
+        # This is the same shading in-game maps use.
+        north_heightmap = numpy.concatenate((heightmap[:, :1], heightmap[:, :-1]), 1)
+        north_has_block = numpy.concatenate((has_block[:, :1], has_block[:, :-1]), 1)
+        shading = numpy.ones((16, 16), numpy.float32)
+        shaded = has_block & north_has_block
+        shading[shaded] = numpy.clip(
+            1 + (heightmap[shaded] - north_heightmap[shaded]) * HeightShading,
+            0.6,
+            1.4,
+        )
+        pixels[:, :, :3] *= shading[:, :, None]
+        pixels[:, :, 3] = numpy.where(has_block & (pixels[:, :, 3] > 0), 255, 0)
+        return numpy.clip(pixels, 0, 255).astype(numpy.uint8).transpose(1, 0, 2)
+
+    def _draw_chunk(self, cx: int, cz: int):
+        """Create the pixels for a chunk and copy them into the level 0 tile."""
+        pixels = self._create_chunk_pixels(cx, cz)
+        key = (0, cx // TileChunks, cz // TileChunks)
+        with self._lock:
+            tile = self._tiles.get(key)
+            if tile is None:
+                if pixels is None:
+                    return
+                tile = self._tiles[key] = MapTile(*key)
+            self._level_0_tiles[key] = None
+            self._level_0_tiles.move_to_end(key)
+            x = (cx % TileChunks) * 16
+            z = (cz % TileChunks) * 16
+            if pixels is None:
+                tile.pixels[z : z + 16, x : x + 16] = 0
+            else:
+                tile.pixels[z : z + 16, x : x + 16] = pixels
+            tile.changed = True
+        self._dirty_tiles.add((1, key[1] // 2, key[2] // 2))
+
+    def _rebuild_tile(self, key: Tuple[int, int, int]):
+        """Recreate a tile above level 0 by downsampling the four tiles below it."""
+        level, tx, tz = key
+        half = TileSize // 2
+        with self._lock:
+            tile = self._tiles.get(key)
+            if tile is None:
+                pixels = numpy.zeros((TileSize, TileSize, 4), numpy.uint8)
+            else:
+                pixels = tile.pixels.copy()
+        found = False
+        for dx in range(2):
+            for dz in range(2):
+                child = self._tiles.get((level - 1, tx * 2 + dx, tz * 2 + dz))
+                if child is None:
+                    # The child was never created or was evicted after this tile was built.
+                    # Either way the existing pixels are correct.
+                    continue
+                found = True
+                child_pixels = child.pixels.reshape(half, 2, half, 2, 4).astype(
+                    numpy.float32
+                )
+                alpha = child_pixels[..., 3:]
+                alpha_sum = numpy.sum(alpha, axis=(1, 3))
+                # weight the colours by the alpha so that empty areas do not darken the edges
+                colour = numpy.sum(child_pixels[..., :3] * alpha, axis=(1, 3)) / (
+                    numpy.maximum(alpha_sum, 1)
+                )
+                pixels[
+                    dz * half : (dz + 1) * half, dx * half : (dx + 1) * half, :3
+                ] = colour
+                pixels[dz * half : (dz + 1) * half, dx * half : (dx + 1) * half, 3] = (
+                    alpha_sum[..., 0] / 4
+                )
+        with self._lock:
+            tile = self._tiles.get(key)
+            if tile is None:
+                if not found:
+                    return
+                tile = self._tiles[key] = MapTile(*key)
+            tile.pixels[:] = pixels
+            tile.changed = True
+        if level < MaxTileLevel:
+            self._dirty_tiles.add((level + 1, tx // 2, tz // 2))
+
+    def _evict_tiles(self):
+        """Discard the least recently used level 0 tiles once the tile above them has been built.
+        The chunks in a discarded tile are drawn again if the tile is needed."""
+        if len(self._level_0_tiles) <= MaxLevel0Tiles:
+            return
+        # Tiles that are being drawn or still have chunks to draw are kept.
+        keep = {(0, cx // TileChunks, cz // TileChunks) for cx, cz in self._pending}
+        if self._view_level == 0 and self._view_bounds is not None:
+            min_cx, min_cz, max_cx, max_cz = self._view_bounds
+            keep.update(
+                (0, tx, tz)
+                for tx in range(min_cx // TileChunks, max_cx // TileChunks + 1)
+                for tz in range(min_cz // TileChunks, max_cz // TileChunks + 1)
+            )
+        with self._lock:
+            for key in list(self._level_0_tiles):
+                if len(self._level_0_tiles) <= MaxLevel0Tiles:
+                    break
+                _, tx, tz = key
+                if key in keep or (1, tx // 2, tz // 2) in self._dirty_tiles:
+                    continue
+                del self._level_0_tiles[key]
+                del self._tiles[key]
+                self._evicted_tiles.add((tx, tz))
+                for cx in range(tx * TileChunks, (tx + 1) * TileChunks):
+                    for cz in range(tz * TileChunks, (tz + 1) * TileChunks):
+                        self._chunk_times.pop((cx, cz), None)
+
+    def _find_changed_chunks(self):
+        """Queue the chunks that have changed since they were drawn."""
+        self._all_chunks = None
+        self._view_changed = True
+        changed = []
+        for dimension, cx, cz in self.level.chunks.changed_chunks():
+            if dimension != self._dimension:
+                continue
+            tile = (cx // TileChunks, cz // TileChunks)
+            if tile in self._evicted_tiles:
+                # Draw the whole tile again when it is in view so that the tile above can be rebuilt.
+                self._evicted_tiles.discard(tile)
+            elif (cx, cz) in self._chunk_times:
+                try:
+                    chunk_time = self.level.get_chunk(cx, cz, dimension).changed_time
+                except ChunkLoadError:
+                    chunk_time = None
+                if chunk_time != self._chunk_times[(cx, cz)]:
+                    changed.append((cx, cz))
+        # these are at the end so that they are processed first
+        self._pending.extend(changed)
+
+    def _update_pending(self):
+        """Find the chunks in view that have not been drawn yet."""
+        if self._all_chunks is None:
+            all_chunks = self.level.all_chunk_coords(self._dimension)
+            self._all_chunks = numpy.array(list(all_chunks), dtype=numpy.int64).reshape(
+                -1, 2
+            )
+        min_cx, min_cz, max_cx, max_cz = self._view_bounds
+        # Zoomed out tiles cover a larger area than the view. Include the whole of each tile.
+        tile_chunks = TileChunks << self._view_level
+        min_cx = (min_cx // tile_chunks) * tile_chunks
+        min_cz = (min_cz // tile_chunks) * tile_chunks
+        max_cx = (max_cx // tile_chunks + 1) * tile_chunks - 1
+        max_cz = (max_cz // tile_chunks + 1) * tile_chunks - 1
+        chunks = self._all_chunks
+        chunks = chunks[
+            (min_cx <= chunks[:, 0])
+            & (chunks[:, 0] <= max_cx)
+            & (min_cz <= chunks[:, 1])
+            & (chunks[:, 1] <= max_cz)
+        ]
+        # the chunks nearest to the centre of the view are drawn first
+        centre = ((min_cx + max_cx) / 2, (min_cz + max_cz) / 2)
+        chunks = chunks[
+            numpy.argsort(-numpy.sum(numpy.abs(chunks - centre), axis=1), kind="stable")
+        ]
+        if self._view_level == 0:
+            # The level 0 tiles in view are drawn so they must be created again.
+            self._evicted_tiles.difference_update(
+                (tx, tz)
+                for tx in range(min_cx // TileChunks, max_cx // TileChunks + 1)
+                for tz in range(min_cz // TileChunks, max_cz // TileChunks + 1)
+            )
+        chunk_times = self._chunk_times
+        evicted_tiles = self._evicted_tiles
+        changed = [chunk for chunk in self._pending if chunk in chunk_times]
+        self._pending = [
+            chunk
+            for chunk in map(tuple, chunks.tolist())
+            if chunk not in chunk_times
+            and (chunk[0] // TileChunks, chunk[1] // TileChunks) not in evicted_tiles
+        ]
+        self._pending.extend(changed)
+
+    def thread_action(self) -> bool:
+        if not self._active or self._dimension is None:
+            return False
+        self._evict_tiles()
+        if self._check_changed:
+            self._check_changed = False
+            self._find_changed_chunks()
+        elif self._view_changed and self._view_bounds is not None:
+            self._view_changed = False
+            self._update_pending()
+        elif self._pending:
+            end_time = time.time() + ChunkBatchTime
+            while self._pending and time.time() < end_time:
+                self._draw_chunk(*self._pending.pop())
+        elif self._dirty_tiles:
+            # Rebuild the lowest level first so that the levels above use the new data.
+            level = min(key[0] for key in self._dirty_tiles)
+            end_time = time.time() + ChunkBatchTime
+            for key in [key for key in self._dirty_tiles if key[0] == level]:
+                self._dirty_tiles.discard(key)
+                self._rebuild_tile(key)
+                if time.time() > end_time:
+                    break
+        else:
+            return False
+        return True
+
+    def _setup(self):
+        """Set up the OpenGL state if required."""
+        if self._vao is None:
+            self._shader = get_shader(self.context_identifier, "map_tile")
+            glUseProgram(self._shader)
+            self._transform_location = glGetUniformLocation(
+                self._shader, "transformation_matrix"
+            )
+            self._texture_location = glGetUniformLocation(self._shader, "image")
+            glUseProgram(0)
+            # A unit square in the x and z axis. The texture z axis is the texture y axis.
+            verts = numpy.array(
+                [
+                    [0, 0, 0, 0, 0],
+                    [0, 0, 1, 0, 1],
+                    [1, 0, 1, 1, 1],
+                    [0, 0, 0, 0, 0],
+                    [1, 0, 1, 1, 1],
+                    [1, 0, 0, 1, 0],
+                ],
+                numpy.float32,
+            ).ravel()
+            self._vao = glGenVertexArrays(1)
+            glBindVertexArray(self._vao)
+            self._vbo = glGenBuffers(1)
+            glBindBuffer(GL_ARRAY_BUFFER, self._vbo)
+            glBufferData(GL_ARRAY_BUFFER, verts.size * 4, verts, GL_STATIC_DRAW)
+            glVertexAttribPointer(0, 3, GL_FLOAT, GL_FALSE, 20, ctypes.c_void_p(0))
+            glEnableVertexAttribArray(0)
+            glVertexAttribPointer(1, 2, GL_FLOAT, GL_FALSE, 20, ctypes.c_void_p(12))
+            glEnableVertexAttribArray(1)
+            glBindVertexArray(0)
+            glBindBuffer(GL_ARRAY_BUFFER, 0)
+
+    def _upload_tile(self, tile: MapTile):
+        """Copy the pixels of a tile into its texture."""
+        if tile.texture is None:
+            tile.texture = glGenTextures(1)
+            glBindTexture(GL_TEXTURE_2D, tile.texture)
+            glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MIN_FILTER, GL_NEAREST)
+            glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MAG_FILTER, GL_NEAREST)
+            glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_WRAP_S, GL_CLAMP_TO_EDGE)
+            glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_WRAP_T, GL_CLAMP_TO_EDGE)
+        else:
+            glBindTexture(GL_TEXTURE_2D, tile.texture)
+        with self._lock:
+            glTexImage2D(
+                GL_TEXTURE_2D,
+                0,
+                GL_RGBA,
+                TileSize,
+                TileSize,
+                0,
+                GL_RGBA,
+                GL_UNSIGNED_BYTE,
+                tile.pixels,
+            )
+            tile.changed = False
+        glBindTexture(GL_TEXTURE_2D, 0)
+
+    def _unload_tile(self, tile: MapTile):
+        if tile.texture is not None:
+            glDeleteTextures([tile.texture])
+            tile.texture = None
+            tile.changed = True
+
+    def draw(self, camera_matrix: numpy.ndarray, y: float = 0.0):
+        """
+        Draw the tiles in view.
+        The depth buffer is not written to so that anything drawn afterwards is drawn on top of the map.
+
+        :param camera_matrix: The world to screen transformation matrix.
+        :param y: The y coordinate to draw the map at. This must be within the clipping range of the camera.
+        """
+        if self._view_bounds is None:
+            return
+        self._setup()
+        min_cx, min_cz, max_cx, max_cz = self._view_bounds
+        level = self._view_level
+        tile_chunks = TileChunks << level
+        with self._lock:
+            tiles = [
+                self._tiles.get((level, tx, tz))
+                for tx in range(min_cx // tile_chunks, max_cx // tile_chunks + 1)
+                for tz in range(min_cz // tile_chunks, max_cz // tile_chunks + 1)
+            ]
+        tiles = [tile for tile in tiles if tile is not None]
+
+        cull_face = glIsEnabled(GL_CULL_FACE)
+        glDisable(GL_CULL_FACE)
+        glDepthMask(GL_FALSE)
+        glUseProgram(self._shader)
+        glUniform1i(self._texture_location, 0)
+        glActiveTexture(GL_TEXTURE0)
+        glBindVertexArray(self._vao)
+        upload_count = 0
+        for tile in tiles:
+            key = (tile.level, tile.tx, tile.tz)
+            if tile.changed and upload_count < MaxTextureUploads:
+                self._upload_tile(tile)
+                upload_count += 1
+            if tile.texture is None:
+                continue
+            if tile.level == 0:
+                with self._lock:
+                    if key in self._level_0_tiles:
+                        self._level_0_tiles.move_to_end(key)
+            self._textures[key] = tile
+            self._textures.move_to_end(key)
+            block_size = tile.block_size
+            transformation_matrix = numpy.matmul(
+                camera_matrix,
+                numpy.matmul(
+                    displacement_matrix(tile.tx * block_size, y, tile.tz * block_size),
+                    scale_matrix(block_size, 1, block_size),
+                ),
+            )
+            glUniformMatrix4fv(
+                self._transform_location,
+                1,
+                GL_FALSE,
+                transformation_matrix.T.astype(numpy.float32),
+            )
+            glBindTexture(GL_TEXTURE_2D, tile.texture)
+            glDrawArrays(GL_TRIANGLES, 0, 6)
+        glBindTexture(GL_TEXTURE_2D, 0)
+        glBindVertexArray(0)
+        glUseProgram(0)
+        glDepthMask(GL_TRUE)
+        if cull_face:
+            glEnable(GL_CULL_FACE)
+
+        # free the textures that have not been drawn recently
+        while len(self._textures) > MaxTileTextures:
+            _, tile = self._textures.popitem(last=False)
+            self._unload_tile(tile)
+
+    def unload(self):
+        """Unload all OpenGL data. The tile pixels are kept."""
+        for tile in self._textures.values():
+            self._unload_tile(tile)
+        self._textures.clear()
+        if self._vbo is not None:
+            glDeleteBuffers(1, int(self._vbo))
+            self._vbo = None
+        if self._vao is not None:
+            glDeleteVertexArrays(1, int(self._vao))
+            self._vao = None
+
+    def clear(self):
+        """Unload all OpenGL data and destroy all tiles."""
+        self.unload()
+        with self._lock:
+            self._tiles.clear()
+            self._level_0_tiles.clear()
+        self._evicted_tiles.clear()
+        self._chunk_times.clear()
+        self._dirty_tiles.clear()
+        self._pending.clear()
+        self._all_chunks = None
+        self._view_changed = True
+
+    def _rebuild(self):
+        """The resource pack has changed so the block colours need recreating."""
+        self._palette_colours = numpy.zeros((0, 4), numpy.uint8)
+        self._palette_colours_palette = None
+        self.clear()
@@ -0,0 +1,109 @@
+from typing import Optional, Tuple, TYPE_CHECKING
+import wx
+
+from amulet.api.data_types import Dimension
+
+from amulet_map_editor import lang
+from amulet_map_editor.api.wx.ui.simple import SimpleDialog
+
+if TYPE_CHECKING:
+    from amulet_map_editor.programs.edit.api.block_index import BlockIndex
+
+
+def show_find_block(
+    parent: wx.Window, block_index: "BlockIndex", dimension: Dimension
+) -> Optional[Tuple[str, int, int]]:
+    """
+    Show a dialog to search the block index.
+
+    :return: The search text and the chunk coordinates picked by the user. None if cancelled.
+    """
+    dialog = FindBlock(
+        parent, lang.get("program_3d_edit.find_block_ui.title"), block_index, dimension
+    )
+    if dialog.ShowModal() == wx.ID_OK:
+        return dialog.result
+
+
+class FindBlock(SimpleDialog):
+    def __init__(
+        self,
+        parent: wx.Window,
+        title: str,
+        block_index: "BlockIndex",
+        dimension: Dimension,
+    ):
+        super().__init__(parent, title)
+        self._block_index = block_index
+        self._dimension = dimension
+        self._search_text = ""
+
+        search_sizer = wx.BoxSizer(wx.HORIZONTAL)
+        self.sizer.Add(search_sizer, 0, wx.EXPAND | wx.ALL, 5)
+        self._text = wx.TextCtrl(self, style=wx.TE_PROCESS_ENTER)
+        self._text.SetHint(lang.get("program_3d_edit.find_block_ui.search_hint"))
+        self._text.SetToolTip(lang.get("program_3d_edit.find_block_ui.search_tooltip"))
+        self._text.Bind(wx.EVT_TEXT_ENTER, self._on_search)
+        search_sizer.Add(self._text, 1, wx.EXPAND)
+        search_button = wx.Button(
+            self, label=lang.get("program_3d_edit.find_block_ui.search_button")
+        )
+        search_button.Bind(wx.EVT_BUTTON, self._on_search)
+        search_sizer.Add(search_button, 0, wx.LEFT, 5)
+
+        self._results = wx.ListCtrl(
+            self, style=wx.LC_REPORT | wx.LC_SINGLE_SEL, size=(350, 300)
+        )
+        self._results.AppendColumn(
+            lang.get("program_3d_edit.find_block_ui.chunk_x_column")
+        )
+        self._results.AppendColumn(
+            lang.get("program_3d_edit.find_block_ui.chunk_z_column")
+        )
+        self._results.AppendColumn(
+            lang.get("program_3d_edit.find_block_ui.count_column")
+        )
+        self._results.Bind(
+            wx.EVT_LIST_ITEM_ACTIVATED, lambda evt: self.EndModal(wx.ID_OK)
+        )
+        self.sizer.Add(self._results, 1, wx.EXPAND | wx.LEFT | wx.RIGHT, 5)
+
+        self._status = wx.StaticText(self)
+        self.sizer.Add(self._status, 0, wx.EXPAND | wx.ALL, 5)
+        self._update_status()
+        self.Fit()
+
+    @property
+    def result(self) -> Optional[Tuple[str, int, int]]:
+        """The search text and the coordinates of the selected chunk."""
+        index = self._results.GetFirstSelected()
+        if index == -1:
+            if self._results.GetItemCount():
+                index = 0
+            else:
+                return None
+        return (
+            self._search_text,
+            int(self._results.GetItemText(index, 0)),
+            int(self._results.GetItemText(index, 1)),
+        )
+
+    def _update_status(self):
+        indexed, total = self._block_index.progress
+        self._status.SetLabel(
+            lang.get("program_3d_edit.find_block_ui.index_progress").format(
+                indexed=indexed, total=total
+            )
+        )
+
+    def _on_search(self, evt):
+        self._search_text = self._text.GetValue().strip()
+        self._results.DeleteAllItems()
+        if self._search_text:
+            for cx, cz, count in self._block_index.find(
+                self._dimension, self._search_text
+            ):
+                index = self._results.Append((str(cx), str(cz), str(count)))
+                if index == 0:
+                    self._results.Select(0)
+        self._update_status()
@@ -19,6 +19,7 @@ from amulet_map_editor.programs.edit.plugins.tools import (
     GenerateTool,
     ChunkTool,
     PasteTool,
+    MagicWandTool,
 )
 
 if TYPE_CHECKING:
@@ -52,6 +53,7 @@ class ToolManagerSizer(wx.BoxSizer, EditCanvasContainer):
         self.register_tool(ImportTool)
         self.register_tool(ExportTool)
         self.register_tool(ChunkTool)
+        self.register_tool(MagicWandTool)
 
     @property
     def tools(self):
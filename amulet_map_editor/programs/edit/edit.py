@@ -66,7 +66,13 @@ class EditExtension(wx.Panel, BaseProgram):
 
     def enable(self):
         if self._canvas is None:
-            self._canvas = EditCanvas(self, self._world)
+            self._canvas = EditCanvas(
+                self,
+                self._world,
+                texture_array=config.get(EDIT_CONFIG_ID, {})
+                .get("options", {})
+                .get("mipmapped_textures", False),
+            )
             self._canvas.Hide()
             self._setup_thread = Thread(target=self._thread_setup)
             self._setup_thread.start()
@@ -126,6 +132,15 @@ class EditExtension(wx.Panel, BaseProgram):
             self._canvas.renderer.render_distance = edit_config.get("options", {}).get(
                 "render_distance", 5
             )
+            self._canvas.renderer.target_fps = edit_config.get("options", {}).get(
+                "target_fps", 60.0
+            )
+            self._canvas.renderer.adaptive_render_distance = edit_config.get(
+                "options", {}
+            ).get("adaptive_render_distance", False)
+            self._canvas.renderer.cache_chunk_geometry = edit_config.get(
+                "options", {}
+            ).get("cache_chunk_geometry", False)
             self._canvas.camera.rotate_speed = edit_config.get("options", {}).get(
                 "camera_sensitivity", 2.0
             )
@@ -241,6 +256,7 @@ class EditExtension(wx.Panel, BaseProgram):
         ).setdefault("shortcut", {}).update(
             {
                 f"{lang.get('program_3d_edit.menu_bar.edit.goto')}\tCtrl+g": lambda evt: self._canvas.goto(),
+                f"{lang.get('program_3d_edit.menu_bar.edit.find_block')}\tCtrl+f": lambda evt: self._canvas.find_block(),
                 f"{lang.get('program_3d_edit.menu_bar.edit.select_all')}\tCtrl+A": lambda evt: self._canvas.select_all(),
             }
         )
@@ -284,10 +300,18 @@ class EditExtension(wx.Panel, BaseProgram):
         if self._canvas is not None:
             fov = self._canvas.camera.perspective_fov
             render_distance = self._canvas.renderer.render_distance
+            adaptive_render_distance = self._canvas.renderer.adaptive_render_distance
+            target_fps = self._canvas.renderer.target_fps
+            cache_chunk_geometry = self._canvas.renderer.cache_chunk_geometry
+            mipmapped_textures = (
+                config.get(EDIT_CONFIG_ID, {})
+                .get("options", {})
+                .get("mipmapped_textures", False)
+            )
             camera_sensitivity = self._canvas.camera.rotate_speed
             dialog = SimpleDialog(self, "Options")
 
-            sizer = wx.FlexGridSizer(3, 2, 0, 0)
+            sizer = wx.FlexGridSizer(7, 2, 0, 0)
             dialog.sizer.Add(sizer, flag=wx.ALL, border=5)
             fov_ui = wx.SpinCtrlDouble(dialog, min=0, max=180, initial=fov)
 
@@ -325,6 +349,83 @@ class EditExtension(wx.Panel, BaseProgram):
                 border=5,
             )
 
+            adaptive_render_distance_ui = wx.CheckBox(dialog)
+            adaptive_render_distance_ui.SetValue(adaptive_render_distance)
+
+            def set_adaptive_render_distance(evt):
+                self._canvas.renderer.adaptive_render_distance = (
+                    adaptive_render_distance_ui.GetValue()
+                )
+
+            adaptive_render_distance_ui.Bind(
+                wx.EVT_CHECKBOX, set_adaptive_render_distance
+            )
+            sizer.Add(
+                wx.StaticText(dialog, label="Adaptive Render Distance"),
+                flag=wx.LEFT | wx.TOP | wx.ALIGN_CENTER_VERTICAL | wx.EXPAND,
+                border=5,
+            )
+            sizer.Add(
+                adaptive_render_distance_ui,
+                flag=wx.LEFT | wx.TOP | wx.ALIGN_CENTER_VERTICAL | wx.EXPAND,
+                border=5,
+            )
+
+            target_fps_ui = wx.SpinCtrlDouble(
+                dialog, min=1, max=240, initial=target_fps
+            )
+
+            def set_target_fps(evt):
+                self._canvas.renderer.target_fps = target_fps_ui.GetValue()
+
+            target_fps_ui.Bind(wx.EVT_SPINCTRLDOUBLE, set_target_fps)
+            sizer.Add(
+                wx.StaticText(dialog, label="Target Frame Rate"),
+                flag=wx.LEFT | wx.TOP | wx.ALIGN_CENTER_VERTICAL | wx.EXPAND,
+                border=5,
+            )
+            sizer.Add(
+                target_fps_ui,
+                flag=wx.LEFT | wx.TOP | wx.ALIGN_CENTER_VERTICAL | wx.EXPAND,
+                border=5,
+            )
+
+            cache_chunk_geometry_ui = wx.CheckBox(dialog)
+            cache_chunk_geometry_ui.SetValue(cache_chunk_geometry)
+
+            def set_cache_chunk_geometry(evt):
+                self._canvas.renderer.cache_chunk_geometry = (
+                    cache_chunk_geometry_ui.GetValue()
+                )
+
+            cache_chunk_geometry_ui.Bind(wx.EVT_CHECKBOX, set_cache_chunk_geometry)
+            sizer.Add(
+                wx.StaticText(dialog, label="Cache Chunk Geometry"),
+                flag=wx.LEFT | wx.TOP | wx.ALIGN_CENTER_VERTICAL | wx.EXPAND,
+                border=5,
+            )
+            sizer.Add(
+                cache_chunk_geometry_ui,
+                flag=wx.LEFT | wx.TOP | wx.ALIGN_CENTER_VERTICAL | wx.EXPAND,
+                border=5,
+            )
+
+            # The texture backend is chosen when the world is opened.
+            mipmapped_textures_ui = wx.CheckBox(dialog)
+            mipmapped_textures_ui.SetValue(mipmapped_textures)
+            sizer.Add(
+                wx.StaticText(
+                    dialog, label="Mipmapped Textures (requires reopening the world)"
+                ),
+                flag=wx.LEFT | wx.TOP | wx.ALIGN_CENTER_VERTICAL | wx.EXPAND,
+                border=5,
+            )
+            sizer.Add(
+                mipmapped_textures_ui,
+                flag=wx.LEFT | wx.TOP | wx.ALIGN_CENTER_VERTICAL | wx.EXPAND,
+                border=5,
+            )
+
             camera_sensitivity_ui = wx.SpinCtrlDouble(
                 dialog, min=0, max=10, initial=camera_sensitivity
             )
@@ -354,6 +455,16 @@ class EditExtension(wx.Panel, BaseProgram):
                 edit_config["options"][
                     "render_distance"
                 ] = render_distance_ui.GetValue()
+                edit_config["options"][
+                    "adaptive_render_distance"
+                ] = adaptive_render_distance_ui.GetValue()
+                edit_config["options"]["target_fps"] = target_fps_ui.GetValue()
+                edit_config["options"][
+                    "cache_chunk_geometry"
+                ] = cache_chunk_geometry_ui.GetValue()
+                edit_config["options"][
+                    "mipmapped_textures"
+                ] = mipmapped_textures_ui.GetValue()
                 edit_config["options"][
                     "camera_sensitivity"
                 ] = camera_sensitivity_ui.GetValue()
@@ -361,6 +472,11 @@ class EditExtension(wx.Panel, BaseProgram):
             elif response == wx.ID_CANCEL:
                 self._canvas.camera.perspective_fov = fov
                 self._canvas.renderer.render_distance = render_distance
+                self._canvas.renderer.adaptive_render_distance = (
+                    adaptive_render_distance
+                )
+                self._canvas.renderer.target_fps = target_fps
+                self._canvas.renderer.cache_chunk_geometry = cache_chunk_geometry
                 self._canvas.camera.rotate_speed = camera_sensitivity
 
     @staticmethod
@@ -12,6 +12,9 @@ from amulet_map_editor.programs.edit.api.operations import (
     SimpleOperationPanel,
     OperationError,
 )
+from amulet_map_editor.programs.edit.api.selection_export import (
+    check_selection_exportable,
+)
 
 if TYPE_CHECKING:
     from amulet.api.level import BaseLevel
@@ -59,6 +62,7 @@ class ExportConstruction(SimpleOperationPanel):
     def _operation(
         self, world: "BaseLevel", dimension: Dimension, selection: SelectionGroup
     ) -> OperationReturnType:
+        check_selection_exportable(self.canvas.selection.selection_mask)
         path = self._file_picker.GetPath()
         platform = self._version_define.platform
         version = self._version_define.version_number
@@ -12,6 +12,9 @@ from amulet_map_editor.programs.edit.api.operations import (
     SimpleOperationPanel,
     OperationError,
 )
+from amulet_map_editor.programs.edit.api.selection_export import (
+    check_selection_exportable,
+)
 
 if TYPE_CHECKING:
     from amulet.api.level import BaseLevel
@@ -75,6 +78,7 @@ class ExportSchematic(SimpleOperationPanel):
     def _operation(
         self, world: "BaseLevel", dimension: Dimension, selection: SelectionGroup
     ) -> OperationReturnType:
+        check_selection_exportable(self.canvas.selection.selection_mask)
         if len(selection.selection_boxes) == 0:
             raise OperationError("No selection was given to export.")
         elif len(selection.selection_boxes) != 1:
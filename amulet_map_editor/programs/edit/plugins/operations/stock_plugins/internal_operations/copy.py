@@ -1,4 +1,4 @@
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Optional
 
 from amulet.api.structure import structure_cache
 from amulet.api.data_types import Dimension
@@ -8,17 +8,25 @@ from amulet_map_editor.programs.edit.api.operations import (
     OperationError,
 )
 from amulet.api.data_types import OperationReturnType
+from amulet_map_editor.programs.edit.api.selection_mask import (
+    SelectionMask,
+    clear_unselected,
+)
 
 if TYPE_CHECKING:
     from amulet.api.level import BaseLevel
 
 
 def copy(
-    world: "BaseLevel", dimension: Dimension, selection: SelectionGroup
+    world: "BaseLevel",
+    dimension: Dimension,
+    selection: SelectionGroup,
+    selection_mask: Optional[SelectionMask] = None,
 ) -> OperationReturnType:
     if selection:
         yield 0, "Copying"
         structure = yield from world.extract_structure_iter(selection, dimension)
+        clear_unselected(structure, structure.dimensions[0], selection, selection_mask)
         structure_cache.add_structure(structure, structure.dimensions[0])
         raise OperationSilentAbort
     else:
@@ -1,4 +1,4 @@
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Optional
 
 from amulet.api.structure import structure_cache
 from amulet.api.data_types import Dimension, OperationReturnType
@@ -7,22 +7,26 @@ from amulet_map_editor.programs.edit.plugins.operations.stock_plugins.internal_o
     delete,
 )
 from amulet_map_editor.programs.edit.api.operations import OperationError
+from amulet_map_editor.programs.edit.api.selection_mask import (
+    SelectionMask,
+    clear_unselected,
+)
 
 if TYPE_CHECKING:
     from amulet.api.level import BaseLevel
 
 
 def cut(
-    world: "BaseLevel", dimension: Dimension, selection: SelectionGroup
+    world: "BaseLevel",
+    dimension: Dimension,
+    selection: SelectionGroup,
+    selection_mask: Optional[SelectionMask] = None,
 ) -> OperationReturnType:
     if selection:
         structure = world.extract_structure(selection, dimension)
+        clear_unselected(structure, structure.dimensions[0], selection, selection_mask)
         structure_cache.add_structure(structure, structure.dimensions[0])
-        yield from delete(
-            world,
-            dimension,
-            selection,
-        )
+        yield from delete(world, dimension, selection, selection_mask)
     else:
         raise OperationError(
             "At least one selection is required for the copy operation."
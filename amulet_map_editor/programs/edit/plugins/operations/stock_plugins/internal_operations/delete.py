@@ -1,25 +1,40 @@
 from __future__ import annotations
 
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Optional
 
 from amulet.api.selection import SelectionGroup
 from amulet.api.block import UniversalAirBlock
 from amulet.api.data_types import Dimension, OperationReturnType
 
+from amulet_map_editor.programs.edit.api.selection_mask import (
+    SelectionMask,
+    get_chunk_slice_box_mask,
+)
+
 if TYPE_CHECKING:
     from amulet.api.level import BaseLevel
 
 
 def delete(
-    world: "BaseLevel", dimension: Dimension, selection: SelectionGroup
+    world: "BaseLevel",
+    dimension: Dimension,
+    selection: SelectionGroup,
+    selection_mask: Optional[SelectionMask] = None,
 ) -> OperationReturnType:
     internal_id = world.block_palette.get_add_block(UniversalAirBlock)
 
     iter_count = len(list(world.get_coord_box(dimension, selection, False)))
     count = 0
 
-    for chunk, slices, _ in world.get_chunk_slice_box(dimension, selection, False):
-        chunk.blocks[slices] = internal_id
+    for chunk, slices, _, mask in get_chunk_slice_box_mask(
+        world, dimension, selection, selection_mask
+    ):
+        if mask is None:
+            chunk.blocks[slices] = internal_id
+        else:
+            blocks = chunk.blocks[slices]
+            blocks[mask] = internal_id
+            chunk.blocks[slices] = blocks
 
         chunk_x, chunk_z = chunk.coordinates
         chunk_x *= 16
@@ -32,7 +47,12 @@ def delete(
         z_max = chunk_z + slices[2].stop
 
         for x, y, z in list(chunk.block_entities.keys()):
-            if x_min <= x < x_max and y_min <= y < y_max and z_min <= z < z_max:
+            if (
+                x_min <= x < x_max
+                and y_min <= y < y_max
+                and z_min <= z < z_max
+                and (mask is None or mask[x - x_min, y - y_min, z - z_min])
+            ):
                 chunk.block_entities.pop((x, y, z))
 
         chunk.changed = True
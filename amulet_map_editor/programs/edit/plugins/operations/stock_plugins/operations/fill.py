@@ -22,6 +22,7 @@ SOFTWARE.
 """
 
 from typing import TYPE_CHECKING, Tuple
+import numpy
 import wx
 
 from amulet.api.selection import SelectionGroup
@@ -31,6 +32,9 @@ from amulet.api.data_types import Dimension, OperationReturnType
 from amulet_map_editor.api.wx.ui.base_select import EVT_PICK
 from amulet_map_editor.api.wx.ui.block_select import BlockDefine
 from amulet_map_editor.programs.edit.api.operations import DefaultOperationUI
+from amulet_map_editor.programs.edit.api.selection_mask import (
+    get_chunk_slice_box_mask,
+)
 
 if TYPE_CHECKING:
     from amulet.api.level import BaseLevel
@@ -112,6 +116,7 @@ class Fill(wx.Panel, DefaultOperationUI):
         world = self.world
         dimension = self.canvas.dimension
         target_box = self.canvas.selection.selection_group
+        selection_mask = self.canvas.selection.selection_mask
         fill_block, block_entity = self._block_define.universal_block
 
         internal_id = world.block_palette.get_add_block(fill_block)
@@ -119,8 +124,15 @@ class Fill(wx.Panel, DefaultOperationUI):
         iter_count = len(list(world.get_coord_box(dimension, target_box, True)))
         count = 0
 
-        for chunk, slices, _ in world.get_chunk_slice_box(dimension, target_box, True):
-            chunk.blocks[slices] = internal_id
+        for chunk, slices, _, mask in get_chunk_slice_box_mask(
+            world, dimension, target_box, selection_mask, True
+        ):
+            if mask is None:
+                chunk.blocks[slices] = internal_id
+            else:
+                blocks = chunk.blocks[slices]
+                blocks[mask] = internal_id
+                chunk.blocks[slices] = blocks
 
             chunk_x, chunk_z = chunk.coordinates
             chunk_x *= 16
@@ -134,8 +146,18 @@ class Fill(wx.Panel, DefaultOperationUI):
 
             if block_entity is None:
                 for x, y, z in list(chunk.block_entities.keys()):
-                    if x_min <= x < x_max and y_min <= y < y_max and z_min <= z < z_max:
+                    if (
+                        x_min <= x < x_max
+                        and y_min <= y < y_max
+                        and z_min <= z < z_max
+                        and (mask is None or mask[x - x_min, y - y_min, z - z_min])
+                    ):
                         chunk.block_entities.pop((x, y, z))
+            elif mask is not None:
+                for dx, dy, dz in numpy.argwhere(mask):
+                    chunk.block_entities[
+                        (int(x_min + dx), int(y_min + dy), int(z_min + dz))
+                    ] = block_entity
             else:
                 for x in range(x_min, x_max):
                     for y in range(y_min, y_max):
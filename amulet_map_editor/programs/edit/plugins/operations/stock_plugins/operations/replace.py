@@ -31,6 +31,9 @@ from amulet_map_editor.api.wx.ui.base_select import EVT_PICK
 from amulet_map_editor.api.wx.ui.block_select import BlockDefine
 from amulet_map_editor.api.wx.ui.simple import SimpleScrollablePanel
 from amulet_map_editor.programs.edit.api.operations import DefaultOperationUI
+from amulet_map_editor.programs.edit.api.selection_mask import (
+    get_chunk_slice_box_mask,
+)
 
 if TYPE_CHECKING:
     from amulet.api.level import BaseLevel
@@ -142,6 +145,7 @@ class Replace(SimpleScrollablePanel, DefaultOperationUI):
     def _replace(self):
         world = self.world
         selection = self.canvas.selection.selection_group
+        selection_mask = self.canvas.selection.selection_mask
         dimension = self.canvas.dimension
 
         (
@@ -169,7 +173,9 @@ class Replace(SimpleScrollablePanel, DefaultOperationUI):
         iter_count = len(list(world.get_coord_box(dimension, selection)))
         count = 0
 
-        for chunk, slices, _ in world.get_chunk_slice_box(dimension, selection):
+        for chunk, slices, _, mask in get_chunk_slice_box_mask(
+            world, dimension, selection, selection_mask
+        ):
             if universal_block_count < len(world.block_palette):
                 for universal_block_id in range(
                     universal_block_count, len(world.block_palette)
@@ -195,6 +201,8 @@ class Replace(SimpleScrollablePanel, DefaultOperationUI):
                 universal_block_count = len(world.block_palette)
             blocks = chunk.blocks[slices]
             replace_mask = numpy.isin(blocks, original_block_matches)
+            if mask is not None:
+                replace_mask &= mask
             blocks[replace_mask] = replacement_block_id
             chunk.blocks[slices] = blocks
 
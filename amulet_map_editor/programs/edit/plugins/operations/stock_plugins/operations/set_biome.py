@@ -21,16 +21,20 @@ SOFTWARE.
 -- end license --
 """
 
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Tuple
 
 import wx
 import math
+import numpy
 
 from amulet.utils import block_coords_to_chunk_coords
 from amulet.api.chunk.biomes import BiomesShape
 from amulet_map_editor.api.wx.ui.base_select import EVT_PICK
 from amulet_map_editor.api.wx.ui.biome_select import BiomeDefine
 from amulet_map_editor.programs.edit.api.operations import SimpleOperationPanel
+from amulet_map_editor.programs.edit.api.selection_mask import (
+    get_chunk_slice_box_mask,
+)
 from amulet_map_editor.api.wx.ui.simple import SimpleChoiceAny
 
 if TYPE_CHECKING:
@@ -57,6 +61,38 @@ MODES = {
 Border = wx.TOP | wx.LEFT | wx.RIGHT | wx.EXPAND
 
 
+def _get_cell_mask(
+    mask: numpy.ndarray, starts: Tuple[int, int, int], cell_size: int
+) -> numpy.ndarray:
+    """
+    Find which biome cells contain a selected block.
+
+    :param mask: The selected blocks.
+    :param starts: The block coordinate of the first block in the mask in each axis.
+    :param cell_size: The width of a biome cell in blocks.
+    :return: A bool array with one value for each cell the mask intersects.
+    """
+    offsets = [start % cell_size for start in starts]
+    cell_counts = [
+        math.ceil((offset + size) / cell_size)
+        for offset, size in zip(offsets, mask.shape)
+    ]
+    padded = numpy.zeros([count * cell_size for count in cell_counts], dtype=bool)
+    padded[
+        tuple(slice(offset, offset + size) for offset, size in zip(offsets, mask.shape))
+    ] = mask
+    return padded.reshape(
+        (
+            cell_counts[0],
+            cell_size,
+            cell_counts[1],
+            cell_size,
+            cell_counts[2],
+            cell_size,
+        )
+    ).any(axis=(1, 3, 5))
+
+
 class SetBiome(SimpleOperationPanel):
     def __init__(
         self,
@@ -134,11 +170,13 @@ class SetBiome(SimpleOperationPanel):
         self, world: "BaseLevel", dimension: "Dimension", selection: "SelectionGroup"
     ) -> "OperationReturnType":
         mode = self._mode.GetCurrentObject()
+        selection_mask = self.canvas.selection.selection_mask
 
         iter_count = len(list(world.get_coord_box(dimension, selection, False)))
-        for count, (chunk, slices, _) in enumerate(
-            world.get_chunk_slice_box(dimension, selection, False)
+        for count, (chunk, slices, _, mask) in enumerate(
+            get_chunk_slice_box_mask(world, dimension, selection, selection_mask)
         ):
+            starts = (slices[0].start, slices[1].start, slices[2].start)
             new_biome = chunk.biome_palette.get_add_biome(
                 self._biome_choice.universal_biome
             )
@@ -150,8 +188,12 @@ class SetBiome(SimpleOperationPanel):
                         slice(slices[1].start // 4, math.ceil(slices[1].stop / 4)),
                         slice(slices[2].start // 4, math.ceil(slices[2].stop / 4)),
                     )
+                    if mask is not None:
+                        mask = _get_cell_mask(mask, starts, 4)
                 elif chunk.biomes.dimension == BiomesShape.Shape2D:
                     slices = (slices[0], slices[2])
+                    if mask is not None:
+                        mask = numpy.any(mask, axis=1)
                 else:
                     continue
             elif mode == ColumnMode:
@@ -163,8 +205,25 @@ class SetBiome(SimpleOperationPanel):
                         slice(bounds.min_y // 4, math.ceil(bounds.max_y / 4)),
                         slice(slices[2].start // 4, math.ceil(slices[2].stop / 4)),
                     )
+                    if mask is not None:
+                        # select the whole column of each cell containing a selected block
+                        mask = _get_cell_mask(
+                            numpy.any(mask, axis=1, keepdims=True),
+                            (starts[0], 0, starts[2]),
+                            4,
+                        )
+                        mask = numpy.broadcast_to(
+                            mask,
+                            (
+                                mask.shape[0],
+                                slices[1].stop - slices[1].start,
+                                mask.shape[2],
+                            ),
+                        )
                 elif chunk.biomes.dimension == BiomesShape.Shape2D:
                     slices = (slices[0], slices[2])
+                    if mask is not None:
+                        mask = numpy.any(mask, axis=1)
                 else:
                     continue
             else:
@@ -172,7 +231,12 @@ class SetBiome(SimpleOperationPanel):
                     f"mode {mode} is not a valid mode for the Set Biome operation."
                 )
 
-            chunk.biomes[slices] = new_biome
+            if mask is None:
+                chunk.biomes[slices] = new_biome
+            else:
+                biomes = chunk.biomes[slices]
+                biomes[mask] = new_biome
+                chunk.biomes[slices] = biomes
 
             chunk.changed = True
             yield (count + 1) / iter_count
@@ -29,6 +29,9 @@ from amulet_map_editor.api.wx.ui.base_select import EVT_PICK
 from amulet_map_editor.api.wx.ui.simple import SimpleDialog
 from amulet_map_editor.api.wx.ui.block_select import BlockDefine
 from amulet_map_editor.programs.edit.api.operations import DefaultOperationUI
+from amulet_map_editor.programs.edit.api.selection_mask import (
+    get_chunk_slice_box_mask,
+)
 from amulet_map_editor.api import image
 
 if TYPE_CHECKING:
@@ -171,10 +174,13 @@ class Waterlog(wx.Panel, DefaultOperationUI):
         waterlog_block = self._get_fill_block().base_block
         world = self.world
         selection = self.canvas.selection.selection_group
+        selection_mask = self.canvas.selection.selection_mask
         dimension = self.canvas.dimension
         iter_count = len(list(world.get_coord_box(dimension, selection, True)))
         count = 0
-        for chunk, slices, _ in world.get_chunk_slice_box(dimension, selection, True):
+        for chunk, slices, _, mask in get_chunk_slice_box_mask(
+            world, dimension, selection, selection_mask, True
+        ):
             original_blocks = chunk.blocks[slices]
             palette, blocks = numpy.unique(original_blocks, return_inverse=True)
             blocks = blocks.reshape(original_blocks.shape)
@@ -251,7 +257,12 @@ class Waterlog(wx.Panel, DefaultOperationUI):
             else:
                 raise Exception("hello")
 
-            chunk.blocks[slices] = lut[blocks]
+            if mask is None:
+                chunk.blocks[slices] = lut[blocks]
+            else:
+                original_blocks = numpy.asarray(original_blocks)
+                original_blocks[mask] = lut[blocks[mask]]
+                chunk.blocks[slices] = original_blocks
 
             chunk.changed = True
             count += 1
@@ -5,3 +5,4 @@ from .export_tool import ExportTool
 from .import_tool import ImportTool
 from .chunk import ChunkTool
 from .paste import PasteTool
+from .magic_wand import MagicWandTool
@@ -0,0 +1,154 @@
+from typing import TYPE_CHECKING
+import wx
+from OpenGL.GL import (
+    glClear,
+    GL_DEPTH_BUFFER_BIT,
+)
+
+from amulet.api.selection import SelectionGroup
+from amulet.api.block import UniversalAirLikeBlocks
+from amulet.api.errors import ChunkLoadError
+
+from amulet_map_editor import lang
+from amulet_map_editor.api.opengl.camera import Projection
+from amulet_map_editor.programs.edit.api.ui.tool import DefaultBaseToolUI
+from amulet_map_editor.programs.edit.api.behaviour import (
+    PointerBehaviour,
+    StaticSelectionBehaviour,
+)
+from amulet_map_editor.programs.edit.api.events import (
+    InputPressEvent,
+    EVT_INPUT_PRESS,
+    EVT_SELECTION_CHANGE,
+)
+from amulet_map_editor.programs.edit.api.key_config import (
+    ACT_BOX_CLICK,
+    ACT_BOX_CLICK_ADD,
+    ACT_DESELECT_ALL_BOXES,
+)
+from amulet_map_editor.programs.edit.api.selection_mask import (
+    MaxFloodFillBlocks,
+    flood_fill,
+)
+
+if TYPE_CHECKING:
+    from amulet_map_editor.programs.edit.api.canvas import EditCanvas
+
+
+class MagicWandTool(wx.BoxSizer, DefaultBaseToolUI):
+    """Select the connected blocks that match the clicked block."""
+
+    def __init__(self, canvas: "EditCanvas"):
+        wx.BoxSizer.__init__(self, wx.HORIZONTAL)
+        DefaultBaseToolUI.__init__(self, canvas)
+
+        self._selection = StaticSelectionBehaviour(self.canvas)
+        self._pointer = PointerBehaviour(self.canvas)
+
+        self._panel = wx.Panel(canvas)
+        panel_sizer = wx.BoxSizer(wx.VERTICAL)
+        self._panel.SetSizer(panel_sizer)
+
+        options_sizer = wx.FlexGridSizer(2, 5, 5)
+        panel_sizer.Add(options_sizer, flag=wx.ALL, border=5)
+        max_blocks_label = wx.StaticText(
+            self._panel, label=lang.get("program_3d_edit.magic_wand_tool.max_blocks")
+        )
+        options_sizer.Add(max_blocks_label, flag=wx.ALIGN_CENTER)
+        self._max_blocks = wx.SpinCtrl(
+            self._panel,
+            min=1,
+            max=100_000_000,
+            initial=MaxFloodFillBlocks,
+        )
+        self._max_blocks.SetToolTip(
+            lang.get("program_3d_edit.magic_wand_tool.max_blocks_tooltip")
+        )
+        options_sizer.Add(self._max_blocks, flag=wx.ALIGN_CENTER)
+
+        self._block_count = wx.StaticText(self._panel)
+        panel_sizer.Add(self._block_count, 0, wx.LEFT | wx.BOTTOM | wx.RIGHT, 5)
+
+        self.Add(self._panel, 0, wx.ALIGN_CENTER_VERTICAL)
+
+    @property
+    def name(self) -> str:
+        return "Magic Wand"
+
+    def bind_events(self):
+        super().bind_events()
+        self._selection.bind_events()
+        self._pointer.bind_events()
+        self.canvas.Bind(EVT_INPUT_PRESS, self._on_input_press)
+        self.canvas.Bind(EVT_SELECTION_CHANGE, self._on_selection_change)
+
+    def enable(self):
+        super().enable()
+        self._selection.update_selection()
+        self._update_block_count()
+        self.Layout()
+
+    def _on_selection_change(self, evt):
+        self._update_block_count()
+        evt.Skip()
+
+    def _update_block_count(self):
+        """Show the number of selected blocks."""
+        selection_mask = self.canvas.selection.selection_mask
+        if selection_mask is None:
+            volume = self.canvas.selection.selection_group.volume
+        else:
+            volume = selection_mask.volume
+        self._block_count.SetLabel(
+            lang.get("program_3d_edit.magic_wand_tool.block_count").format(count=volume)
+        )
+        self._panel.Layout()
+
+    def _on_input_press(self, evt: InputPressEvent):
+        if evt.action_id == ACT_BOX_CLICK:
+            self._select()
+        elif evt.action_id == ACT_DESELECT_ALL_BOXES:
+            self.canvas.selection.selection_group = SelectionGroup()
+        evt.Skip()
+
+    def _select(self):
+        """Select the blocks connected to the block under the pointer."""
+        if not self._pointer.pointer_hit:
+            # The pointer is not on a block.
+            return
+        x, y, z = map(int, self._pointer.pointer_base)
+        try:
+            block = self.canvas.world.get_block(x, y, z, self.canvas.dimension)
+        except ChunkLoadError:
+            return
+        if block in UniversalAirLikeBlocks:
+            # Filling from air would select the sky up to the block limit.
+            return
+        with wx.BusyCursor():
+            selection_mask, truncated = flood_fill(
+                self.canvas.world,
+                self.canvas.dimension,
+                self._pointer.pointer_base,
+                self._max_blocks.GetValue(),
+            )
+        if ACT_BOX_CLICK_ADD in self.canvas.buttons.pressed_actions:
+            existing_mask = self.canvas.selection.selection_mask
+            if existing_mask is not None:
+                selection_mask = existing_mask.union(selection_mask)
+        self.canvas.selection.selection_mask = selection_mask
+        if truncated:
+            wx.MessageBox(
+                lang.get("program_3d_edit.magic_wand_tool.truncated").format(
+                    count=self._max_blocks.GetValue()
+                )
+            )
+
+    def _on_draw(self, evt):
+        self.canvas.renderer.start_draw()
+        if self.canvas.camera.projection_mode == Projection.PERSPECTIVE:
+            self.canvas.renderer.draw_sky_box()
+            glClear(GL_DEPTH_BUFFER_BIT)
+        self.canvas.renderer.draw_level()
+        self._selection.draw()
+        self._pointer.draw()
+        self.canvas.renderer.end_draw()
@@ -468,6 +468,29 @@ class PasteTool(wx.BoxSizer, DefaultBaseToolUI):
 
         add_line()
 
+        copy_sizer = wx.BoxSizer(wx.HORIZONTAL)
+        self._paste_sizer.Add(copy_sizer, 0, BottomLeftRightExpand, 5)
+        place_copy_button = wx.Button(
+            self._paste_panel,
+            label=lang.get("program_3d_edit.paste_tool.place_copy_label"),
+        )
+        place_copy_button.SetToolTip(
+            lang.get("program_3d_edit.paste_tool.place_copy_tooltip")
+        )
+        place_copy_button.Bind(wx.EVT_BUTTON, self._on_place_copy)
+        copy_sizer.Add(place_copy_button, 1, wx.RIGHT, 5)
+        remove_copy_button = wx.Button(
+            self._paste_panel,
+            label=lang.get("program_3d_edit.paste_tool.remove_copy_label"),
+        )
+        remove_copy_button.SetToolTip(
+            lang.get("program_3d_edit.paste_tool.remove_copy_tooltip")
+        )
+        remove_copy_button.Bind(wx.EVT_BUTTON, self._on_remove_copy)
+        copy_sizer.Add(remove_copy_button, 1)
+
+        add_line()
+
         confirm_button = wx.Button(self._paste_panel, label="Confirm")
         self._paste_sizer.Add(confirm_button, 0, BottomLeftRightExpand, 5)
         confirm_button.Bind(wx.EVT_BUTTON, self._paste_confirm)
@@ -640,6 +663,22 @@ class PasteTool(wx.BoxSizer, DefaultBaseToolUI):
             self._rotation_radians(),
         )
 
+    def _on_place_copy(self, evt):
+        """Leave a copy of the active placement at its current transform.
+        The copy shares the geometry of the active placement."""
+        fake_levels = self.canvas.renderer.fake_levels
+        level_index = fake_levels.active_level_index
+        if self._is_enabled and level_index is not None:
+            fake_levels.add_placement(level_index, *fake_levels.active_transform)
+
+    def _on_remove_copy(self, evt):
+        """Remove the most recently placed copy. The active placement is never removed."""
+        fake_levels = self.canvas.renderer.fake_levels
+        for placement_index in reversed(range(len(fake_levels.placements))):
+            if placement_index != fake_levels.active_placement_index:
+                fake_levels.remove_placement(placement_index)
+                break
+
     def _on_input_press(self, evt: InputPressEvent):
         if evt.action_id == ACT_BOX_CLICK:
             if self._is_enabled:
@@ -655,21 +694,27 @@ class PasteTool(wx.BoxSizer, DefaultBaseToolUI):
     def _paste_operation(self):
         if all(self._scale.value):
             fake_levels = self.canvas.renderer.fake_levels
-            level_index: int = fake_levels.active_level_index
-            if level_index is not None:
-                render_level: RenderLevel = fake_levels.render_levels[level_index]
-                yield from paste_iter(
-                    self.canvas.world,
-                    self.canvas.dimension,
-                    render_level.level,
-                    render_level.dimension,
-                    self._location.value,
-                    self._scale.value,
-                    self._rotation.value,
-                    self._copy_air.GetValue(),
-                    self._copy_water.GetValue(),
-                    self._copy_lava.GetValue(),
-                )
+            if fake_levels.active_level_index is not None:
+                # the placed copies and the active placement
+                placements = fake_levels.placements
+                for paste_index, (level_index, transform) in enumerate(placements):
+                    render_level: RenderLevel = fake_levels.render_levels[level_index]
+                    location, scale, rotation = transform
+                    if not all(scale):
+                        continue
+                    for progress in paste_iter(
+                        self.canvas.world,
+                        self.canvas.dimension,
+                        render_level.level,
+                        render_level.dimension,
+                        location,
+                        scale,
+                        numpy.rad2deg(rotation).tolist(),
+                        self._copy_air.GetValue(),
+                        self._copy_water.GetValue(),
+                        self._copy_lava.GetValue(),
+                    ):
+                        yield (paste_index + progress) / len(placements)
         else:
             raise OperationSuccessful(
                 lang.get("program_3d_edit.paste_tool.zero_scale_message")
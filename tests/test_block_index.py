@@ -0,0 +1,215 @@
+import unittest
+import os
+import tempfile
+import numpy
+
+from amulet.api.block import Block, UniversalAirBlock
+from amulet.api.chunk.blocks import Blocks
+from amulet.api.errors import ChunkDoesNotExist
+
+from amulet_map_editor.programs.edit.api.block_index import BlockIndex
+
+Stone = Block("universal_minecraft", "stone")
+Granite = Block("universal_minecraft", "granite")
+Palette = [UniversalAirBlock, Stone, Granite]
+AirId, StoneId, GraniteId = range(3)
+
+
+class Chunk:
+    def __init__(self, sub_chunks):
+        self.blocks = Blocks(sub_chunks)
+        self.changed_time = 0.0
+
+
+class ChunkManager:
+    def __init__(self):
+        self.changed = set()
+
+    def changed_chunks(self):
+        return iter(self.changed)
+
+
+class LevelWrapper:
+    def __init__(self):
+        self.last_played = 1
+
+
+class World:
+    def __init__(self):
+        self.level_path = "level_path"
+        self.level_wrapper = LevelWrapper()
+        self.block_palette = Palette
+        self.chunks = ChunkManager()
+        self.chunk_data = {}
+
+    def all_chunk_coords(self, dimension):
+        return set(self.chunk_data)
+
+    def get_chunk(self, cx, cz, dimension):
+        if (cx, cz) not in self.chunk_data:
+            raise ChunkDoesNotExist
+        return self.chunk_data[(cx, cz)]
+
+    def set_chunk(self, cx, cz, sub_chunks, changed: bool = False):
+        chunk = self.chunk_data[(cx, cz)] = Chunk(sub_chunks)
+        if changed:
+            chunk.changed_time = 1.0
+            self.chunks.changed.add(("overworld", cx, cz))
+
+    def delete_chunk(self, cx, cz):
+        del self.chunk_data[(cx, cz)]
+        self.chunks.changed.add(("overworld", cx, cz))
+
+
+def sub_chunk(*blocks) -> numpy.ndarray:
+    """Create a sub-chunk array with the given (x, y, z, block_id) set."""
+    array = numpy.zeros((16, 16, 16), dtype=numpy.uint32)
+    for x, y, z, block_id in blocks:
+        array[x, y, z] = block_id
+    return array
+
+
+class BlockIndexTestCase(unittest.TestCase):
+    def setUp(self):
+        self._cache_dir = tempfile.TemporaryDirectory()
+        self._old_cache_dir = os.environ.get("CACHE_DIR")
+        os.environ["CACHE_DIR"] = self._cache_dir.name
+        self._indexes = []
+        self.world = World()
+        self.world.set_chunk(
+            0,
+            0,
+            {0: sub_chunk((0, 0, 0, StoneId), (1, 0, 0, StoneId), (2, 3, 4, StoneId))},
+        )
+        self.world.set_chunk(
+            1, 0, {1: sub_chunk((5, 6, 7, StoneId), (8, 9, 10, GraniteId))}
+        )
+
+    def tearDown(self):
+        for index in self._indexes:
+            index.close()
+        if self._old_cache_dir is None:
+            del os.environ["CACHE_DIR"]
+        else:
+            os.environ["CACHE_DIR"] = self._old_cache_dir
+        self._cache_dir.cleanup()
+
+    def _open_index(self) -> BlockIndex:
+        index = BlockIndex(self.world)
+        self._indexes.append(index)
+        index.dimension = "overworld"
+        return index
+
+    @staticmethod
+    def _index_all(index: BlockIndex):
+        while index.thread_action():
+            pass
+
+    def test_find(self):
+        index = self._open_index()
+        self.assertEqual((0, 0), index.progress)
+        self._index_all(index)
+        self.assertEqual((2, 2), index.progress)
+        # the chunk with the most matches is first
+        self.assertEqual([(0, 0, 3), (1, 0, 1)], index.find("overworld", "stone"))
+        self.assertEqual([(1, 0, 1)], index.find("overworld", "GRANITE"))
+        self.assertEqual([(0, 0, 3)], index.find("overworld", "stone", 1))
+        self.assertEqual([], index.find("overworld", "dirt"))
+        self.assertEqual([], index.find("the_nether", "stone"))
+        # wildcard characters are matched literally
+        self.assertEqual([], index.find("overworld", "%"))
+
+    def test_find_block_in_chunk(self):
+        index = self._open_index()
+        # the highest matching block is found
+        self.assertEqual(
+            (2, 3, 4), index.find_block_in_chunk("overworld", 0, 0, "stone")
+        )
+        self.assertEqual(
+            (24, 25, 10), index.find_block_in_chunk("overworld", 1, 0, "granite")
+        )
+        self.assertIsNone(index.find_block_in_chunk("overworld", 0, 0, "granite"))
+        self.assertIsNone(index.find_block_in_chunk("overworld", 5, 5, "stone"))
+
+    def test_changed_chunk(self):
+        index = self._open_index()
+        self._index_all(index)
+        self.world.set_chunk(1, 0, {1: sub_chunk((0, 0, 0, StoneId))}, True)
+        self.world.set_chunk(2, 0, {0: sub_chunk((0, 0, 0, GraniteId))}, True)
+        # the index is not updated until it is told the world changed
+        self._index_all(index)
+        self.assertEqual([(1, 0, 1)], index.find("overworld", "granite"))
+        index.rebuild_changed()
+        self._index_all(index)
+        self.assertEqual([(2, 0, 1)], index.find("overworld", "granite"))
+        self.assertEqual([(0, 0, 3), (1, 0, 1)], index.find("overworld", "stone"))
+        self.assertEqual((3, 3), index.progress)
+
+    def test_deleted_chunk(self):
+        index = self._open_index()
+        self._index_all(index)
+        self.world.delete_chunk(1, 0)
+        index.rebuild_changed()
+        self._index_all(index)
+        self.assertEqual([], index.find("overworld", "granite"))
+        self.assertEqual([(0, 0, 3)], index.find("overworld", "stone"))
+
+    def test_reopen(self):
+        index = self._open_index()
+        self._index_all(index)
+        index.close()
+        # the saved index is reused
+        index = self._open_index()
+        index.thread_action()
+        self.assertEqual((2, 2), index.progress)
+        self.assertEqual([(1, 0, 1)], index.find("overworld", "granite"))
+
+    def test_reopen_removed_chunk(self):
+        index = self._open_index()
+        self._index_all(index)
+        index.close()
+        # the chunk was deleted while the index was closed
+        del self.world.chunk_data[(1, 0)]
+        index = self._open_index()
+        index.thread_action()
+        self.assertEqual((1, 1), index.progress)
+        self.assertEqual([], index.find("overworld", "granite"))
+
+    def test_reopen_unsaved(self):
+        index = self._open_index()
+        self.world.set_chunk(1, 0, {1: sub_chunk((8, 9, 10, GraniteId))}, True)
+        self._index_all(index)
+        index.close()
+        # the changes to chunk 1, 0 were not saved so it is indexed again
+        self.world.set_chunk(1, 0, {1: sub_chunk((8, 9, 10, StoneId))})
+        index = self._open_index()
+        index.thread_action()
+        self.assertEqual((1, 2), index.progress)
+        self._index_all(index)
+        self.assertEqual([], index.find("overworld", "granite"))
+
+    def test_mark_saved(self):
+        index = self._open_index()
+        self.world.set_chunk(1, 0, {1: sub_chunk((8, 9, 10, GraniteId))}, True)
+        self._index_all(index)
+        index.mark_saved()
+        index.close()
+        index = self._open_index()
+        index.thread_action()
+        self.assertEqual((2, 2), index.progress)
+
+    def test_last_played(self):
+        index = self._open_index()
+        self._index_all(index)
+        index.close()
+        # the world was opened in the game so the whole index is rebuilt
+        self.world.level_wrapper.last_played = 2
+        index = self._open_index()
+        index.thread_action()
+        self.assertEqual((0, 2), index.progress)
+        self._index_all(index)
+        self.assertEqual([(1, 0, 1)], index.find("overworld", "granite"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,126 @@
+import unittest
+import gc
+import weakref
+import numpy
+
+from amulet.api.block import Block, UniversalAirBlock
+from amulet.api.errors import ChunkDoesNotExist
+
+from amulet_map_editor.programs.edit.api.chunk_mask_cache import (
+    ChunkMaskCache,
+    EmptyColumnHeight,
+)
+
+Palette = [UniversalAirBlock, Block("universal_minecraft", "stone")]
+
+
+class Blocks:
+    def __init__(self, sub_chunks):
+        self._sub_chunks = sub_chunks
+
+    @property
+    def sub_chunks(self):
+        return self._sub_chunks.keys()
+
+    def get_sub_chunk(self, cy: int) -> numpy.ndarray:
+        return self._sub_chunks[cy]
+
+
+class Chunk:
+    def __init__(self, sub_chunks):
+        self.blocks = Blocks(sub_chunks)
+        self.block_palette = Palette
+        self.changed_time = 0.0
+
+
+class World:
+    def __init__(self):
+        self.chunks = {}
+
+    def get_chunk(self, cx, cz, dimension):
+        if (cx, cz) not in self.chunks:
+            raise ChunkDoesNotExist
+        return self.chunks[(cx, cz)]
+
+
+class ChunkMaskCacheTestCase(unittest.TestCase):
+    def test_air_mask(self):
+        world = World()
+        sub_chunk = numpy.zeros((16, 16, 16), dtype=numpy.uint32)
+        sub_chunk[1, 2, 3] = 1
+        world.chunks[(0, 0)] = Chunk({-1: sub_chunk})
+        cache = ChunkMaskCache(world)
+        air_mask = cache.get_air_mask(0, 0, "overworld")
+        self.assertEqual((-16, 0), (air_mask.min_y, air_mask.max_y))
+        numpy.testing.assert_array_equal(
+            [False, True, True],
+            air_mask.is_air(
+                numpy.array([1, 1, 1]),
+                numpy.array([-14, -13, 100]),
+                numpy.array([3, 3, 3]),
+            ),
+        )
+        self.assertIsNone(cache.get_air_mask(1, 0, "overworld"))
+
+    def test_heightmap(self):
+        world = World()
+        lower = numpy.zeros((16, 16, 16), dtype=numpy.uint32)
+        lower[:, 0, :] = 1
+        upper = numpy.zeros((16, 16, 16), dtype=numpy.uint32)
+        upper[4, 5, 6] = 1
+        lower[0, :, 0] = 0
+        world.chunks[(0, 0)] = Chunk({0: lower, 1: upper})
+        cache = ChunkMaskCache(world)
+        heightmap, top_blocks = cache.get_top_blocks(0, 0, "overworld")
+        self.assertEqual(21, heightmap[4, 6])
+        self.assertEqual(0, heightmap[1, 1])
+        self.assertEqual(EmptyColumnHeight, heightmap[0, 0])
+        self.assertEqual(1, top_blocks[4, 6])
+        self.assertIs(heightmap, cache.get_heightmap(0, 0, "overworld"))
+
+    def test_changed(self):
+        world = World()
+        sub_chunk = numpy.zeros((16, 16, 16), dtype=numpy.uint32)
+        chunk = world.chunks[(0, 0)] = Chunk({0: sub_chunk})
+        cache = ChunkMaskCache(world)
+        heightmap = cache.get_heightmap(0, 0, "overworld")
+        self.assertEqual(EmptyColumnHeight, heightmap[0, 0])
+        sub_chunk[0, 0, 0] = 1
+        # the cached value is used until the chunk is changed
+        self.assertIs(heightmap, cache.get_heightmap(0, 0, "overworld"))
+        chunk.changed_time = 1.0
+        self.assertEqual(0, cache.get_heightmap(0, 0, "overworld")[0, 0])
+        # a new chunk object at the same location is not the cached chunk
+        world.chunks[(0, 0)] = Chunk({0: numpy.zeros((16, 16, 16), dtype=numpy.uint32)})
+        self.assertEqual(
+            EmptyColumnHeight, cache.get_heightmap(0, 0, "overworld")[0, 0]
+        )
+
+    def test_chunk_not_kept_alive(self):
+        world = World()
+        world.chunks[(0, 0)] = Chunk({0: numpy.ones((16, 16, 16), dtype=numpy.uint32)})
+        chunk_ref = weakref.ref(world.chunks[(0, 0)])
+        cache = ChunkMaskCache(world)
+        self.assertIsNotNone(cache.get_air_mask(0, 0, "overworld"))
+        self.assertIsNotNone(cache.get_heightmap(0, 0, "overworld"))
+        # the cache only holds weak references to the chunks
+        del world.chunks[(0, 0)]
+        gc.collect()
+        self.assertIsNone(chunk_ref())
+
+    def test_max_size(self):
+        world = World()
+        for cx in range(4):
+            world.chunks[(cx, 0)] = Chunk(
+                {0: numpy.zeros((16, 16, 16), dtype=numpy.uint32)}
+            )
+        cache = ChunkMaskCache(world)
+        cache.max_air_masks = 2
+        air_masks = [cache.get_air_mask(cx, 0, "overworld") for cx in range(4)]
+        # the least recently used entries were discarded
+        self.assertIsNot(air_masks[0], cache.get_air_mask(0, 0, "overworld"))
+        self.assertIs(air_masks[3], cache.get_air_mask(3, 0, "overworld"))
+
+
+if __name__ == "__main__":
+    unittest.main()
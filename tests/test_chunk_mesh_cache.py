@@ -0,0 +1,174 @@
+import unittest
+import os
+import tempfile
+import numpy
+
+from amulet.api.block import Block, UniversalAirBlock
+from amulet.api.chunk.blocks import Blocks
+from amulet.api.errors import ChunkDoesNotExist
+from amulet.api.selection import SelectionBox
+
+from amulet_map_editor.api.opengl.mesh.level.mesh_cache import ChunkMeshCache
+from amulet_map_editor.api.opengl.mesh.level.chunk.chunk import RenderChunk
+
+Palette = [UniversalAirBlock, Block("universal_minecraft", "stone")]
+
+
+class Chunk:
+    def __init__(self, sub_chunks):
+        self.blocks = Blocks(sub_chunks)
+        self.block_palette = Palette
+        self.changed_time = 0.0
+
+
+class World:
+    def __init__(self):
+        self.chunks = {}
+
+    def bounds(self, dimension):
+        return SelectionBox(
+            (-30_000_000, 0, -30_000_000), (30_000_000, 256, 30_000_000)
+        )
+
+    def get_chunk(self, cx, cz, dimension):
+        if (cx, cz) not in self.chunks:
+            raise ChunkDoesNotExist
+        return self.chunks[(cx, cz)]
+
+
+class CountingRenderChunk(RenderChunk):
+    """A RenderChunk that creates one triangle per sub-chunk rather than running the mesher."""
+
+    mesh_count = 0
+
+    def _create_lod0_multi(self, blocks):
+        CountingRenderChunk.mesh_count += 1
+        return (
+            [
+                numpy.full(self._vert_len * 3, y + larger_blocks.sum(), numpy.float32)
+                for larger_blocks, y in blocks
+            ],
+            [],
+        )
+
+
+class MeshCacheTestCase(unittest.TestCase):
+    def setUp(self):
+        self._cache_dir = tempfile.TemporaryDirectory()
+        self._old_cache_dir = os.environ.get("CACHE_DIR")
+        os.environ["CACHE_DIR"] = self._cache_dir.name
+        self._caches = []
+        CountingRenderChunk.mesh_count = 0
+
+    def tearDown(self):
+        for cache in self._caches:
+            cache.close()
+        if self._old_cache_dir is None:
+            del os.environ["CACHE_DIR"]
+        else:
+            os.environ["CACHE_DIR"] = self._old_cache_dir
+        self._cache_dir.cleanup()
+
+    def _open_cache(self, cache_key: str = "key") -> ChunkMeshCache:
+        cache = ChunkMeshCache("level_path", cache_key)
+        self._caches.append(cache)
+        return cache
+
+    def _render_chunk(self, world: World, cache: ChunkMeshCache) -> RenderChunk:
+        return CountingRenderChunk(
+            "context", None, world, 8, (1, 2), "overworld", mesh_cache=cache
+        )
+
+    def test_put_get(self):
+        cache = self._open_cache()
+        self.assertIsNone(cache.get("overworld", 0, 0))
+        verts = numpy.arange(24, dtype=numpy.float32)
+        biome_tints = numpy.arange(2 * 16 * 16 * 4, dtype=numpy.uint8).reshape(
+            (2, 16, 16, 4)
+        )
+        cache.put("overworld", 0, 0, b"hash", verts, 12, biome_tints)
+        cached = cache.get("overworld", 0, 0)
+        self.assertEqual(b"hash", cached.content_hash)
+        self.assertEqual(12, cached.verts_translucent)
+        numpy.testing.assert_array_equal(verts, cached.verts)
+        numpy.testing.assert_array_equal(biome_tints, cached.biome_tints)
+        self.assertIsNone(cache.get("overworld", 0, 1))
+        self.assertIsNone(cache.get("the_nether", 0, 0))
+
+    def test_cache_key(self):
+        cache = self._open_cache()
+        cache.put("overworld", 0, 0, b"hash", numpy.ones(12, numpy.float32), 12, None)
+        cache.close()
+        cache = self._open_cache()
+        self.assertIsNotNone(cache.get("overworld", 0, 0))
+        cache.close()
+        # a different resource pack or setting invalidates all the geometry
+        cache = self._open_cache("other")
+        self.assertIsNone(cache.get("overworld", 0, 0))
+        cache.put("overworld", 0, 1, b"hash", numpy.ones(12, numpy.float32), 12, None)
+        # the cleared database can still be written to
+        self.assertIsNotNone(cache.get("overworld", 0, 1))
+
+    def test_render_chunk(self):
+        world = World()
+        sub_chunk = numpy.zeros((16, 16, 16), dtype=numpy.uint32)
+        sub_chunk[1, 2, 3] = 1
+        world.chunks[(1, 2)] = Chunk({0: sub_chunk})
+        cache = self._open_cache()
+
+        render_chunk = self._render_chunk(world, cache)
+        render_chunk.create_geometry()
+        self.assertEqual(1, CountingRenderChunk.mesh_count)
+        self.assertEqual(2, render_chunk.chunk_state)
+        verts = render_chunk.verts
+
+        # a new render chunk reuses the geometry in the cache
+        render_chunk = self._render_chunk(world, cache)
+        render_chunk.create_geometry()
+        self.assertEqual(1, CountingRenderChunk.mesh_count)
+        numpy.testing.assert_array_equal(verts, render_chunk.verts)
+
+        # the geometry can be shown before the chunk is loaded and is validated later
+        render_chunk = self._render_chunk(world, cache)
+        self.assertTrue(render_chunk.load_cached_geometry())
+        self.assertFalse(render_chunk.validated)
+        numpy.testing.assert_array_equal(verts, render_chunk.verts)
+        self.assertTrue(render_chunk.refresh_biomes())
+        self.assertTrue(render_chunk.validated)
+
+    def test_render_chunk_changed(self):
+        world = World()
+        world.chunks[(1, 2)] = Chunk({0: numpy.zeros((16, 16, 16), dtype=numpy.uint32)})
+        cache = self._open_cache()
+        self._render_chunk(world, cache).create_geometry()
+        self.assertEqual(1, CountingRenderChunk.mesh_count)
+
+        sub_chunk = numpy.zeros((16, 16, 16), dtype=numpy.uint32)
+        sub_chunk[4, 5, 6] = 1
+        world.chunks[(1, 2)] = Chunk({0: sub_chunk})
+
+        # the cached geometry fails validation
+        render_chunk = self._render_chunk(world, cache)
+        self.assertTrue(render_chunk.load_cached_geometry())
+        self.assertFalse(render_chunk.refresh_biomes())
+
+        # the geometry is created again and the cache entry is replaced
+        render_chunk.create_geometry()
+        self.assertEqual(2, CountingRenderChunk.mesh_count)
+        verts = render_chunk.verts
+        render_chunk = self._render_chunk(world, cache)
+        render_chunk.create_geometry()
+        self.assertEqual(2, CountingRenderChunk.mesh_count)
+        numpy.testing.assert_array_equal(verts, render_chunk.verts)
+
+    def test_missing_chunk(self):
+        world = World()
+        render_chunk = self._render_chunk(world, self._open_cache())
+        self.assertFalse(render_chunk.load_cached_geometry())
+        render_chunk.create_geometry()
+        self.assertEqual(0, render_chunk.chunk_state)
+        self.assertEqual(0, render_chunk.draw_count)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,89 @@
+import unittest
+import numpy
+
+from amulet.api.selection import SelectionGroup, SelectionBox
+
+from amulet_map_editor.programs.edit.api.selection_bvh import SelectionBVH, LeafSize
+
+
+def random_group(random: numpy.random.RandomState, box_count: int) -> SelectionGroup:
+    boxes = []
+    for point, size in zip(
+        random.randint(-64, 64, (box_count, 3)), random.randint(1, 16, (box_count, 3))
+    ):
+        boxes.append(SelectionBox(point.tolist(), (point + size).tolist()))
+    return SelectionGroup(boxes)
+
+
+class SelectionBVHTestCase(unittest.TestCase):
+    def assertMatchesGroup(self, bvh: SelectionBVH, origin, vector):
+        index, multiplier = bvh.closest_vector_intersection(origin, vector)
+        (
+            expected_index,
+            expected_multiplier,
+        ) = bvh.selection_group.closest_vector_intersection(origin, vector)
+        self.assertEqual(expected_index, index)
+        if expected_index is None:
+            self.assertEqual(float("inf"), multiplier)
+        else:
+            self.assertAlmostEqual(expected_multiplier, multiplier)
+
+    def test_random_rays(self):
+        random = numpy.random.RandomState(0)
+        bvh = SelectionBVH(random_group(random, LeafSize * 20))
+        for _ in range(500):
+            origin = random.uniform(-100, 100, 3).tolist()
+            vector = random.uniform(-1, 1, 3).tolist()
+            self.assertMatchesGroup(bvh, origin, vector)
+
+    def test_origin_inside(self):
+        random = numpy.random.RandomState(1)
+        group = random_group(random, LeafSize * 4)
+        bvh = SelectionBVH(group)
+        for box in group.selection_boxes:
+            origin = (numpy.array(box.min) + numpy.array(box.max)) / 2
+            vector = random.uniform(-1, 1, 3)
+            self.assertMatchesGroup(bvh, origin.tolist(), vector.tolist())
+
+    def test_axis_aligned(self):
+        random = numpy.random.RandomState(2)
+        bvh = SelectionBVH(random_group(random, LeafSize * 4))
+        for origin in random.uniform(-100, 100, (50, 3)).tolist():
+            for vector in (
+                (1.0, 0.0, 0.0),
+                (0.0, -1.0, 0.0),
+                (0.0, 0.0, 1.0),
+            ):
+                self.assertMatchesGroup(bvh, origin, vector)
+
+    def test_tie(self):
+        # Identical boxes are hit at the same distance. The first box is used.
+        box = SelectionBox((0, 0, 0), (4, 4, 4))
+        boxes = [SelectionBox((i * 10, 20, 0), (i * 10 + 1, 21, 1)) for i in range(20)]
+        bvh = SelectionBVH(SelectionGroup(boxes + [box, box]))
+        self.assertEqual(
+            (20, 2.0), bvh.closest_vector_intersection((2.0, 2.0, -2.0), (0, 0, 1))
+        )
+
+    def test_miss(self):
+        bvh = SelectionBVH(SelectionGroup(SelectionBox((0, 0, 0), (1, 1, 1))))
+        self.assertEqual(
+            (None, float("inf")),
+            bvh.closest_vector_intersection((0.5, 5.0, 0.5), (0.0, 1.0, 0.0)),
+        )
+        # The box is behind the origin.
+        self.assertEqual(
+            (None, float("inf")),
+            bvh.closest_vector_intersection((0.5, 0.5, 5.0), (0.0, 0.0, 1.0)),
+        )
+
+    def test_empty(self):
+        bvh = SelectionBVH(SelectionGroup())
+        self.assertEqual(
+            (None, float("inf")),
+            bvh.closest_vector_intersection((0.0, 0.0, 0.0), (1.0, 1.0, 1.0)),
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,96 @@
+import unittest
+import numpy
+import wx
+
+from amulet.api.selection import SelectionGroup, SelectionBox
+
+from amulet_map_editor.programs.edit.api.selection import (
+    SelectionManager,
+    SelectionHistoryManager,
+)
+from amulet_map_editor.programs.edit.api.selection_mask import SelectionMask
+
+Box1 = ((0, 0, 0), (1, 1, 1))
+Box2 = ((5, 5, 5), (8, 8, 8))
+
+
+def create_mask() -> SelectionMask:
+    """Two blocks with the bounding box ((0, 0, 0), (3, 1, 1))."""
+    mask = numpy.zeros((16, 1, 16), dtype=bool)
+    mask[0, 0, 0] = mask[2, 0, 0] = True
+    return SelectionMask({(0, 0): (0, mask)})
+
+
+class SelectionHistoryManagerTestCase(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        # The selection manager needs an app for its timer and events but not a display.
+        cls._app = wx.AppConsole()
+
+    def setUp(self):
+        self._canvas = wx.EvtHandler()
+        self.selection = SelectionManager(self._canvas)
+        self.history = SelectionHistoryManager(self.selection)
+
+    def test_undo_redo(self):
+        self.selection.set_selection_corners((Box1,))
+        self.assertTrue(self.history.create_undo_point())
+        self.selection.set_selection_corners((Box1, Box2))
+        self.assertTrue(self.history.create_undo_point())
+        self.assertEqual(2, self.history.undo_count)
+
+        self.history.undo()
+        self.assertEqual((Box1,), self.selection.selection_corners)
+        self.history.undo()
+        self.assertEqual((), self.selection.selection_corners)
+        self.assertEqual(0, self.history.undo_count)
+        self.history.redo()
+        self.history.redo()
+        self.assertEqual((Box1, Box2), self.selection.selection_corners)
+        self.assertEqual(0, self.history.redo_count)
+
+    def test_unchanged(self):
+        self.selection.set_selection_corners((Box1,))
+        self.assertTrue(self.history.create_undo_point())
+        self.selection.set_selection_corners((Box2,))
+        self.selection.set_selection_corners((Box1,))
+        # the selection is the same as the last undo point
+        self.assertFalse(self.history.create_undo_point())
+        self.assertEqual(1, self.history.undo_count)
+
+    def test_undo_mask(self):
+        mask = create_mask()
+        self.selection.set_selection_corners((((0, 0, 0), (3, 1, 1)),))
+        self.assertTrue(self.history.create_undo_point())
+        self.selection.set_selection_mask(mask)
+        self.assertEqual(
+            SelectionGroup(SelectionBox((0, 0, 0), (3, 1, 1))),
+            self.selection.selection_group,
+        )
+        # the boxes are the same but the blocks in them are not
+        self.assertTrue(self.history.create_undo_point())
+
+        self.history.undo()
+        self.assertIsNone(self.selection.selection_mask)
+        self.assertEqual(
+            (((0, 0, 0), (3, 1, 1)),), tuple(self.selection.selection_corners)
+        )
+        self.history.redo()
+        self.assertEqual(mask, self.selection.selection_mask)
+
+    def test_change_mask_boxes(self):
+        self.selection.set_selection_mask(create_mask())
+        self.assertTrue(self.history.create_undo_point())
+        # changing the boxes removes the mask
+        self.selection.set_selection_corners((Box2,))
+        self.assertIsNone(self.selection.selection_mask)
+        self.assertTrue(self.history.create_undo_point())
+        self.history.undo()
+        self.assertEqual(create_mask(), self.selection.selection_mask)
+        self.history.redo()
+        self.assertIsNone(self.selection.selection_mask)
+        self.assertEqual((Box2,), tuple(self.selection.selection_corners))
+
+
+if __name__ == "__main__":
+    unittest.main()
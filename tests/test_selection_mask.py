@@ -0,0 +1,159 @@
+import unittest
+import numpy
+
+from amulet.api.errors import ChunkDoesNotExist
+from amulet.api.selection import SelectionGroup, SelectionBox
+
+from amulet_map_editor.programs.edit.api.selection_mask import (
+    SelectionMask,
+    flood_fill,
+)
+
+
+class Chunk:
+    def __init__(self, blocks: numpy.ndarray):
+        self.blocks = blocks
+
+
+class World:
+    """A world with a height of 16 that only has the given chunks."""
+
+    def __init__(self, chunks):
+        self._chunks = {key: Chunk(blocks) for key, blocks in chunks.items()}
+
+    def bounds(self, dimension):
+        return SelectionBox((-30_000_000, 0, -30_000_000), (30_000_000, 16, 30_000_000))
+
+    def get_chunk(self, cx, cz, dimension):
+        if (cx, cz) not in self._chunks:
+            raise ChunkDoesNotExist
+        return self._chunks[(cx, cz)]
+
+
+class SelectionMaskTestCase(unittest.TestCase):
+    def test_chunk_mask(self):
+        mask = numpy.zeros((16, 8, 16), dtype=bool)
+        mask[2, 3, 4] = mask[5, 6, 7] = True
+        selection_mask = SelectionMask({(1, -1): (10, mask)})
+        self.assertEqual(2, selection_mask.volume)
+        self.assertEqual({(1, -1)}, set(selection_mask.chunk_locations()))
+        # the mask is trimmed to the selected height range
+        min_y, chunk_mask = selection_mask.get_chunk_mask(1, -1)
+        self.assertEqual(13, min_y)
+        numpy.testing.assert_array_equal(mask[:, 3:7], chunk_mask)
+        self.assertIsNone(selection_mask.get_chunk_mask(0, 0))
+        self.assertTrue(selection_mask.contains_block(18, 13, -12))
+        self.assertTrue(selection_mask.contains_block(21, 16, -9))
+        self.assertFalse(selection_mask.contains_block(18, 14, -12))
+        self.assertFalse(selection_mask.contains_block(2, 13, 4))
+
+    def test_slice_mask(self):
+        mask = numpy.zeros((16, 4, 16), dtype=bool)
+        mask[:, 1] = True
+        selection_mask = SelectionMask({(0, 0): (0, mask)})
+        slice_mask = selection_mask.get_slice_mask(
+            0, 0, (slice(2, 4), slice(-2, 8), slice(0, 16))
+        )
+        self.assertEqual((2, 10, 16), slice_mask.shape)
+        # only the selected layer at y=1 is set
+        numpy.testing.assert_array_equal(
+            numpy.flatnonzero(numpy.any(slice_mask, axis=(0, 2))), [3]
+        )
+        self.assertTrue(numpy.all(slice_mask[:, 3]))
+
+    def test_selection_group(self):
+        mask = numpy.zeros((16, 2, 16), dtype=bool)
+        mask[3, 0, 5] = mask[7, 1, 9] = True
+        selection_mask = SelectionMask({(0, 1): (4, mask)})
+        self.assertEqual(
+            SelectionGroup(SelectionBox((3, 4, 21), (8, 6, 26))),
+            selection_mask.selection_group,
+        )
+        self.assertEqual(SelectionGroup(), SelectionMask().selection_group)
+
+    def test_empty(self):
+        selection_mask = SelectionMask(
+            {(0, 0): (0, numpy.zeros((16, 4, 16), dtype=bool))}
+        )
+        self.assertFalse(selection_mask)
+        self.assertEqual(0, selection_mask.volume)
+        self.assertEqual(SelectionMask(), selection_mask)
+
+    def test_union(self):
+        a = numpy.zeros((16, 2, 16), dtype=bool)
+        a[0, 0, 0] = True
+        b = numpy.zeros((16, 2, 16), dtype=bool)
+        b[1, 1, 1] = True
+        union = SelectionMask({(0, 0): (0, a)}).union(
+            SelectionMask({(0, 0): (4, b), (1, 0): (0, b)})
+        )
+        self.assertEqual(3, union.volume)
+        self.assertTrue(union.contains_block(0, 0, 0))
+        self.assertTrue(union.contains_block(1, 5, 1))
+        self.assertTrue(union.contains_block(17, 1, 1))
+        self.assertEqual(
+            union,
+            SelectionMask({(1, 0): (0, b)}).union(
+                SelectionMask({(0, 0): (0, a)}).union(SelectionMask({(0, 0): (4, b)}))
+            ),
+        )
+
+
+class FloodFillTestCase(unittest.TestCase):
+    def test_fill_across_chunks(self):
+        # A wall of stone (1) in air (0) crossing from chunk 0, 0 into chunk 1, 0.
+        blocks_0 = numpy.zeros((16, 16, 16), dtype=numpy.uint32)
+        blocks_0[8:, 2:5, 3] = 1
+        blocks_1 = numpy.zeros((16, 16, 16), dtype=numpy.uint32)
+        blocks_1[:4, 2:5, 3] = 1
+        # This block touches the wall on an edge but not on a face.
+        blocks_1[4, 5, 3] = 1
+        world = World({(0, 0): blocks_0, (1, 0): blocks_1})
+        selection_mask, truncated = flood_fill(world, "overworld", (10, 3, 3))
+        self.assertFalse(truncated)
+        self.assertEqual(12 * 3, selection_mask.volume)
+        self.assertEqual({(0, 0), (1, 0)}, set(selection_mask.chunk_locations()))
+        self.assertTrue(selection_mask.contains_block(19, 4, 3))
+        self.assertFalse(selection_mask.contains_block(20, 5, 3))
+        self.assertFalse(selection_mask.contains_block(7, 3, 3))
+
+    def test_missing_chunk(self):
+        world = World({(0, 0): numpy.zeros((16, 16, 16), dtype=numpy.uint32)})
+        # the fill does not continue into chunks that do not exist
+        selection_mask, truncated = flood_fill(world, "overworld", (0, 0, 0))
+        self.assertFalse(truncated)
+        self.assertEqual(16 * 16 * 16, selection_mask.volume)
+        self.assertEqual(
+            (SelectionMask(), False), flood_fill(world, "overworld", (-1, 0, 0))
+        )
+
+    def test_out_of_bounds(self):
+        world = World({(0, 0): numpy.zeros((16, 16, 16), dtype=numpy.uint32)})
+        self.assertEqual(
+            (SelectionMask(), False), flood_fill(world, "overworld", (0, 16, 0))
+        )
+
+    def test_limit(self):
+        world = World({(0, 0): numpy.zeros((16, 16, 16), dtype=numpy.uint32)})
+        selection_mask, truncated = flood_fill(world, "overworld", (8, 8, 8), 10)
+        self.assertTrue(truncated)
+        self.assertGreaterEqual(selection_mask.volume, 10)
+        self.assertLess(selection_mask.volume, 16 * 16 * 16)
+        self.assertTrue(selection_mask.contains_block(8, 8, 8))
+
+    def test_exact_limit(self):
+        world = World({(0, 0): numpy.zeros((16, 16, 16), dtype=numpy.uint32)})
+        # the fill finishes at the limit so nothing was left out
+        selection_mask, truncated = flood_fill(
+            world, "overworld", (8, 8, 8), 16 * 16 * 16
+        )
+        self.assertFalse(truncated)
+        self.assertEqual(16 * 16 * 16, selection_mask.volume)
+        selection_mask, truncated = flood_fill(
+            world, "overworld", (8, 8, 8), 16 * 16 * 16 - 1
+        )
+        self.assertTrue(truncated)
+
+
+if __name__ == "__main__":
+    unittest.main()
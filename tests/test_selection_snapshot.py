@@ -0,0 +1,76 @@
+import unittest
+import numpy
+
+from amulet_map_editor.programs.edit.api.selection import (
+    SelectionSnapshot,
+    MaxSnapshotSegments,
+)
+
+
+def boxes(count: int, offset: int = 0):
+    return tuple(((i + offset, 0, 0), (i + offset + 1, 1, 1)) for i in range(count))
+
+
+class SelectionSnapshotTestCase(unittest.TestCase):
+    def test_corners(self):
+        corners = boxes(3)
+        snapshot = SelectionSnapshot.create(corners, None)
+        self.assertEqual(corners, snapshot.selection_corners)
+        self.assertEqual((3, 2, 3), snapshot.corners.shape)
+        self.assertEqual(numpy.int32, snapshot.corners.dtype)
+        self.assertIsNone(snapshot.selection_mask)
+        with self.assertRaises(ValueError):
+            snapshot.corners[0, 0, 0] = 5
+
+    def test_empty(self):
+        snapshot = SelectionSnapshot.create((), None)
+        self.assertEqual((), snapshot.selection_corners)
+        self.assertEqual((0, 2, 3), snapshot.corners.shape)
+        self.assertEqual(snapshot, SelectionSnapshot.create((), None))
+
+    def test_share_segments(self):
+        first = SelectionSnapshot.create(boxes(4), None)
+        second = SelectionSnapshot.create(boxes(6), None, first)
+        # the boxes from the first snapshot are shared and only the new boxes are stored
+        self.assertIs(first.corners, second._segments[0])
+        self.assertEqual(2, len(second._segments[1]))
+        self.assertEqual(boxes(6), second.selection_corners)
+
+    def test_changed_box(self):
+        first = SelectionSnapshot.create(boxes(4), None)
+        corners = boxes(3) + (((10, 10, 10), (11, 11, 11)),)
+        second = SelectionSnapshot.create(corners, None, first)
+        # the segment does not match so it is not shared
+        self.assertEqual(1, len(second._segments))
+        self.assertIsNot(first.corners, second.corners)
+        self.assertEqual(corners, second.selection_corners)
+
+    def test_removed_box(self):
+        first = SelectionSnapshot.create(boxes(4), None)
+        second = SelectionSnapshot.create(boxes(2), None, first)
+        self.assertEqual(boxes(2), second.selection_corners)
+        self.assertNotEqual(first, second)
+
+    def test_merge_segments(self):
+        snapshot = None
+        for count in range(1, MaxSnapshotSegments + 2):
+            snapshot = SelectionSnapshot.create(boxes(count), None, snapshot)
+            self.assertLessEqual(len(snapshot._segments), MaxSnapshotSegments)
+            self.assertEqual(boxes(count), snapshot.selection_corners)
+        # the segments were merged into one array once there were too many
+        self.assertEqual(1, len(snapshot._segments))
+
+    def test_equal(self):
+        first = SelectionSnapshot.create(boxes(4), None)
+        # equal snapshots with different segments
+        second = SelectionSnapshot.create(
+            boxes(4), None, SelectionSnapshot.create(boxes(2), None)
+        )
+        self.assertEqual(2, len(second._segments))
+        self.assertEqual(first, second)
+        self.assertNotEqual(first, SelectionSnapshot.create(boxes(4, 1), None))
+        self.assertNotEqual(first, SelectionSnapshot.create(boxes(3), None))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,111 @@
+import unittest
+import numpy
+
+from amulet_map_editor.api.opengl.textureatlas import (
+    AtlasTooSmall,
+    Frame,
+    Packable,
+    SkylinePacker,
+    Texture,
+    TextureAtlas,
+)
+
+
+def overlaps(a: Packable, b: Packable, border: int) -> bool:
+    return (
+        a.x - border < b.x + b.width + border
+        and b.x - border < a.x + a.width + border
+        and a.y - border < b.y + b.height + border
+        and b.y - border < a.y + a.height + border
+    )
+
+
+class SkylinePackerTestCase(unittest.TestCase):
+    def test_bottom_left(self):
+        packer = SkylinePacker(8, 8)
+        tall = Packable(4, 4)
+        wide = Packable(4, 2)
+        small = Packable(4, 2)
+        for packable in (tall, wide, small):
+            packer.pack(packable, 0)
+        self.assertEqual((0, 0), (tall.x, tall.y))
+        self.assertEqual((4, 0), (wide.x, wide.y))
+        # the lowest position is on top of the shorter packable
+        self.assertEqual((4, 2), (small.x, small.y))
+
+    def test_border(self):
+        packer = SkylinePacker(16, 16)
+        a = Packable(4, 4)
+        b = Packable(4, 4)
+        packer.pack(a, 1)
+        packer.pack(b, 1)
+        self.assertEqual((1, 1), (a.x, a.y))
+        self.assertEqual((7, 1), (b.x, b.y))
+
+    def test_no_overlap(self):
+        random = numpy.random.RandomState(0)
+        packer = SkylinePacker(16, 16)
+        border = 1
+        packables = [
+            Packable(int(width), int(height))
+            for width, height in random.randint(1, 20, (200, 2))
+        ]
+        for packable in packables:
+            packer.pack(packable, border)
+        for index, a in enumerate(packables):
+            self.assertGreaterEqual(a.x - border, 0)
+            self.assertGreaterEqual(a.y - border, 0)
+            self.assertLessEqual(a.x + a.width + border, packer.width)
+            self.assertLessEqual(a.y + a.height + border, packer.height)
+            for b in packables[index + 1 :]:
+                self.assertFalse(overlaps(a, b, border))
+
+    def test_grow_in_place(self):
+        packer = SkylinePacker(4, 4)
+        packables = [Packable(4, 4) for _ in range(4)]
+        positions = []
+        for packable in packables:
+            packer.pack(packable, 0)
+            positions.append((packable.x, packable.y))
+        # the canvas grows and the packed positions are not changed
+        self.assertEqual((8, 8), (packer.width, packer.height))
+        self.assertEqual(positions, [(p.x, p.y) for p in packables])
+        self.assertEqual(4, len(set(positions)))
+
+    def test_max_size(self):
+        packer = SkylinePacker(4, 4, max_size=8)
+        for _ in range(4):
+            packer.pack(Packable(4, 4), 0)
+        with self.assertRaises(AtlasTooSmall):
+            packer.pack(Packable(4, 4), 0)
+        with self.assertRaises(AtlasTooSmall):
+            SkylinePacker(4, 4, max_size=8).pack(Packable(9, 1), 0)
+
+
+class TextureAtlasTestCase(unittest.TestCase):
+    def test_generate(self):
+        red = numpy.zeros((2, 2, 4), numpy.uint8)
+        red[:] = (255, 0, 0, 255)
+        blue = numpy.zeros((2, 2, 4), numpy.uint8)
+        blue[:] = (0, 0, 255, 255)
+        atlas = TextureAtlas(4, 4, border=1)
+        atlas.pack(Texture("red", [Frame("red.png", red)]))
+        atlas.pack(Texture("blue", [Frame("blue.png", blue)]))
+        # the atlas grew to fit the second texture
+        self.assertEqual(
+            {"red": (1 / 8, 1 / 4, 3 / 8, 3 / 4), "blue": (5 / 8, 1 / 4, 7 / 8, 3 / 4)},
+            atlas.to_dict(),
+        )
+        image = atlas.generate_array()
+        self.assertEqual((4, 8, 4), image.shape)
+        # the border repeats the edge pixels
+        numpy.testing.assert_array_equal(
+            image[:, :4], numpy.broadcast_to(red[0, 0], (4, 4, 4))
+        )
+        numpy.testing.assert_array_equal(
+            image[:, 4:], numpy.broadcast_to(blue[0, 0], (4, 4, 4))
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,120 @@
+import unittest
+from typing import List, Optional
+
+from amulet_map_editor.api.opengl.thread_generator import (
+    ThreadedObject,
+    ThreadedObjectContainer,
+)
+
+
+class Worker(ThreadedObject):
+    """A ThreadedObject that records when it is called."""
+
+    def __init__(self, name: str, log: List[str], work: int = -1, weighting: int = 1):
+        self.name = name
+        self._log = log
+        # The number of actions with work to do. -1 for unlimited.
+        self.work = work
+        self._weighting = weighting
+
+    def thread_action(self) -> Optional[bool]:
+        self._log.append(self.name)
+        if self.work == 0:
+            return False
+        self.work -= 1
+
+    @property
+    def thread_weighting(self) -> int:
+        return self._weighting
+
+
+class ThreadedObjectContainerTestCase(unittest.TestCase):
+    def test_priority(self):
+        log = []
+        container = ThreadedObjectContainer()
+        low = Worker("low", log)
+        high = Worker("high", log, work=2)
+        container.register(low, -1)
+        container.register(high, 1)
+        for _ in range(4):
+            self.assertTrue(container.thread_action())
+        # the low priority object is only tried once the high priority object has nothing to do
+        self.assertEqual(["high", "high", "high", "low", "high", "low"], log)
+
+    def test_nothing_to_do(self):
+        log = []
+        container = ThreadedObjectContainer()
+        container.register(Worker("a", log, work=0))
+        container.register(Worker("b", log, work=0), 1)
+        self.assertFalse(container.thread_action())
+        self.assertEqual(["b", "a"], log)
+
+    def test_time_slice(self):
+        log = []
+        container = ThreadedObjectContainer()
+        container.time_slice = 1000
+        container.register(Worker("a", log))
+        container.register(Worker("b", log))
+        for _ in range(3):
+            container.thread_action()
+        # the first object keeps the thread until its time slice expires
+        self.assertEqual(["a", "a", "a"], log)
+
+    def test_round_robin(self):
+        log = []
+        container = ThreadedObjectContainer()
+        container.time_slice = 0
+        container.register(Worker("a", log))
+        container.register(Worker("b", log))
+        container.register(Worker("c", log))
+        for _ in range(6):
+            container.thread_action()
+        # objects with the same priority take turns once each time slice expires
+        self.assertEqual(["a", "b", "c", "a", "b", "c"], log)
+
+    def test_set_priority(self):
+        log = []
+        container = ThreadedObjectContainer()
+        a = Worker("a", log)
+        b = Worker("b", log)
+        container.register(a)
+        container.register(b, -1)
+        self.assertEqual(-1, container.get_priority(b))
+        container.set_priority(b, 1)
+        container.thread_action()
+        self.assertEqual(["b"], log)
+
+    def test_unregister_active(self):
+        log = []
+        container = ThreadedObjectContainer()
+        container.time_slice = 1000
+        a = Worker("a", log)
+        container.register(a)
+        container.register(Worker("b", log))
+        container.thread_action()
+        container.unregister(a)
+        container.thread_action()
+        self.assertEqual(["a", "b"], log)
+        self.assertNotIn(a, container.thread_stats)
+
+    def test_stats(self):
+        log = []
+        container = ThreadedObjectContainer()
+        worker = Worker("a", log, work=2)
+        container.register(worker)
+        for _ in range(3):
+            container.thread_action()
+        stats = container.thread_stats[worker]
+        self.assertEqual(3, stats.action_count)
+        self.assertEqual(2, stats.work_count)
+        self.assertGreaterEqual(stats.total_time, 0)
+
+    def test_weighting(self):
+        container = ThreadedObjectContainer()
+        container.register(Worker("a", [], weighting=2))
+        container.register(Worker("b", [], weighting=3))
+        self.assertEqual(5, container.thread_weighting)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,66 @@
+import unittest
+import numpy
+
+from amulet_map_editor.programs.edit.api.behaviour.raycast_behaviour import (
+    voxel_traversal,
+)
+
+
+def sample_blocks(start, look_vector, max_distance):
+    """The blocks a ray passes through found by sampling points along it."""
+    distances = numpy.linspace(0, max_distance, int(max_distance * 1000))
+    points = numpy.asarray(start) + distances[:, None] * numpy.asarray(look_vector)
+    return {tuple(block) for block in numpy.floor(points).astype(int)}
+
+
+def ray_intersects_blocks(start, look_vector, max_distance, blocks):
+    """Check if the ray intersects each block using the slab method."""
+    start = numpy.asarray(start)
+    look_vector = numpy.asarray(look_vector)
+    t0 = (blocks - start) / look_vector
+    t1 = (blocks + 1 - start) / look_vector
+    t_enter = numpy.max(numpy.minimum(t0, t1), axis=1)
+    t_exit = numpy.min(numpy.maximum(t0, t1), axis=1)
+    return (t_enter <= t_exit) & (t_exit >= 0) & (t_enter <= max_distance)
+
+
+class VoxelTraversalTestCase(unittest.TestCase):
+    def test_positive_axis(self):
+        blocks = voxel_traversal((0.5, 0.5, 0.5), (1, 0.000001, 0.000001), 3)
+        numpy.testing.assert_array_equal(
+            blocks, [(0, 0, 0), (1, 0, 0), (2, 0, 0), (3, 0, 0)]
+        )
+
+    def test_negative_axis(self):
+        blocks = voxel_traversal((0.5, 0.5, 0.5), (0.000001, -1, 0.000001), 3)
+        numpy.testing.assert_array_equal(
+            blocks, [(0, 0, 0), (0, -1, 0), (0, -2, 0), (0, -3, 0)]
+        )
+
+    def test_start_block(self):
+        blocks = voxel_traversal((-0.5, 10.25, -20.75), (0.6, 0.000001, 0.8), 0.1)
+        numpy.testing.assert_array_equal(blocks, [(-1, 10, -21)])
+
+    def test_diagonal(self):
+        look_vector = numpy.array([0.3, -0.5, 0.8])
+        look_vector /= numpy.linalg.norm(look_vector)
+        start = (12.3, 64.7, -5.2)
+        blocks = voxel_traversal(start, look_vector, 20)
+        numpy.testing.assert_array_equal(blocks[0], numpy.floor(start))
+        # each block shares a face with the previous block
+        numpy.testing.assert_array_equal(
+            numpy.sum(numpy.abs(numpy.diff(blocks, axis=0)), axis=1), 1
+        )
+        # the blocks are unique and all intersect the ray
+        self.assertEqual(len(blocks), len({tuple(block) for block in blocks}))
+        self.assertTrue(
+            numpy.all(ray_intersects_blocks(start, look_vector, 20, blocks))
+        )
+        # no block found by sampling the ray is missed
+        self.assertLessEqual(
+            sample_blocks(start, look_vector, 20), {tuple(block) for block in blocks}
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()